@@ -0,0 +1,90 @@
+"""
+compact_memory.py - Memory benchmark of the default and compact inventory storage modes.
+
+Builds the same inventory of devices and addressed interfaces twice, once with
+Device/Interface and once with CompactDevice/CompactInterface, and reports the
+memory traced for each.
+
+Usage:
+    python -m benchmarks.compact_memory [--interfaces 1000000] [--ports 48]
+"""
+
+import argparse
+import gc
+import ipaddress
+import time
+import tracemalloc
+
+from ciscopykit.device import CompactDevice, Device
+from ciscopykit.interface import CompactInterface, Interface
+
+MODES = {
+    "default": (Device, Interface),
+    "compact": (CompactDevice, CompactInterface),
+}
+
+
+def build_inventory(device_class, interface_class, interface_count, ports):
+    """
+    Builds an inventory of L2 switches with addressed access ports.
+
+    Args:
+        device_class (type): The device class to instantiate.
+        interface_class (type): The interface class to instantiate.
+        interface_count (int): The total number of interfaces.
+        ports (int): The number of interfaces per device.
+
+    Returns:
+        list: The devices of the inventory.
+    """
+    base = int(ipaddress.IPv4Address("10.0.0.0"))
+    devices = []
+    for index in range(interface_count):
+        port = index % ports
+        if port == 0:
+            device = device_class("L2 Switch", f"sw{index // ports}", f"site{index // 100000}", "Access")
+            devices.append(device)
+        interface = interface_class(f"GigabitEthernet1/0/{port + 1}")
+        interface.assign_ip_address(ipaddress.IPv4Interface((base + index, 16)))
+        device.add_interface(interface)
+    return devices
+
+
+def measure(mode, interface_count, ports):
+    """
+    Measures the memory held by an inventory built in the given mode.
+
+    Args:
+        mode (str): The storage mode, 'default' or 'compact'.
+        interface_count (int): The total number of interfaces.
+        ports (int): The number of interfaces per device.
+
+    Returns:
+        tuple: The traced memory in bytes and the build time in seconds.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    devices = build_inventory(*MODES[mode], interface_count, ports)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del devices
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory of the default and compact storage modes.")
+    parser.add_argument("--interfaces", type=int, default=1000000, help="Number of interfaces to build")
+    parser.add_argument("--ports", type=int, default=48, help="Interfaces per device")
+    args = parser.parse_args()
+
+    results = {mode: measure(mode, args.interfaces, args.ports) for mode in MODES}
+    for mode, (memory, elapsed) in results.items():
+        print(f"{mode:>8}: {memory / 2 ** 20:9.1f} MiB  {memory / args.interfaces:7.1f} B/interface  "
+              f"built in {elapsed:.2f}s")
+    print(f"   ratio: {results['default'][0] / results['compact'][0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
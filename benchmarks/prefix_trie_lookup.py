@@ -0,0 +1,87 @@
+"""
+prefix_trie_lookup.py - Longest-prefix-match benchmark of PrefixTrie against a linear scan.
+
+Builds a table of random nested prefixes, then compares:
+
+    linear  scanning every IPv4Network for the longest one containing the address
+    trie    PrefixTrie.longest_match()
+
+The linear scan is timed over a few lookups only and reported per lookup.
+
+Usage:
+    python -m benchmarks.prefix_trie_lookup [--prefixes 1000000] [--lookups 100000]
+"""
+
+import argparse
+import random
+import time
+from ipaddress import IPv4Address, IPv4Network
+
+from ciscopykit.ip.prefix_trie import PrefixTrie
+
+
+def random_prefixes(count, seed=0):
+    """
+    Returns distinct random prefixes, sorted by address then prefix length.
+
+    Args:
+        count (int): The number of prefixes.
+        seed (int, optional): The random seed.
+
+    Returns:
+        list: (address, prefixlen) pairs.
+    """
+    generator = random.Random(seed)
+    prefixes = set()
+    while len(prefixes) < count:
+        prefixlen = generator.choice((8, 12, 16, 20, 22, 24, 24, 24, 26, 28, 30, 32))
+        address = generator.getrandbits(32) & ((0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF)
+        prefixes.add((address, prefixlen))
+    return sorted(prefixes)
+
+
+def linear_match(networks, address):
+    best = None
+    for network in networks:
+        if address in network and (best is None or network.prefixlen > best.prefixlen):
+            best = network
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PrefixTrie lookups with a linear scan.")
+    parser.add_argument("--prefixes", type=int, default=1000000, help="Number of prefixes")
+    parser.add_argument("--lookups", type=int, default=100000, help="Number of trie lookups")
+    parser.add_argument("--linear-lookups", type=int, default=5, help="Number of linear scan lookups")
+    args = parser.parse_args()
+
+    prefixes = random_prefixes(args.prefixes)
+    generator = random.Random(1)
+    addresses = [generator.getrandbits(32) for _ in range(args.lookups)]
+
+    start = time.perf_counter()
+    trie = PrefixTrie.from_sorted((prefix, None) for prefix in prefixes)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for address in addresses:
+        trie.longest_match(address)
+    trie_time = (time.perf_counter() - start) / len(addresses)
+
+    networks = [IPv4Network(prefix) for prefix in prefixes]
+    samples = [IPv4Address(address) for address in addresses[:args.linear_lookups]]
+    start = time.perf_counter()
+    for address in samples:
+        expected = linear_match(networks, address)
+        found = trie.longest_match(address)
+        assert (found and found[0]) == expected
+    linear_time = (time.perf_counter() - start) / len(samples)
+
+    print(f"prefixes: {len(prefixes)}  trie build: {build:.1f} s")
+    print(f"linear: {linear_time * 1e6:12.1f} us/lookup")
+    print(f"  trie: {trie_time * 1e6:12.1f} us/lookup")
+    print(f"speedup: {linear_time / trie_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
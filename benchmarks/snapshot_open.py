@@ -0,0 +1,75 @@
+"""
+snapshot_open.py - Cold-open benchmark of inventory snapshots against rebuilding from source.
+
+Writes a synthetic CSV inventory export, then compares:
+
+    rebuild   load_inventory() on the CSV export, as every run does today
+    snapshot  open_snapshot() followed by the lookup of one device and its interfaces
+
+Usage:
+    python -m benchmarks.snapshot_open [--devices 20000] [--ports 48]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from ciscopykit.loader import load_inventory
+from ciscopykit.snapshot import open_snapshot, save_snapshot
+
+
+def write_export(path, device_count, ports):
+    """
+    Writes a synthetic CSV inventory export of addressed L2 switches.
+
+    Args:
+        path (str): The path of the export.
+        device_count (int): The number of devices.
+        ports (int): The number of interfaces per device.
+    """
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["device_type", "hostname", "site", "layer", "interface", "ip_address"])
+        for number in range(device_count):
+            for port in range(ports):
+                address = (10 << 24) + number * ports + port
+                writer.writerow(["L2 Switch", f"sw{number}", f"site{number // 1000}", "Access",
+                                 f"GigabitEthernet1/0/{port + 1}",
+                                 f"{address >> 24}.{address >> 16 & 255}.{address >> 8 & 255}.{address & 255}/16"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare snapshot cold-open time with rebuilding from source.")
+    parser.add_argument("--devices", type=int, default=20000, help="Number of devices")
+    parser.add_argument("--ports", type=int, default=48, help="Interfaces per device")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        export = os.path.join(directory, "inventory.csv")
+        snapshot_path = os.path.join(directory, "inventory.snap")
+        write_export(export, args.devices, args.ports)
+
+        start = time.perf_counter()
+        result = load_inventory(export, compact=True)
+        rebuild = time.perf_counter() - start
+
+        save_snapshot(result.registry, snapshot_path)
+        target = f"sw{args.devices // 2}.site{args.devices // 2000}"
+        del result
+
+        start = time.perf_counter()
+        with open_snapshot(snapshot_path) as snapshot:
+            interfaces = snapshot.get(target).get_active_interfaces()
+        cold_open = time.perf_counter() - start
+
+        print(f"devices: {args.devices}  interfaces: {args.devices * args.ports}  "
+              f"snapshot size: {os.path.getsize(snapshot_path) / 2 ** 20:.1f} MiB")
+        print(f" rebuild: {rebuild * 1000:10.1f} ms")
+        print(f"snapshot: {cold_open * 1000:10.1f} ms  ({len(interfaces)} interfaces of {target})")
+        print(f" speedup: {rebuild / cold_open:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
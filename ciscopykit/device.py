@@ -1,15 +1,76 @@
 import re
+import sys
+from collections.abc import Sequence
 
-class Device:
+
+class _InterfaceView(Sequence):
+    """
+    A live view of the interfaces of a device, in the order they were added.
+
+    The view reads the interface dictionary of the device, and append(),
+    extend() and remove() go through the device methods, so code written
+    against the former active_interfaces list keeps the device in sync.
+    """
+
+    __slots__ = ("_device",)
+
+    def __init__(self, device):
+        self._device = device
+
+    def __getitem__(self, index):
+        # Indexed through a list kept until the interfaces of the device change.
+        interfaces = self._device._interface_list
+        if interfaces is None:
+            interfaces = self._device._interface_list = list(self._device._interfaces.values())
+        return interfaces[index]
+
+    def __iter__(self):
+        return iter(self._device._interfaces.values())
+
+    def __len__(self):
+        return len(self._device._interfaces)
+
+    def __contains__(self, interface):
+        if isinstance(interface, str):
+            return interface in self._device._interfaces
+        return self._device._interfaces.get(getattr(interface, "name", None)) is interface
+
+    def __eq__(self, other):
+        if isinstance(other, _InterfaceView):
+            other = list(other)
+        return isinstance(other, (list, tuple)) and list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def append(self, interface):
+        self._device.add_interface(interface)
+
+    def extend(self, interfaces):
+        self._device.add_interfaces(interfaces)
+
+    def remove(self, interface):
+        if interface not in self:
+            name = interface if isinstance(interface, str) else interface.name
+            raise ValueError(f"Interface {name} is not on {self._device.fqdn}.")
+        self._device.remove_interface(interface)
+
+
+class BaseDevice:
     """
     Represents a network device.
 
+    Holds the behaviour shared by Device and CompactDevice, which differ
+    only in how they store their attributes.
+
     Attributes:
         device_type (str): The type of the device.
         hostname (str): The hostname of the device.
         site (str): The site name of the device.
         fqdn (str): The fully qualified domain name of the device.
-        active_interfaces (list): The list of active interfaces.
+        active_interfaces (Sequence): A live view of the active
+            interfaces, in the order they were added. Its append(),
+            extend() and remove() add and remove interfaces of the device.
         layer (str): The layer of the device (Core, Distribution, Access).
 
     Methods:
@@ -19,7 +80,11 @@ device.
         remove_attribute(attribute_name): Removes an attribute from the 
 device.
         add_interface(interface): Adds an interface to the device.
+        add_interfaces(interfaces): Adds several interfaces to the device.
         remove_interface(interface): Removes an interface from the device.
+        remove_interfaces(interfaces): Removes several interfaces from the
+            device.
+        get_interface(name): Returns the interface with the given name.
         update_fqdn(): Updates the fully qualified domain name based on 
 the hostname and site name.
         extract_hostname_site(fqdn): Extracts the hostname and site name 
@@ -27,23 +92,7 @@ from a fully qualified domain name.
         get_active_interfaces(): Returns the list of active interfaces.
     """
 
-    def __init__(self, device_type, hostname, site, layer):
-        """
-        Initializes a Device object.
-
-        Args:
-            device_type (str): The type of the device.
-            hostname (str): The hostname of the device.
-            site (str): The site name of the device.
-            layer (str): The layer of the device (Core, Distribution, 
-Access).
-        """
-        self.device_type = device_type
-        self._hostname = hostname
-        self._site = site
-        self.fqdn = f"{hostname}.{site}"
-        self.active_interfaces = []
-        self.layer = layer
+    __slots__ = ()
 
     @property
     def hostname(self):
@@ -51,6 +100,7 @@ Access).
 
     @hostname.setter
     def hostname(self, new_hostname):
+        self._check_fqdn(f"{new_hostname}.{self.site}")
         self._hostname = new_hostname
         self.update_fqdn()
 
@@ -60,9 +110,23 @@ Access).
 
     @site.setter
     def site(self, new_site):
+        self._check_fqdn(f"{self.hostname}.{new_site}")
         self._site = new_site
         self.update_fqdn()
 
+    @property
+    def active_interfaces(self):
+        return _InterfaceView(self)
+
+    @property
+    def layer(self):
+        return self._layer
+
+    @layer.setter
+    def layer(self, new_layer):
+        self._layer = new_layer
+        self._reindex()
+
     def __str__(self):
         """
         Returns a string representation of the device.
@@ -78,6 +142,10 @@ Access).
 
         Args:
             new_hostname (str): The new hostname of the device.
+
+        Raises:
+            ValueError: If the new FQDN is used by another device of a
+                registry tracking the device.
         """
         self.hostname = new_hostname
 
@@ -87,6 +155,10 @@ Access).
 
         Args:
             new_site (str): The new site name of the device.
+
+        Raises:
+            ValueError: If the new FQDN is used by another device of a
+                registry tracking the device.
         """
         self.site = new_site
 
@@ -104,20 +176,78 @@ Access).
         """
         Adds an interface to the device.
 
+        Interfaces are keyed by name, so the name of an interface must not
+        change while it belongs to a device.
+
         Args:
             interface (Interface): The interface to add.
+
+        Raises:
+            ValueError: If another interface with the same name was already
+                added.
+        """
+        existing = self._interfaces.get(interface.name)
+        if existing is not None and existing is not interface:
+            raise ValueError(f"Interface {interface.name} already exists on {self.fqdn}.")
+        self._interfaces[interface.name] = interface
+        self._interface_list = None
+
+    def add_interfaces(self, interfaces):
         """
-        self.active_interfaces.append(interface)
+        Adds several interfaces to the device.
+
+        Args:
+            interfaces (iterable): The interfaces to add.
+
+        Raises:
+            ValueError: If an interface name is already used by another
+                interface. No interface is added in that case.
+        """
+        interfaces = list(interfaces)
+        added = {}
+        for interface in interfaces:
+            existing = added.get(interface.name, self._interfaces.get(interface.name))
+            if existing is not None and existing is not interface:
+                raise ValueError(f"Interface {interface.name} already exists on {self.fqdn}.")
+            added[interface.name] = interface
+        self._interfaces.update(added)
+        self._interface_list = None
 
     def remove_interface(self, interface):
         """
         Removes an interface from the device.
 
         Args:
-            interface (Interface): The interface to remove.
+            interface (Interface or str): The interface to remove, or its
+                name.
+        """
+        if isinstance(interface, str):
+            self._interfaces.pop(interface, None)
+        elif self._interfaces.get(interface.name) is interface:
+            del self._interfaces[interface.name]
+        self._interface_list = None
+
+    def remove_interfaces(self, interfaces):
+        """
+        Removes several interfaces from the device.
+
+        Args:
+            interfaces (iterable): The interfaces to remove, or their names.
         """
-        if interface in self.active_interfaces:
-            self.active_interfaces.remove(interface)
+        for interface in interfaces:
+            self.remove_interface(interface)
+
+    def get_interface(self, name):
+        """
+        Returns the interface with the given name.
+
+        Args:
+            name (str): The name of the interface.
+
+        Returns:
+            Interface or None: The matching interface, if any.
+        """
+        return self._interfaces.get(name)
 
     def update_fqdn(self):
         """
@@ -125,6 +255,25 @@ Access).
 site name.
         """
         self.fqdn = f"{self.hostname}.{self.site}"
+        self._reindex()
+
+    def _check_fqdn(self, fqdn):
+        """
+        Checks that no registry tracking the device has another device
+        with the given FQDN, before the device is renamed to it.
+
+        Raises:
+            ValueError: If the FQDN is used by another tracked device.
+        """
+        for registry in self._registries:
+            registry._check_fqdn(self, fqdn)
+
+    def _reindex(self):
+        """
+        Refreshes the index entries of every registry tracking the device.
+        """
+        for registry in self._registries:
+            registry._reindex(self)
 
     @staticmethod
     def extract_hostname_site(fqdn):
@@ -157,7 +306,7 @@ name.
         Returns:
             list: The list of active interfaces.
         """
-        return self.active_interfaces
+        return list(self._interfaces.values())
     @staticmethod
     def generate_init_config(hostname, site, interface_range="GigabitEthernet0/0-10", static_pass="cisco", motd="Welcome to the Cisco network!"):
         """
@@ -230,6 +379,67 @@ no shutdown
 """
 
 
+class Device(BaseDevice):
+    """
+    Represents a network device storing its attributes in a per-instance
+    dictionary.
+    """
+
+    def __init__(self, device_type, hostname, site, layer):
+        """
+        Initializes a Device object.
+
+        Args:
+            device_type (str): The type of the device.
+            hostname (str): The hostname of the device.
+            site (str): The site name of the device.
+            layer (str): The layer of the device (Core, Distribution, 
+Access).
+        """
+        self.device_type = device_type
+        self._hostname = hostname
+        self._site = site
+        self.fqdn = f"{hostname}.{site}"
+        self._interfaces = {}
+        self._interface_list = None
+        self._layer = layer
+        self._registries = []
+
+
+class CompactDevice(BaseDevice):
+    """
+    Represents a network device in compact storage mode.
+
+    Attributes live in slots instead of a per-instance dictionary, and the
+    device type, site and layer strings are interned, as they repeat
+    across the whole inventory. Use it with CompactInterface to keep large
+    inventories small in memory.
+    """
+
+    __slots__ = ("device_type", "_hostname", "_site", "fqdn",
+                 "_interfaces", "_interface_list", "_layer", "_registries")
+
+    def __init__(self, device_type, hostname, site, layer):
+        """
+        Initializes a CompactDevice object.
+
+        Args:
+            device_type (str): The type of the device.
+            hostname (str): The hostname of the device.
+            site (str): The site name of the device.
+            layer (str): The layer of the device (Core, Distribution,
+                Access).
+        """
+        self.device_type = sys.intern(device_type)
+        self._hostname = hostname
+        self._site = sys.intern(site)
+        self.fqdn = f"{hostname}.{site}"
+        self._interfaces = {}
+        self._interface_list = None
+        self._layer = sys.intern(layer)
+        self._registries = []
+
+
 class Router(Device):
     """
     Represents a router device.
@@ -267,56 +477,203 @@ class Endpoint(Device):
         super().__init__("Endpoint", hostname, site, layer)
 
 
-class CoreLayer:
+DEVICE_CLASSES = {
+    "Router": Router,
+    "L3 Switch": L3Switch,
+    "L2 Switch": L2Switch,
+    "Endpoint": Endpoint,
+}
+
+
+class DeviceRegistry:
     """
-    Represents the Core layer in a network.
+    Represents an indexed collection of network devices.
+
+    Devices are indexed by fqdn, hostname, site, layer and device type, so
+    lookups and compound queries are hash lookups instead of list scans.
+    The indexes follow the devices: changing the hostname, site or layer of
+    a registered device through its setters updates every registry holding
+    it.
+
+    Attributes:
+        devices (list): The registered devices, in insertion order.
+
+    Methods:
+        add_device(device): Adds a device to the registry.
+        remove_device(device): Removes a device from the registry.
+        get(fqdn): Returns the device with the given FQDN.
+        find(**criteria): Returns the devices matching every criterion.
     """
 
-    def __init__(self):
-        self.devices = []
+    INDEXED_ATTRIBUTES = ("fqdn", "hostname", "site", "layer", "device_type")
 
-    def add_device(self, device):
+    def __init__(self, devices=None):
         """
-        Adds a device to the Core layer.
+        Initializes a DeviceRegistry object.
 
         Args:
-            device (Device): The device to add.
+            devices (iterable, optional): Devices to register.
         """
-        self.devices.append(device)
+        self._devices = {}
+        self._keys = {}
+        self._indexes = {attribute: {} for attribute in self.INDEXED_ATTRIBUTES}
+        for device in devices or ():
+            self.add_device(device)
 
+    def __len__(self):
+        return len(self._devices)
 
-class DistributionLayer:
-    """
-    Represents the Distribution layer in a network.
-    """
+    def __iter__(self):
+        return iter(list(self._devices.values()))
 
-    def __init__(self):
-        self.devices = []
+    def __contains__(self, device):
+        return id(device) in self._devices
+
+    @property
+    def devices(self):
+        return list(self._devices.values())
 
     def add_device(self, device):
         """
-        Adds a device to the Distribution layer.
+        Adds a device to the registry.
 
         Args:
             device (Device): The device to add.
+
+        Raises:
+            ValueError: If a device with the same FQDN is already
+                registered.
+        """
+        if id(device) in self._devices:
+            return
+        if self._indexes["fqdn"].get(device.fqdn):
+            raise ValueError(f"Device {device.fqdn} is already registered.")
+        self._devices[id(device)] = device
+        self._index(device)
+        device._registries.append(self)
+
+    def remove_device(self, device):
+        """
+        Removes a device from the registry.
+
+        Args:
+            device (Device): The device to remove.
         """
-        self.devices.append(device)
+        if self._devices.pop(id(device), None) is None:
+            return
+        self._unindex(device)
+        device._registries.remove(self)
 
+    def get(self, fqdn):
+        """
+        Returns the device with the given FQDN.
 
-class AccessLayer:
-    """
-    Represents the Access layer in a network.
-    """
+        Args:
+            fqdn (str): The fully qualified domain name.
 
-    def __init__(self):
-        self.devices = []
+        Returns:
+            Device or None: The matching device, if any.
+        """
+        bucket = self._indexes["fqdn"].get(fqdn)
+        if not bucket:
+            return None
+        return next(iter(bucket.values()))
 
-    def add_device(self, device):
+    def find(self, **criteria):
+        """
+        Returns the devices matching every criterion.
+
+        Each criterion is answered from its index and the smallest
+        matching bucket is filtered against the others, so a compound
+        query costs no more than its most selective criterion.
+
+        Args:
+            **criteria: Attribute values to match, keyed by any of fqdn,
+                hostname, site, layer and device_type.
+
+        Returns:
+            list: The matching devices.
+
+        Raises:
+            ValueError: If a criterion is not an indexed attribute.
+        """
+        unknown = set(criteria) - set(self.INDEXED_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"Unindexed device attributes: {', '.join(sorted(unknown))}")
+        if not criteria:
+            return self.devices
+
+        buckets = []
+        for attribute, value in criteria.items():
+            bucket = self._indexes[attribute].get(value)
+            if not bucket:
+                return []
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        smallest, others = buckets[0], buckets[1:]
+        return [device for key, device in smallest.items()
+                if all(key in bucket for bucket in others)]
+
+    def _index(self, device):
+        keys = tuple(getattr(device, attribute) for attribute in self.INDEXED_ATTRIBUTES)
+        for attribute, value in zip(self.INDEXED_ATTRIBUTES, keys):
+            self._indexes[attribute].setdefault(value, {})[id(device)] = device
+        self._keys[id(device)] = keys
+
+    def _unindex(self, device):
+        keys = self._keys.pop(id(device))
+        for attribute, value in zip(self.INDEXED_ATTRIBUTES, keys):
+            bucket = self._indexes[attribute][value]
+            del bucket[id(device)]
+            if not bucket:
+                del self._indexes[attribute][value]
+
+    def _check_fqdn(self, device, fqdn):
         """
-        Adds a device to the Access layer.
+        Checks that a device can be renamed to an FQDN.
 
         Args:
-            device (Device): The device to add.
+            device (Device): The device being renamed.
+            fqdn (str): Its new FQDN.
+
+        Raises:
+            ValueError: If another device of the registry has that FQDN.
         """
-        self.devices.append(device)
+        bucket = self._indexes["fqdn"].get(fqdn)
+        if bucket and any(key != id(device) for key in bucket):
+            raise ValueError(f"Device {fqdn} is already registered.")
 
+    def _reindex(self, device):
+        """
+        Moves a device to the index entries of its current values.
+
+        Args:
+            device (Device): The device whose attributes changed.
+
+        Raises:
+            ValueError: If another device of the registry has the new FQDN
+                of the device, which then keeps its old index entries.
+        """
+        keys = tuple(getattr(device, attribute) for attribute in self.INDEXED_ATTRIBUTES)
+        if self._keys.get(id(device)) != keys:
+            self._check_fqdn(device, device.fqdn)
+            self._unindex(device)
+            self._index(device)
+
+
+class CoreLayer(DeviceRegistry):
+    """
+    Represents the Core layer in a network.
+    """
+
+
+class DistributionLayer(DeviceRegistry):
+    """
+    Represents the Distribution layer in a network.
+    """
+
+
+class AccessLayer(DeviceRegistry):
+    """
+    Represents the Access layer in a network.
+    """
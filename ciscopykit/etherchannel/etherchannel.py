@@ -40,6 +40,8 @@ Example:
 import re
 import ipaddress
 
+from ciscopykit.interface_range import MAX_RANGES, interface_blocks
+
 
 class EtherChannel:
     """
@@ -126,19 +128,27 @@ class Layer2EtherChannel(EtherChannel):
         else:
             self.allowed_vlans = None
 
-    def configure(self):
+    def configure(self, max_ranges=MAX_RANGES):
         """
         Configure Layer 2 EtherChannel.
 
+        The member interfaces are configured with the fewest `interface range` blocks;
+        names that cannot be parsed are configured as written.
+
+        Args:
+            max_ranges (int, optional): The most ranges an `interface range` statement takes
+                on the platform (default: MAX_RANGES).
+
         Returns:
             str: The configuration commands for configuring the Layer 2 EtherChannel.
         """
-        config_commands = [
-            f"interface range {', '.join(self.interfaces)}",
-            f"channel-group {self.port_channel_number} mode active",
+        config_commands = interface_blocks(
+            self.interfaces, [f"channel-group {self.port_channel_number} mode active"], max_ranges,
+            strict=False)
+        config_commands.extend([
             f"exit",
             f"interface port-channel {self.port_channel_number}"
-        ]
+        ])
 
         if self.allowed_vlans:
             config_commands.extend([
@@ -186,19 +196,27 @@ class Layer3EtherChannel(EtherChannel):
         self.ip_address = ipaddress.IPv4Address(ip_address)
         self.subnet_mask = ipaddress.IPv4Address(subnet_mask)
 
-    def configure(self):
+    def configure(self, max_ranges=MAX_RANGES):
         """
         Configure Layer 3 EtherChannel.
 
+        The member interfaces are configured with the fewest `interface range` blocks;
+        names that cannot be parsed are configured as written.
+
+        Args:
+            max_ranges (int, optional): The most ranges an `interface range` statement takes
+                on the platform (default: MAX_RANGES).
+
         Returns:
             str: The configuration commands for configuring the Layer 3 EtherChannel.
         """
-        config_commands = [
-            f"interface range {', '.join(self.interfaces)}",
-            f"channel-group {self.port_channel_number} mode active",
+        config_commands = interface_blocks(
+            self.interfaces, [f"channel-group {self.port_channel_number} mode active"], max_ranges,
+            strict=False)
+        config_commands.extend([
             f"exit",
             f"interface port-channel {self.port_channel_number}",
             f"ip address {self.ip_address} {self.subnet_mask}"
-        ]
+        ])
 
         return "\n".join(config_commands)
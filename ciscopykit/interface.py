@@ -1,13 +1,19 @@
 import ipaddress
+import sys
 
-class Interface:
+class BaseInterface:
     """
     Represents a network interface.
 
+    Holds the behaviour shared by Interface and CompactInterface, which
+    differ only in how they store their attributes.
+
     Attributes:
         name (str): The name of the interface.
         ip_address (ipaddress.IPv4Interface or None): The IP address 
 assigned to the interface, if any.
+        packed_ip (tuple or None): The assigned address as an
+            (int address, prefixlen) pair, if any.
 
     Methods:
         assign_ip_address(ip_address): Assigns an IP address to the 
@@ -16,15 +22,13 @@ interface.
 interface.
     """
 
-    def __init__(self, name):
-        """
-        Initializes an Interface object.
+    __slots__ = ()
 
-        Args:
-            name (str): The name of the interface.
-        """
-        self.name = name
-        self.ip_address = None
+    @property
+    def packed_ip(self):
+        if self.ip_address is None:
+            return None
+        return int(self.ip_address), self.ip_address.network.prefixlen
 
     def assign_ip_address(self, ip_address):
         """
@@ -77,3 +81,60 @@ assign to the interface.
         else:
             return f"Interface: {self.name} | IP: Unassigned"
 
+
+class Interface(BaseInterface):
+    """
+    Represents a network interface storing its attributes in a
+    per-instance dictionary.
+    """
+
+    def __init__(self, name):
+        """
+        Initializes an Interface object.
+
+        Args:
+            name (str): The name of the interface.
+        """
+        self.name = name
+        self.ip_address = None
+
+
+class CompactInterface(BaseInterface):
+    """
+    Represents a network interface in compact storage mode.
+
+    Attributes live in slots, the name is interned, and the IP address is
+    kept as a single int packing the address and the prefix length. The
+    ipaddress.IPv4Interface object is only built when ip_address is read.
+    """
+
+    __slots__ = ("name", "_packed_ip")
+
+    def __init__(self, name):
+        """
+        Initializes a CompactInterface object.
+
+        Args:
+            name (str): The name of the interface.
+        """
+        self.name = sys.intern(name)
+        self._packed_ip = None
+
+    @property
+    def ip_address(self):
+        if self._packed_ip is None:
+            return None
+        return ipaddress.IPv4Interface((self._packed_ip >> 6, self._packed_ip & 0x3F))
+
+    @ip_address.setter
+    def ip_address(self, ip_address):
+        if ip_address is None:
+            self._packed_ip = None
+        else:
+            self._packed_ip = (int(ip_address) << 6) | ip_address.network.prefixlen
+
+    @property
+    def packed_ip(self):
+        if self._packed_ip is None:
+            return None
+        return self._packed_ip >> 6, self._packed_ip & 0x3F
@@ -0,0 +1,468 @@
+"""
+interface_range.py - Interface name parsing and range compression for CiscoPyKit.
+
+This module parses interface names, in full or abbreviated form, and collapses
+lists of interfaces into the fewest `interface range` statements, so that
+generators configure 384 ports with a handful of blocks instead of one block
+per port:
+
+    interface range GigabitEthernet1/0/1 - 48, GigabitEthernet2/0/1 - 48, ...
+
+Interfaces are grouped by type and by every number of their path but the
+last (slot and module), and the consecutive port numbers of each group form
+one range. An `interface range` statement takes at most a few ranges, 5 on
+IOS, so the ranges are then packed into as few statements as that limit
+allows. Subinterfaces (`Gi0/1.100`) are parsed too, but listed one by one in
+the statements.
+
+A PortSet holds interfaces the same way, as sorted run boundaries per group,
+so that "Gi1/0/1 - 48" takes two numbers rather than 48 ports. Union,
+intersection and difference merge the boundaries without expanding the
+ports, and a membership test is a binary search.
+
+Classes:
+    PortSet: A set of interfaces stored as runs of consecutive ports.
+
+Functions:
+    parse_interface(name): Parses an interface name into its type and path.
+    format_interface(interface): Returns the full name of a parsed interface.
+    parse_interface_range(text): Parses an interface name or range string.
+    compress_interfaces(interfaces, max_ranges=MAX_RANGES): Returns the arguments of
+        the fewest `interface range` statements covering interfaces.
+    interface_blocks(interfaces, commands, max_ranges=MAX_RANGES, indent=""): Returns
+        the configuration lines applying commands to interfaces.
+
+Usage Example:
+    ```
+    from ciscopykit.interface_range import PortSet, compress_interfaces, interface_blocks
+
+    ports = [f"Gi1/0/{port}" for port in range(1, 49)] + ["Gi2/0/1", "Gi2/0/2"]
+    print(compress_interfaces(ports))
+    # ['GigabitEthernet1/0/1 - 48, GigabitEthernet2/0/1 - 2']
+    print("\\n".join(interface_blocks(ports, ["spanning-tree bpduguard enable"])))
+
+    unused = PortSet("fa0/1 - 24") - PortSet("fa0/1 - 4, fa0/11 - 20")
+    print(unused)  # FastEthernet0/5 - 10, FastEthernet0/21 - 24
+    print("fa0/7" in unused)  # True
+    ```
+"""
+
+import bisect
+import re
+
+# The most ranges an `interface range` statement takes on IOS.
+MAX_RANGES = 5
+
+# Full interface types, in the order interfaces are sorted, with their abbreviations.
+# Abbreviations are matched first, so 'Tw' is TwoGigabitEthernet as on IOS-XE.
+INTERFACE_TYPES = (
+    ("FastEthernet", ("f", "fa")),
+    ("GigabitEthernet", ("g", "gi", "gig")),
+    ("TwoGigabitEthernet", ("tw", "two")),
+    ("FiveGigabitEthernet", ("fi", "five")),
+    ("TenGigabitEthernet", ("te", "ten")),
+    ("TwentyFiveGigE", ("twe",)),
+    ("FortyGigabitEthernet", ("fo",)),
+    ("HundredGigE", ("hu",)),
+    ("AppGigabitEthernet", ("ap",)),
+    ("Ethernet", ("e", "eth")),
+    ("Serial", ("s", "se")),
+    ("Port-channel", ("po", "portchannel")),
+    ("Vlan", ("vl",)),
+    ("Loopback", ("lo",)),
+    ("Tunnel", ("tu",)),
+)
+
+_ORDER = {name: number for number, (name, _) in enumerate(INTERFACE_TYPES)}
+_ALIASES = {alias: name for name, aliases in INTERFACE_TYPES for alias in aliases + (name.lower(),)}
+_NAME = re.compile(r"\s*([A-Za-z][A-Za-z-]*)\s*(\d+(?:/\d+)*(?:\.\d+)?)\s*$")
+_RANGE = re.compile(r"\s*([A-Za-z][A-Za-z-]*)\s*(\d+(?:/\d+)*(?:\.\d+)?)\s*(?:-\s*(\d+)\s*)?$")
+# Stands for the dot before a subinterface number in a parsed path.
+_SUBINTERFACE = -1
+
+
+def _parse_path(text):
+    port, _, subinterface = text.partition(".")
+    path = tuple(int(number) for number in port.split("/"))
+    return path + (_SUBINTERFACE, int(subinterface)) if subinterface else path
+
+
+def _interface_type(text):
+    """
+    Returns the full interface type of a full, abbreviated or unambiguous partial type.
+    """
+    lowered = text.lower()
+    name = _ALIASES.get(lowered)
+    if name is not None:
+        return name
+    matches = [name for name, _ in INTERFACE_TYPES if name.lower().startswith(lowered)]
+    if len(matches) != 1:
+        raise ValueError(f"Invalid interface type '{text}'.")
+    return matches[0]
+
+
+def parse_interface(name):
+    """
+    Parses an interface name into its type and path.
+
+    Args:
+        name (str): The interface name, e.g. "GigabitEthernet1/0/1", "Gi 1/0/1", "fa0/5" or
+            "Gi0/1.100".
+
+    Returns:
+        tuple: The full interface type and the tuple of the numbers of its path, e.g.
+            ("GigabitEthernet", (1, 0, 1)). The number of a subinterface follows a -1,
+            standing for the dot: "Gi0/1.100" is ("GigabitEthernet", (0, 1, -1, 100)).
+
+    Raises:
+        ValueError: If the name is not a valid interface name.
+    """
+    match = _NAME.match(name)
+    if not match:
+        raise ValueError(f"Invalid interface name '{name}'.")
+    return _interface_type(match.group(1)), _parse_path(match.group(2))
+
+
+def format_interface(interface):
+    """
+    Returns the full name of a parsed interface.
+
+    Args:
+        interface (tuple): The interface type and path, as returned by parse_interface().
+
+    Returns:
+        str: The full interface name, e.g. "GigabitEthernet1/0/1".
+    """
+    interface_type, path = interface
+    if len(path) > 2 and path[-2] == _SUBINTERFACE:
+        return f"{interface_type}{'/'.join(str(number) for number in path[:-2])}.{path[-1]}"
+    return interface_type + "/".join(str(number) for number in path)
+
+
+def _parse_runs(text):
+    """
+    Returns the (type, path prefix, first, last) runs of an interface name or range string.
+    """
+    runs = []
+    for part in text.split(","):
+        match = _RANGE.match(part)
+        if not match:
+            raise ValueError(f"Invalid interface range '{part.strip()}'.")
+        interface_type = _interface_type(match.group(1))
+        path = _parse_path(match.group(2))
+        last = path[-1] if match.group(3) is None else int(match.group(3))
+        if last < path[-1]:
+            raise ValueError(f"Invalid interface range '{part.strip()}': it ends before it starts.")
+        runs.append((interface_type, path[:-1], path[-1], last))
+    return runs
+
+
+def parse_interface_range(text):
+    """
+    Parses an interface name or an interface range string.
+
+    Args:
+        text (str): One interface name or comma-separated ranges, e.g.
+            "fa0/1 - 4, fa0/10", "GigabitEthernet1/0/1-24" or "Gi0/1.100 - 110".
+
+    Returns:
+        list: The (type, path) tuples of the interfaces, in the order of the text.
+
+    Raises:
+        ValueError: If a range is not valid or ends before it starts.
+    """
+    return [(interface_type, prefix + (number,))
+            for interface_type, prefix, first, last in _parse_runs(text) for number in range(first, last + 1)]
+
+
+def _normalize(interface):
+    """
+    Returns a parsed (type, path) interface with its type in full and its path a tuple.
+    """
+    try:
+        interface_type, path = interface
+        path = tuple(int(number) for number in path)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid parsed interface {interface!r}.") from None
+    if not path or not isinstance(interface_type, str):
+        raise ValueError(f"Invalid parsed interface {interface!r}.")
+    return _interface_type(interface_type), path
+
+
+def _combine(first, second, keep):
+    """
+    Returns the run boundaries of the ports kept from two lists of run boundaries.
+
+    Boundaries alternate between the first port of a run and the port after its last,
+    so a port is in a set when an odd number of the boundaries are at or below it.
+    """
+    boundaries = []
+    inside = in_first = in_second = False
+    i = j = 0
+    while i < len(first) or j < len(second):
+        if j == len(second) or (i < len(first) and first[i] <= second[j]):
+            point = first[i]
+        else:
+            point = second[j]
+        if i < len(first) and first[i] == point:
+            in_first = not in_first
+            i += 1
+        if j < len(second) and second[j] == point:
+            in_second = not in_second
+            j += 1
+        if keep(in_first, in_second) != inside:
+            inside = not inside
+            boundaries.append(point)
+    return boundaries
+
+
+class PortSet:
+    """
+    Represents a set of interfaces stored as runs of consecutive ports.
+
+    Each group of interfaces sharing a type and a path prefix (slot and module) is stored
+    as the sorted boundaries of its runs, so the size of a set grows with its number of
+    ranges, not of ports. PortSets are immutable: the set operations return new ones.
+
+    Methods:
+        runs(): Yields the (type, path prefix, first, last) runs in interface order.
+        ranges(): Returns the canonical range of each run.
+        union(other), intersection(other), difference(other): The set operations, also
+            available as |, & and -.
+    """
+
+    __slots__ = ("_groups",)
+
+    def __init__(self, interfaces=()):
+        """
+        Initialize a PortSet.
+
+        Args:
+            interfaces (str, PortSet or iterable, optional): An interface name or range
+                string, a PortSet to copy, or an iterable of names, range strings and parsed
+                (type, path) tuples (default: no interface).
+
+        Raises:
+            ValueError: If an interface is not valid.
+        """
+        if isinstance(interfaces, PortSet):
+            self._groups = {group: list(boundaries) for group, boundaries in interfaces._groups.items()}
+            return
+        if isinstance(interfaces, str):
+            interfaces = (interfaces,)
+        runs = {}
+        for interface in interfaces:
+            if isinstance(interface, str):
+                for interface_type, prefix, first, last in _parse_runs(interface):
+                    runs.setdefault((interface_type, prefix), []).append((first, last))
+            else:
+                interface_type, path = _normalize(interface)
+                runs.setdefault((interface_type, path[:-1]), []).append((path[-1], path[-1]))
+        self._groups = {}
+        for group, group_runs in runs.items():
+            group_runs.sort()
+            boundaries = []
+            for first, last in group_runs:
+                if boundaries and first <= boundaries[-1]:
+                    boundaries[-1] = max(boundaries[-1], last + 1)
+                else:
+                    boundaries.extend((first, last + 1))
+            self._groups[group] = boundaries
+
+    @classmethod
+    def _from_groups(cls, groups):
+        port_set = cls.__new__(cls)
+        port_set._groups = {group: boundaries for group, boundaries in groups.items() if boundaries}
+        return port_set
+
+    def _operation(self, other, keep):
+        if not isinstance(other, PortSet):
+            other = PortSet(other)
+        empty = []
+        return self._from_groups({
+            group: _combine(self._groups.get(group, empty), other._groups.get(group, empty), keep)
+            for group in self._groups.keys() | other._groups.keys()})
+
+    def union(self, other):
+        """
+        Returns the interfaces in either set.
+
+        Args:
+            other (PortSet, str or iterable): The other set, or the interfaces to build it from.
+
+        Returns:
+            PortSet: The union.
+        """
+        return self._operation(other, lambda in_first, in_second: in_first or in_second)
+
+    def intersection(self, other):
+        """
+        Returns the interfaces in both sets.
+
+        Args:
+            other (PortSet, str or iterable): The other set, or the interfaces to build it from.
+
+        Returns:
+            PortSet: The intersection.
+        """
+        return self._operation(other, lambda in_first, in_second: in_first and in_second)
+
+    def difference(self, other):
+        """
+        Returns the interfaces in this set but not in the other.
+
+        Args:
+            other (PortSet, str or iterable): The other set, or the interfaces to build it from.
+
+        Returns:
+            PortSet: The difference.
+        """
+        return self._operation(other, lambda in_first, in_second: in_first and not in_second)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def __contains__(self, interface):
+        """
+        Returns whether an interface is in the set, with a binary search of its group.
+
+        Args:
+            interface (str or tuple): The interface name or parsed (type, path) tuple.
+
+        Returns:
+            bool: Whether the interface is in the set.
+        """
+        interface_type, path = parse_interface(interface) if isinstance(interface, str) else _normalize(interface)
+        boundaries = self._groups.get((interface_type, path[:-1]))
+        return boundaries is not None and bisect.bisect_right(boundaries, path[-1]) % 2 == 1
+
+    def runs(self):
+        """
+        Yields the runs of the set in interface order.
+
+        Yields:
+            tuple: The (type, path prefix, first, last) of each run.
+        """
+        for group in sorted(self._groups, key=lambda group: (_ORDER[group[0]], group[1])):
+            boundaries = self._groups[group]
+            for index in range(0, len(boundaries), 2):
+                yield group[0], group[1], boundaries[index], boundaries[index + 1] - 1
+
+    def ranges(self):
+        """
+        Returns the canonical range of each run, e.g. "GigabitEthernet1/0/1 - 24".
+
+        Returns:
+            list: The ranges, in interface order.
+        """
+        ranges = []
+        for interface_type, prefix, first, last in self.runs():
+            name = format_interface((interface_type, prefix + (first,)))
+            ranges.append(name if first == last else f"{name} - {last}")
+        return ranges
+
+    def __iter__(self):
+        for interface_type, prefix, first, last in self.runs():
+            for number in range(first, last + 1):
+                yield interface_type, prefix + (number,)
+
+    def __len__(self):
+        return sum(boundaries[index + 1] - boundaries[index]
+                   for boundaries in self._groups.values() for index in range(0, len(boundaries), 2))
+
+    def __bool__(self):
+        return bool(self._groups)
+
+    def __eq__(self, other):
+        return isinstance(other, PortSet) and self._groups == other._groups
+
+    def __hash__(self):
+        return hash(frozenset((group, tuple(boundaries)) for group, boundaries in self._groups.items()))
+
+    def __str__(self):
+        return ", ".join(self.ranges())
+
+    def __repr__(self):
+        return f"PortSet({str(self)!r})"
+
+
+def compress_interfaces(interfaces, max_ranges=MAX_RANGES, strict=True):
+    """
+    Returns the arguments of the fewest `interface range` statements covering interfaces.
+
+    Args:
+        interfaces (PortSet or iterable): A PortSet, or interface names, range strings and
+            parsed (type, path) tuples, in any order; duplicates are ignored.
+        max_ranges (int, optional): The most ranges a statement takes on the platform
+            (default: MAX_RANGES).
+        strict (bool, optional): Reject the names that cannot be parsed. Otherwise they are
+            listed as written, one range each, after the others (default: True).
+
+    Returns:
+        list: The comma-separated ranges of each statement, e.g.
+            "GigabitEthernet1/0/1 - 24, GigabitEthernet1/0/30".
+
+    Raises:
+        ValueError: If an interface is not valid and strict is set, or max_ranges is less
+            than 1.
+    """
+    if max_ranges < 1:
+        raise ValueError("An interface range statement takes at least one range.")
+    unparsed = []
+    if not isinstance(interfaces, PortSet):
+        parsed = []
+        for interface in interfaces:
+            if not strict and isinstance(interface, str):
+                try:
+                    _parse_runs(interface)
+                except ValueError:
+                    if interface.strip() not in unparsed:
+                        unparsed.append(interface.strip())
+                    continue
+            parsed.append(interface)
+        interfaces = PortSet(parsed)
+    ranges = []
+    for interface_type, prefix, first, last in interfaces.runs():
+        if prefix[-1:] == (_SUBINTERFACE,):
+            # Listed one by one: not every platform takes ranges of subinterfaces.
+            ranges.extend(format_interface((interface_type, prefix + (number,))) for number in range(first, last + 1))
+        else:
+            name = format_interface((interface_type, prefix + (first,)))
+            ranges.append(name if first == last else f"{name} - {last}")
+    ranges.extend(unparsed)
+    return [", ".join(ranges[start:start + max_ranges]) for start in range(0, len(ranges), max_ranges)]
+
+
+def interface_blocks(interfaces, commands, max_ranges=MAX_RANGES, indent="", strict=True):
+    """
+    Returns the configuration lines applying commands to interfaces, with the fewest
+    `interface range` blocks.
+
+    A block covering a single interface is written `interface NAME`.
+
+    Args:
+        interfaces (PortSet or iterable): A PortSet, or interface names, range strings and
+            parsed (type, path) tuples.
+        commands (list): The interface configuration commands.
+        max_ranges (int, optional): The most ranges a statement takes on the platform
+            (default: MAX_RANGES).
+        indent (str, optional): The indentation of the commands (default: none).
+        strict (bool, optional): Reject the names that cannot be parsed. Otherwise they are
+            configured as written (default: True).
+
+    Returns:
+        list: The configuration lines.
+
+    Raises:
+        ValueError: If an interface is not valid and strict is set, or max_ranges is less
+            than 1.
+    """
+    lines = []
+    for statement in compress_interfaces(interfaces, max_ranges, strict):
+        if "," in statement or " - " in statement:
+            lines.append(f"interface range {statement}")
+        else:
+            lines.append(f"interface {statement}")
+        lines.extend(indent + command for command in commands)
+    return lines
@@ -0,0 +1,268 @@
+"""
+allocator.py - Buddy-system IPv4 subnet allocator for CiscoPyKit.
+
+This module provides a stateful IPAM allocator. Address space is handed to it as
+one or more parent blocks, and subnets of any prefix length are then allocated
+from and released back to it.
+
+Free space is kept buddy-style: one free list per prefix length, holding blocks
+aligned on their own size. An allocation takes the smallest free block that fits
+(best fit) and splits it down to the requested size, leaving the unused halves
+on the free lists. A release merges the block with its buddy, the other half of
+the same parent block, for as long as that buddy is free too. Both operations are
+O(log n), so tens of thousands of allocations and releases stay fast, and free
+space never fragments into blocks that could have been merged.
+
+Classes:
+    SubnetAllocator: A buddy-system allocator over one or more parent networks.
+
+Usage Example:
+    ```
+    from ciscopykit.ip.allocator import SubnetAllocator
+
+    allocator = SubnetAllocator(["10.0.0.0/16", "172.16.0.0/20"])
+    users = allocator.allocate(24)         # IPv4Network('10.0.0.0/24')
+    link = allocator.allocate(30)          # IPv4Network('10.0.1.0/30')
+    allocator.free(users)
+
+    state = allocator.snapshot()
+    restored = SubnetAllocator.restore(state)
+    ```
+"""
+
+import heapq
+from ipaddress import IPv4Network
+
+
+def _as_network(network):
+    return network if isinstance(network, IPv4Network) else IPv4Network(network)
+
+
+class SubnetAllocator:
+    """
+    A buddy-system allocator over one or more parent networks.
+
+    Attributes:
+        parents (list): The parent networks, in the order they were given.
+
+    Methods:
+        allocate(prefixlen): Allocates a subnet of the given prefix length.
+        reserve(network): Allocates a specific subnet.
+        free(network): Releases an allocated subnet.
+        allocated(): Returns the allocated subnets.
+        free_blocks(): Returns the free blocks.
+        largest_free_prefixlen(): Returns the prefix length of the largest free block.
+        snapshot(): Returns the state of the allocator.
+        restore(state): Builds an allocator from a snapshot.
+
+    Raises:
+        ValueError: If parent networks overlap.
+    """
+
+    def __init__(self, parents):
+        """
+        Initialize a SubnetAllocator.
+
+        Args:
+            parents (iterable): The parent networks, as IPv4Network objects or strings in
+                the format 'x.x.x.x/y'.
+
+        Raises:
+            ValueError: If no parent is given or parent networks overlap.
+        """
+        self.parents = [_as_network(parent) for parent in parents]
+        if not self.parents:
+            raise ValueError("At least one parent network is required.")
+        ordered = sorted(self.parents)
+        for previous, current in zip(ordered, ordered[1:]):
+            if previous.overlaps(current):
+                raise ValueError(f"Parent networks {previous} and {current} overlap.")
+
+        self._free = [set() for _ in range(33)]
+        self._heaps = [[] for _ in range(33)]
+        self._allocated = {}
+        self._roots = set()
+        for parent in self.parents:
+            block = (int(parent.network_address), parent.prefixlen)
+            self._roots.add(block)
+            self._push(*block)
+
+    def _push(self, start, prefixlen):
+        self._free[prefixlen].add(start)
+        heap = self._heaps[prefixlen]
+        heapq.heappush(heap, start)
+        if len(heap) > 2 * len(self._free[prefixlen]) + 64:
+            # Drop the entries of blocks that were merged away.
+            self._heaps[prefixlen] = sorted(self._free[prefixlen])
+
+    def _pop(self, prefixlen):
+        free, heap = self._free[prefixlen], self._heaps[prefixlen]
+        while heap:
+            start = heapq.heappop(heap)
+            if start in free:
+                free.remove(start)
+                return start
+        return None
+
+    def allocate(self, prefixlen):
+        """
+        Allocates a subnet of the given prefix length.
+
+        The smallest free block that fits is used, and the lowest one among blocks of
+        that size.
+
+        Args:
+            prefixlen (int): The prefix length of the subnet.
+
+        Returns:
+            IPv4Network: The allocated subnet.
+
+        Raises:
+            ValueError: If the prefix length is invalid or no free block is large enough.
+        """
+        if not 0 <= prefixlen <= 32:
+            raise ValueError("The prefix length must be between 0 and 32.")
+        for level in range(prefixlen, -1, -1):
+            if not self._free[level]:
+                continue
+            start = self._pop(level)
+            while level < prefixlen:
+                level += 1
+                self._push(start + (1 << (32 - level)), level)
+            self._allocated[start] = prefixlen
+            return IPv4Network((start, prefixlen))
+        raise ValueError(f"No free block is large enough for a /{prefixlen} subnet.")
+
+    def reserve(self, network):
+        """
+        Allocates a specific subnet, e.g. one that is already in use.
+
+        Args:
+            network (IPv4Network or str): The subnet to allocate.
+
+        Returns:
+            IPv4Network: The allocated subnet.
+
+        Raises:
+            ValueError: If the subnet is not entirely free.
+        """
+        network = _as_network(network)
+        start, prefixlen = int(network.network_address), network.prefixlen
+        for level in range(prefixlen, -1, -1):
+            block = start & ((0xFFFFFFFF << (32 - level)) & 0xFFFFFFFF)
+            if block not in self._free[level]:
+                continue
+            self._free[level].remove(block)
+            while level < prefixlen:
+                level += 1
+                half = 1 << (32 - level)
+                if start & half:
+                    self._push(block, level)
+                    block += half
+                else:
+                    self._push(block + half, level)
+            self._allocated[start] = prefixlen
+            return network
+        raise ValueError(f"{network} is not free.")
+
+    def free(self, network):
+        """
+        Releases an allocated subnet and merges it with its free buddies.
+
+        Args:
+            network (IPv4Network or str): The subnet to release.
+
+        Raises:
+            ValueError: If the subnet is not allocated.
+        """
+        network = _as_network(network)
+        start, prefixlen = int(network.network_address), network.prefixlen
+        if self._allocated.get(start) != prefixlen:
+            raise ValueError(f"{network} is not allocated.")
+        del self._allocated[start]
+        while (start, prefixlen) not in self._roots:
+            buddy = start ^ (1 << (32 - prefixlen))
+            if buddy not in self._free[prefixlen]:
+                break
+            self._free[prefixlen].remove(buddy)
+            start = min(start, buddy)
+            prefixlen -= 1
+        self._push(start, prefixlen)
+
+    def allocated(self):
+        """
+        Returns the allocated subnets.
+
+        Returns:
+            list: The allocated IPv4Network objects, sorted.
+        """
+        return [IPv4Network((start, self._allocated[start])) for start in sorted(self._allocated)]
+
+    def free_blocks(self):
+        """
+        Returns the free blocks.
+
+        Returns:
+            list: The free IPv4Network blocks, sorted.
+        """
+        return sorted(IPv4Network((start, prefixlen))
+                      for prefixlen, free in enumerate(self._free) for start in free)
+
+    def largest_free_prefixlen(self):
+        """
+        Returns the prefix length of the largest free block.
+
+        Returns:
+            int or None: The prefix length, or None when no space is left.
+        """
+        for prefixlen, free in enumerate(self._free):
+            if free:
+                return prefixlen
+        return None
+
+    @property
+    def total_addresses(self):
+        return sum(parent.num_addresses for parent in self.parents)
+
+    @property
+    def free_addresses(self):
+        return sum(len(free) << (32 - prefixlen) for prefixlen, free in enumerate(self._free))
+
+    @property
+    def allocated_addresses(self):
+        return self.total_addresses - self.free_addresses
+
+    def snapshot(self):
+        """
+        Returns the state of the allocator.
+
+        Free space is fully determined by the parents and the allocated subnets, so the
+        snapshot only records those. It is made of plain strings and lists and can be
+        stored as JSON.
+
+        Returns:
+            dict: The parents and allocated subnets in CIDR notation.
+        """
+        return {
+            "parents": [str(parent) for parent in self.parents],
+            "allocated": [str(network) for network in self.allocated()],
+        }
+
+    @classmethod
+    def restore(cls, state):
+        """
+        Builds an allocator from a snapshot.
+
+        Args:
+            state (dict): A state returned by snapshot().
+
+        Returns:
+            SubnetAllocator: The restored allocator.
+
+        Raises:
+            ValueError: If the allocated subnets overlap or fall outside the parents.
+        """
+        allocator = cls(state["parents"])
+        for network in state["allocated"]:
+            allocator.reserve(network)
+        return allocator
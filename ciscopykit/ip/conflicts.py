@@ -0,0 +1,401 @@
+"""
+conflicts.py - Fleet-wide duplicate and overlapping IP detection for CiscoPyKit.
+
+This module checks the addresses assigned to the active interfaces of a set of
+devices against each other. It reports:
+
+    duplicates  the same host address assigned to more than one interface
+    overlaps    two different subnets where one contains the other, such as a
+                /24 configured on one interface and a /30 carved out of it on
+                another. Interfaces sharing the very same subnet are a normal
+                shared segment and are not reported.
+
+Addresses are handled as integers. A full check sorts the address and network
+arrays once, using NumPy when it is installed, so it runs in O(n log n) instead
+of comparing interfaces pairwise. IPConflictDetector also keeps hash indexes of
+the addresses and networks, so that a single changed interface can be re-checked
+without re-running the full check.
+
+Classes:
+    DuplicateAddress: An address assigned to several interfaces.
+    PrefixOverlap: A subnet nested inside another configured subnet.
+    ConflictReport: The duplicates and overlaps found by a check.
+    IPConflictDetector: Incremental conflict detector over a set of devices.
+
+Functions:
+    find_ip_conflicts(devices): Runs a one-off check over devices.
+
+Usage Example:
+    ```
+    from ciscopykit.ip.conflicts import IPConflictDetector
+
+    detector = IPConflictDetector(registry)
+    report = detector.check()
+    for conflict in report.duplicates + report.overlaps:
+        print(conflict)
+
+    interface.assign_ip_address("10.0.0.1/24")
+    print(detector.update_interface(device, interface))
+    ```
+"""
+
+import bisect
+from ipaddress import IPv4Address, IPv4Network
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+_ALL_ONES = 0xFFFFFFFF
+
+
+def _netmask(prefixlen):
+    return (_ALL_ONES << (32 - prefixlen)) & _ALL_ONES
+
+
+class DuplicateAddress:
+    """
+    Represents an address assigned to several interfaces.
+
+    Attributes:
+        address (IPv4Address): The duplicated address.
+        interfaces (list): The (device, interface) pairs using it.
+    """
+
+    def __init__(self, address, interfaces):
+        self.address = address
+        self.interfaces = interfaces
+
+    def __str__(self):
+        users = ", ".join(f"{device.fqdn} {interface.name}" for device, interface in self.interfaces)
+        return f"Duplicate address {self.address}: {users}"
+
+
+class PrefixOverlap:
+    """
+    Represents a subnet nested inside another configured subnet.
+
+    Attributes:
+        network (IPv4Network): The enclosing network.
+        subnet (IPv4Network): The network nested inside it.
+        network_interfaces (list): The (device, interface) pairs on the enclosing network.
+        subnet_interfaces (list): The (device, interface) pairs on the nested network.
+    """
+
+    def __init__(self, network, subnet, network_interfaces, subnet_interfaces):
+        self.network = network
+        self.subnet = subnet
+        self.network_interfaces = network_interfaces
+        self.subnet_interfaces = subnet_interfaces
+
+    def __str__(self):
+        outer = ", ".join(f"{device.fqdn} {interface.name}" for device, interface in self.network_interfaces)
+        inner = ", ".join(f"{device.fqdn} {interface.name}" for device, interface in self.subnet_interfaces)
+        return f"Overlapping prefixes {self.network} ({outer}) and {self.subnet} ({inner})"
+
+
+class ConflictReport:
+    """
+    Represents the duplicates and overlaps found by a check.
+
+    Attributes:
+        duplicates (list): The DuplicateAddress conflicts.
+        overlaps (list): The PrefixOverlap conflicts.
+    """
+
+    def __init__(self, duplicates=None, overlaps=None):
+        self.duplicates = duplicates or []
+        self.overlaps = overlaps or []
+
+    def __bool__(self):
+        return bool(self.duplicates or self.overlaps)
+
+    def __str__(self):
+        if not self:
+            return "No IP conflicts found."
+        return "\n".join(str(conflict) for conflict in self.duplicates + self.overlaps)
+
+
+def _duplicate_groups(addresses):
+    """
+    Returns the groups of positions sharing the same address, found by sorting.
+    """
+    if np is not None:
+        values = np.asarray(addresses, dtype=np.uint32)
+        order = np.argsort(values, kind="stable")
+        ordered = values[order]
+        same = ordered[1:] == ordered[:-1]
+        if not same.any():
+            return []
+        starts = np.flatnonzero(same & ~np.concatenate(([False], same[:-1])))
+        groups = []
+        for start in starts.tolist():
+            end = start + 1
+            while end < len(same) and same[end]:
+                end += 1
+            groups.append(order[start:end + 1].tolist())
+        return groups
+
+    order = sorted(range(len(addresses)), key=addresses.__getitem__)
+    groups = []
+    run = order[:1]
+    for position in order[1:]:
+        if addresses[position] == addresses[run[0]]:
+            run.append(position)
+            continue
+        if len(run) > 1:
+            groups.append(run)
+        run = [position]
+    if len(run) > 1:
+        groups.append(run)
+    return groups
+
+
+def _nested_networks(networks):
+    """
+    Returns the (enclosing, nested) pairs among distinct networks.
+
+    Networks are (start, prefixlen) pairs. After sorting by start then prefix length, a
+    network overlaps an earlier one exactly when the running maximum of the earlier
+    broadcast addresses reaches its start. Only those networks are then matched
+    against their possible supernets.
+    """
+    if np is not None:
+        keys = np.unique(np.fromiter((start << 6 | prefixlen for start, prefixlen in networks),
+                                     dtype=np.int64, count=len(networks)))
+        starts = keys >> 6
+        prefixes = keys & 0x3F
+        ends = starts + (np.int64(1) << (32 - prefixes)) - 1
+        reach = np.maximum.accumulate(ends)
+        flagged = np.flatnonzero(starts[1:] <= reach[:-1]) + 1
+        candidates = [(int(starts[i]), int(prefixes[i])) for i in flagged.tolist()]
+        present = set(networks)
+    else:
+        ordered = sorted(set(networks))
+        present = set(ordered)
+        candidates = []
+        reach = -1
+        for start, prefixlen in ordered:
+            if start <= reach:
+                candidates.append((start, prefixlen))
+            reach = max(reach, start + (1 << (32 - prefixlen)) - 1)
+
+    pairs = []
+    for start, prefixlen in candidates:
+        for outer in range(prefixlen):
+            supernet = (start & _netmask(outer), outer)
+            if supernet in present:
+                pairs.append((supernet, (start, prefixlen)))
+    return pairs
+
+
+def _to_network(network):
+    return IPv4Network(network)
+
+
+def _check(entries):
+    """
+    Runs a full check over (device, interface, address, prefixlen) entries.
+    """
+    addresses = [entry[2] for entry in entries]
+    networks = [(address & _netmask(prefixlen), prefixlen) for _, _, address, prefixlen in entries]
+
+    duplicates = []
+    for group in _duplicate_groups(addresses):
+        duplicates.append(DuplicateAddress(IPv4Address(addresses[group[0]]),
+                                           [entries[i][:2] for i in group]))
+
+    pairs = _nested_networks(networks)
+    overlaps = []
+    if pairs:
+        involved = {network for pair in pairs for network in pair}
+        users = {network: [] for network in involved}
+        for entry, network in zip(entries, networks):
+            if network in users:
+                users[network].append(entry[:2])
+        for outer, inner in pairs:
+            overlaps.append(PrefixOverlap(_to_network(outer), _to_network(inner), users[outer], users[inner]))
+    return ConflictReport(duplicates, overlaps)
+
+
+def find_ip_conflicts(devices):
+    """
+    Runs a one-off check over the active interfaces of devices.
+
+    Args:
+        devices (iterable): The devices to check, e.g. a DeviceRegistry.
+
+    Returns:
+        ConflictReport: The duplicates and overlaps found.
+    """
+    entries = []
+    for device in devices:
+        for interface in device.get_active_interfaces():
+            packed_ip = interface.packed_ip
+            if packed_ip is not None:
+                entries.append((device, interface, *packed_ip))
+    return _check(entries)
+
+
+class IPConflictDetector:
+    """
+    Detects duplicate and overlapping addresses across a set of devices.
+
+    check() runs a full sorted check. The detector also indexes every address and
+    network, so update_interface() re-checks one changed interface against the rest of
+    the fleet with a few hash lookups and one binary search.
+
+    Methods:
+        add_device(device): Tracks the addressed interfaces of a device.
+        add_devices(devices): Tracks the addressed interfaces of several devices.
+        remove_device(device): Stops tracking the interfaces of a device.
+        update_interface(device, interface): Re-indexes and re-checks one interface.
+        remove_interface(interface): Stops tracking one interface.
+        check(): Runs a full check over every tracked interface.
+    """
+
+    def __init__(self, devices=None):
+        """
+        Initialize an IPConflictDetector.
+
+        Args:
+            devices (iterable, optional): The devices to track.
+        """
+        self._entries = {}
+        self._addresses = {}
+        self._networks = {}
+        self._sorted_networks = []
+        self.add_devices(devices or ())
+
+    def add_device(self, device):
+        """
+        Tracks the addressed interfaces of a device.
+
+        Args:
+            device (Device): The device to track.
+        """
+        self.add_devices((device,))
+
+    def add_devices(self, devices):
+        """
+        Tracks the addressed interfaces of several devices.
+
+        The new networks are sorted once and merged into the sorted networks, rather
+        than inserted one at a time.
+
+        Args:
+            devices (iterable): The devices to track.
+        """
+        new_networks = []
+        for device in devices:
+            for interface in device.get_active_interfaces():
+                self._index(device, interface, new_networks)
+        if new_networks:
+            self._sorted_networks.extend(new_networks)
+            self._sorted_networks.sort()
+
+    def remove_device(self, device):
+        """
+        Stops tracking the interfaces of a device.
+
+        Args:
+            device (Device): The device to forget.
+        """
+        for interface in device.get_active_interfaces():
+            self.remove_interface(interface)
+
+    def remove_interface(self, interface):
+        """
+        Stops tracking one interface.
+
+        Args:
+            interface (Interface): The interface to forget.
+        """
+        entry = self._entries.pop(id(interface), None)
+        if entry is None:
+            return
+        _, _, address, prefixlen = entry
+        network = (address & _netmask(prefixlen), prefixlen)
+        users = self._addresses[address]
+        del users[id(interface)]
+        if not users:
+            del self._addresses[address]
+        users = self._networks[network]
+        del users[id(interface)]
+        if not users:
+            del self._networks[network]
+            del self._sorted_networks[bisect.bisect_left(self._sorted_networks, network)]
+
+    def _index(self, device, interface, new_networks=None):
+        """
+        Indexes one interface. A network seen for the first time is appended to
+        new_networks, for the caller to sort, or inserted into the sorted networks.
+        """
+        packed_ip = interface.packed_ip
+        if packed_ip is None:
+            return
+        address, prefixlen = packed_ip
+        network = (address & _netmask(prefixlen), prefixlen)
+        entry = (device, interface, address, prefixlen)
+        self._entries[id(interface)] = entry
+        self._addresses.setdefault(address, {})[id(interface)] = entry
+        if network not in self._networks:
+            self._networks[network] = {}
+            if new_networks is None:
+                bisect.insort(self._sorted_networks, network)
+            else:
+                new_networks.append(network)
+        self._networks[network][id(interface)] = entry
+
+    def update_interface(self, device, interface):
+        """
+        Re-indexes one interface after its address changed and re-checks it.
+
+        Args:
+            device (Device): The device owning the interface.
+            interface (Interface): The changed interface.
+
+        Returns:
+            ConflictReport: The conflicts involving the interface.
+        """
+        self.remove_interface(interface)
+        self._index(device, interface)
+        entry = self._entries.get(id(interface))
+        if entry is None:
+            return ConflictReport()
+
+        _, _, address, prefixlen = entry
+        report = ConflictReport()
+        users = self._addresses[address]
+        if len(users) > 1:
+            report.duplicates.append(DuplicateAddress(IPv4Address(address),
+                                                      [user[:2] for user in users.values()]))
+
+        start = address & _netmask(prefixlen)
+        network = (start, prefixlen)
+        own_users = [user[:2] for user in self._networks[network].values()]
+        for outer in range(prefixlen):
+            supernet = (start & _netmask(outer), outer)
+            if supernet in self._networks:
+                report.overlaps.append(PrefixOverlap(
+                    _to_network(supernet), _to_network(network),
+                    [user[:2] for user in self._networks[supernet].values()], own_users))
+        end = start + (1 << (32 - prefixlen))
+        position = bisect.bisect_right(self._sorted_networks, network)
+        while position < len(self._sorted_networks) and self._sorted_networks[position][0] < end:
+            subnet = self._sorted_networks[position]
+            report.overlaps.append(PrefixOverlap(
+                _to_network(network), _to_network(subnet), own_users,
+                [user[:2] for user in self._networks[subnet].values()]))
+            position += 1
+        return report
+
+    def check(self):
+        """
+        Runs a full check over every tracked interface.
+
+        Returns:
+            ConflictReport: The duplicates and overlaps found.
+        """
+        return _check(list(self._entries.values()))
@@ -0,0 +1,195 @@
+"""
+planner.py - Host-count driven VLSM planning for CiscoPyKit.
+
+This module turns "this VLAN needs N hosts" requirements into subnets. Each
+host count is converted to the smallest prefix with enough usable addresses,
+then the subnets are packed largest first, best fit, into one or more parent
+networks through a SubnetAllocator. Because every block is aligned on its own
+size and allocated largest first, packing leaves no gaps between subnets.
+
+The resulting plan reports how well the space was used:
+
+    utilization      allocated addresses / parent addresses
+    host efficiency  requested hosts / usable addresses of the allocated subnets
+    fragmentation    1 - largest free block / free addresses, i.e. how much of
+                     the remaining space is unusable for one large subnet
+
+Classes:
+    PlannedSubnet: A requirement and the subnet assigned to it.
+    VLSMPlan: The subnets, unplaced requirements and metrics of a plan.
+
+Functions:
+    hosts_to_prefix(hosts): Returns the smallest prefix length holding a host count.
+    plan_vlsm(parents, requirements, strict=False): Plans subnets for host requirements.
+
+Usage Example:
+    ```
+    from ciscopykit.ip.planner import plan_vlsm
+
+    plan = plan_vlsm(["10.0.0.0/22", "10.8.0.0/24"],
+                     {"users": 300, "voice": 100, "printers": 20, "wan": 2})
+    for planned in plan.subnets:
+        print(planned.name, planned.network)
+    print(plan)
+    ```
+"""
+
+from ciscopykit.ip.allocator import SubnetAllocator
+
+
+def hosts_to_prefix(hosts):
+    """
+    Returns the smallest prefix length with enough usable addresses for a host count.
+
+    The network and broadcast addresses are not usable, so 2 hosts need a /30.
+
+    Args:
+        hosts (int): The number of hosts.
+
+    Returns:
+        int: The prefix length.
+
+    Raises:
+        ValueError: If the host count is below 1 or does not fit in an IPv4 network.
+    """
+    if hosts < 1:
+        raise ValueError("The host count must be at least 1.")
+    prefixlen = 32 - (hosts + 1).bit_length()
+    if prefixlen < 0:
+        raise ValueError(f"{hosts} hosts do not fit in an IPv4 network.")
+    return prefixlen
+
+
+class PlannedSubnet:
+    """
+    Represents a requirement and the subnet assigned to it.
+
+    Attributes:
+        name (str): The name of the requirement, e.g. a VLAN name.
+        hosts (int): The number of hosts required.
+        network (IPv4Network): The assigned subnet.
+    """
+
+    __slots__ = ("name", "hosts", "network")
+
+    def __init__(self, name, hosts, network):
+        self.name = name
+        self.hosts = hosts
+        self.network = network
+
+    @property
+    def usable_addresses(self):
+        return self.network.num_addresses - 2
+
+    def __repr__(self):
+        return f"<PlannedSubnet {self.name} {self.hosts} hosts {self.network}>"
+
+
+class VLSMPlan:
+    """
+    Represents the subnets, unplaced requirements and metrics of a plan.
+
+    Attributes:
+        subnets (list): The PlannedSubnet objects, in requirement order.
+        unplaced (list): The (name, hosts) requirements that did not fit.
+        allocator (SubnetAllocator): The allocator holding the plan, which can keep
+            allocating from the remaining space.
+    """
+
+    def __init__(self, subnets, unplaced, allocator):
+        self.subnets = subnets
+        self.unplaced = unplaced
+        self.allocator = allocator
+
+    @property
+    def total_addresses(self):
+        return self.allocator.total_addresses
+
+    @property
+    def allocated_addresses(self):
+        return self.allocator.allocated_addresses
+
+    @property
+    def free_addresses(self):
+        return self.allocator.free_addresses
+
+    @property
+    def requested_hosts(self):
+        return sum(planned.hosts for planned in self.subnets)
+
+    @property
+    def utilization(self):
+        return self.allocated_addresses / self.total_addresses
+
+    @property
+    def host_efficiency(self):
+        usable = sum(planned.usable_addresses for planned in self.subnets)
+        return self.requested_hosts / usable if usable else 0.0
+
+    @property
+    def fragmentation(self):
+        free = self.free_addresses
+        if not free:
+            return 0.0
+        largest = 1 << (32 - self.allocator.largest_free_prefixlen())
+        return 1 - largest / free
+
+    def by_name(self):
+        """
+        Returns the planned subnets by requirement name.
+
+        Returns:
+            dict: Maps each name to its IPv4Network.
+        """
+        return {planned.name: planned.network for planned in self.subnets}
+
+    def __str__(self):
+        return (f"{len(self.subnets)} subnets planned, {len(self.unplaced)} unplaced\n"
+                f"utilization: {self.utilization:.1%} of {self.total_addresses} addresses\n"
+                f"host efficiency: {self.host_efficiency:.1%}\n"
+                f"fragmentation: {self.fragmentation:.1%} of {self.free_addresses} free addresses")
+
+
+def plan_vlsm(parents, requirements, strict=False):
+    """
+    Plans subnets for host-count requirements across one or more parent networks.
+
+    Requirements are sorted by host count, largest first, and each one is given the
+    smallest free block that fits, the lowest parent first among equal blocks.
+
+    Args:
+        parents (iterable): The parent networks, as IPv4Network objects or strings in the
+            format 'x.x.x.x/y'.
+        requirements (dict or iterable): Maps names to host counts, or (name, hosts) pairs.
+        strict (bool, optional): Raise instead of reporting requirements that do not fit
+            (default: False).
+
+    Returns:
+        VLSMPlan: The plan.
+
+    Raises:
+        ValueError: If a host count is invalid, parent networks overlap, or strict is set
+            and a requirement does not fit.
+    """
+    if isinstance(requirements, dict):
+        requirements = requirements.items()
+    requirements = [(name, hosts, hosts_to_prefix(hosts)) for name, hosts in requirements]
+
+    allocator = SubnetAllocator(parents)
+    assigned = [None] * len(requirements)
+    unplaced = []
+    failed_prefixlen = -1
+    for position in sorted(range(len(requirements)), key=lambda i: requirements[i][2]):
+        name, hosts, prefixlen = requirements[position]
+        # Once a prefix length did not fit, no block of that size or larger will.
+        if prefixlen > failed_prefixlen:
+            try:
+                assigned[position] = PlannedSubnet(name, hosts, allocator.allocate(prefixlen))
+                continue
+            except ValueError:
+                failed_prefixlen = prefixlen
+        if strict:
+            raise ValueError(f"Requirement {name} ({hosts} hosts) does not fit in the parent networks.")
+        unplaced.append((name, hosts))
+
+    return VLSMPlan([planned for planned in assigned if planned is not None], unplaced, allocator)
@@ -0,0 +1,409 @@
+"""
+prefix_trie.py - Radix tree of IPv4 prefixes for CiscoPyKit.
+
+This module provides a path-compressed binary trie (a radix or Patricia tree)
+mapping IPv4 prefixes to values. It answers "which prefix contains this
+address?" by walking at most 32 levels, instead of scanning a list of
+IPv4Network objects, and also finds every prefix covering or covered by a
+given network.
+
+Prefixes are stored as (int address, prefix length) pairs. Nodes that only
+exist to branch carry no value and are removed again when they stop branching.
+
+Classes:
+    PrefixTrie: A radix tree mapping IPv4 prefixes to values.
+
+Functions:
+    connected_networks(devices): Indexes the connected networks of devices' interfaces.
+
+Usage Example:
+    ```
+    from ciscopykit.ip.prefix_trie import PrefixTrie
+
+    routes = PrefixTrie()
+    routes.insert("10.0.0.0/8", "core")
+    routes.insert("10.1.0.0/16", "site1")
+
+    routes.longest_match("10.1.2.3")        # (IPv4Network('10.1.0.0/16'), 'site1')
+    routes.covering("10.1.2.0/24")          # both prefixes
+    routes.covered("10.0.0.0/8")            # both prefixes
+    ```
+"""
+
+from ipaddress import IPv4Address, IPv4Network
+
+_ALL_ONES = 0xFFFFFFFF
+
+
+def _netmask(prefixlen):
+    return (_ALL_ONES << (32 - prefixlen)) & _ALL_ONES
+
+
+def _bit(address, position):
+    return (address >> (31 - position)) & 1
+
+
+def _common_length(first, second, limit):
+    difference = first ^ second
+    length = 32 - difference.bit_length() if difference else 32
+    return min(length, limit)
+
+
+def _as_prefix(network):
+    if isinstance(network, tuple):
+        return network
+    if not isinstance(network, IPv4Network):
+        network = IPv4Network(network)
+    return int(network.network_address), network.prefixlen
+
+
+def _as_address(address):
+    if isinstance(address, int):
+        return address
+    return int(address if isinstance(address, IPv4Address) else IPv4Address(address))
+
+
+class _Node:
+    __slots__ = ("prefix", "prefixlen", "value", "has_value", "children")
+
+    def __init__(self, prefix, prefixlen):
+        self.prefix = prefix
+        self.prefixlen = prefixlen
+        self.value = None
+        self.has_value = False
+        self.children = [None, None]
+
+
+class PrefixTrie:
+    """
+    A radix tree mapping IPv4 prefixes to values.
+
+    Networks can be given as IPv4Network objects, strings in the format 'x.x.x.x/y' or
+    (int address, prefix length) pairs; addresses as IPv4Address objects, strings or
+    ints. Results are (IPv4Network, value) pairs.
+
+    Methods:
+        insert(network, value=None): Inserts or replaces a prefix.
+        delete(network): Removes a prefix.
+        get(network, default=None): Returns the value of an exact prefix.
+        longest_match(address): Returns the most specific prefix containing an address.
+        covering(network): Returns the prefixes containing a network.
+        covered(network): Returns the prefixes contained in a network.
+        items(): Returns every prefix, in address order.
+        from_sorted(items): Builds a trie from (network, value) pairs sorted by network.
+        from_networks(networks): Builds a trie from networks.
+
+    Raises:
+        KeyError: If a prefix to delete or look up exactly is missing.
+    """
+
+    def __init__(self):
+        self._root = _Node(0, 0)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, network):
+        return self._find(_as_prefix(network)) is not None
+
+    def __getitem__(self, network):
+        node = self._find(_as_prefix(network))
+        if node is None:
+            raise KeyError(network)
+        return node.value
+
+    def __setitem__(self, network, value):
+        self.insert(network, value)
+
+    def __delitem__(self, network):
+        self.delete(network)
+
+    def __iter__(self):
+        for network, _ in self.items():
+            yield network
+
+    def _insert_from(self, path, prefix, prefixlen, value):
+        """
+        Inserts a prefix below the last node of path, which must contain it.
+
+        The nodes walked through are appended to path, which ends with the node holding
+        the prefix.
+        """
+        node = path[-1]
+        while node.prefixlen < prefixlen:
+            branch = _bit(prefix, node.prefixlen)
+            child = node.children[branch]
+            if child is None:
+                child = node.children[branch] = _Node(prefix, prefixlen)
+                node = child
+                path.append(node)
+                break
+            common = _common_length(child.prefix, prefix, min(child.prefixlen, prefixlen))
+            if common == child.prefixlen:
+                node = child
+                path.append(node)
+                continue
+            if common == prefixlen:
+                # The new prefix sits between node and child.
+                inserted = node.children[branch] = _Node(prefix, prefixlen)
+                inserted.children[_bit(child.prefix, prefixlen)] = child
+                node = inserted
+                path.append(node)
+                break
+            # The new prefix and child diverge below node: add a branching node.
+            fork = node.children[branch] = _Node(prefix & _netmask(common), common)
+            fork.children[_bit(child.prefix, common)] = child
+            leaf = fork.children[_bit(prefix, common)] = _Node(prefix, prefixlen)
+            node = leaf
+            path.append(fork)
+            path.append(node)
+            break
+        if not node.has_value:
+            self._size += 1
+        node.value = value
+        node.has_value = True
+
+    def insert(self, network, value=None):
+        """
+        Inserts a prefix, or replaces the value of an existing one.
+
+        Args:
+            network (IPv4Network, str or tuple): The prefix.
+            value (object, optional): The value stored with the prefix.
+        """
+        prefix, prefixlen = _as_prefix(network)
+        self._insert_from([self._root], prefix & _netmask(prefixlen), prefixlen, value)
+
+    def _find(self, key):
+        prefix, prefixlen = key
+        prefix &= _netmask(prefixlen)
+        node = self._root
+        while node is not None and node.prefixlen < prefixlen:
+            node = node.children[_bit(prefix, node.prefixlen)]
+            if node is not None and (prefix & _netmask(node.prefixlen)) != node.prefix:
+                return None
+        if node is None or node.prefixlen != prefixlen or not node.has_value or node.prefix != prefix:
+            return None
+        return node
+
+    def get(self, network, default=None):
+        """
+        Returns the value of an exact prefix.
+
+        Args:
+            network (IPv4Network, str or tuple): The prefix.
+            default (object, optional): Returned when the prefix is missing.
+
+        Returns:
+            object: The stored value, or default.
+        """
+        node = self._find(_as_prefix(network))
+        return default if node is None else node.value
+
+    def delete(self, network):
+        """
+        Removes a prefix.
+
+        Args:
+            network (IPv4Network, str or tuple): The prefix.
+
+        Raises:
+            KeyError: If the prefix is not in the trie.
+        """
+        prefix, prefixlen = _as_prefix(network)
+        prefix &= _netmask(prefixlen)
+        path = [self._root]
+        node = self._root
+        while node.prefixlen < prefixlen:
+            node = node.children[_bit(prefix, node.prefixlen)]
+            if node is None or (prefix & _netmask(node.prefixlen)) != node.prefix:
+                raise KeyError(network)
+            path.append(node)
+        if node.prefixlen != prefixlen or not node.has_value:
+            raise KeyError(network)
+        node.value = None
+        node.has_value = False
+        self._size -= 1
+
+        # Remove or splice out nodes that no longer hold a value or branch.
+        while len(path) > 1:
+            node = path.pop()
+            parent = path[-1]
+            if node.has_value:
+                break
+            children = [child for child in node.children if child is not None]
+            if len(children) == 2:
+                break
+            replacement = children[0] if children else None
+            parent.children[_bit(node.prefix, parent.prefixlen)] = replacement
+            if replacement is not None:
+                break
+
+    def longest_match(self, address):
+        """
+        Returns the most specific prefix containing an address.
+
+        Args:
+            address (IPv4Address, str or int): The address to look up.
+
+        Returns:
+            tuple or None: The (IPv4Network, value) pair, or None when no prefix matches.
+        """
+        address = _as_address(address)
+        node = self._root
+        best = None
+        while node is not None and (address & _netmask(node.prefixlen)) == node.prefix:
+            if node.has_value:
+                best = node
+            if node.prefixlen == 32:
+                break
+            node = node.children[_bit(address, node.prefixlen)]
+        if best is None:
+            return None
+        return IPv4Network((best.prefix, best.prefixlen)), best.value
+
+    def longest_match_many(self, addresses):
+        """
+        Looks up the most specific prefix of many addresses.
+
+        Args:
+            addresses (iterable): The addresses to look up.
+
+        Returns:
+            list: The (IPv4Network, value) pair, or None, of each address.
+        """
+        return [self.longest_match(address) for address in addresses]
+
+    def covering(self, network):
+        """
+        Returns the prefixes containing a network, including the network itself.
+
+        Args:
+            network (IPv4Network, str or tuple): The network.
+
+        Returns:
+            list: The (IPv4Network, value) pairs, from the least to the most specific.
+        """
+        prefix, prefixlen = _as_prefix(network)
+        prefix &= _netmask(prefixlen)
+        node = self._root
+        found = []
+        while node is not None and node.prefixlen <= prefixlen \
+                and (prefix & _netmask(node.prefixlen)) == node.prefix:
+            if node.has_value:
+                found.append((IPv4Network((node.prefix, node.prefixlen)), node.value))
+            if node.prefixlen == prefixlen:
+                break
+            node = node.children[_bit(prefix, node.prefixlen)]
+        return found
+
+    def covered(self, network):
+        """
+        Returns the prefixes contained in a network, including the network itself.
+
+        Args:
+            network (IPv4Network, str or tuple): The network.
+
+        Returns:
+            list: The (IPv4Network, value) pairs, in address order.
+        """
+        prefix, prefixlen = _as_prefix(network)
+        prefix &= _netmask(prefixlen)
+        node = self._root
+        while node is not None and node.prefixlen < prefixlen:
+            if (prefix & _netmask(node.prefixlen)) != node.prefix:
+                return []
+            node = node.children[_bit(prefix, node.prefixlen)]
+        if node is None or (node.prefix & _netmask(prefixlen)) != prefix:
+            return []
+        return list(self._walk(node))
+
+    @staticmethod
+    def _walk(node):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.has_value:
+                yield IPv4Network((node.prefix, node.prefixlen)), node.value
+            for child in reversed(node.children):
+                if child is not None:
+                    stack.append(child)
+
+    def items(self):
+        """
+        Returns every prefix, in address order, less specific prefixes first.
+
+        Returns:
+            list: The (IPv4Network, value) pairs.
+        """
+        return list(self._walk(self._root))
+
+    @classmethod
+    def from_sorted(cls, items):
+        """
+        Builds a trie from (network, value) pairs sorted by address then prefix length.
+
+        Each prefix is inserted from the deepest node of the previous insertion that
+        contains it, rather than from the root, so sorted input builds in close to
+        linear time.
+
+        Args:
+            items (iterable): The (network, value) pairs. Unsorted input is accepted but
+                loses the speedup.
+
+        Returns:
+            PrefixTrie: The trie.
+        """
+        trie = cls()
+        path = [trie._root]
+        for network, value in items:
+            prefix, prefixlen = _as_prefix(network)
+            prefix &= _netmask(prefixlen)
+            while len(path) > 1 and (path[-1].prefixlen > prefixlen
+                                     or (prefix & _netmask(path[-1].prefixlen)) != path[-1].prefix):
+                path.pop()
+            trie._insert_from(path, prefix, prefixlen, value)
+        return trie
+
+    @classmethod
+    def from_networks(cls, networks, value=None):
+        """
+        Builds a trie from networks, e.g. the subnets returned by ip.vlsm.
+
+        Args:
+            networks (iterable): The networks.
+            value (object, optional): The value stored with every network.
+
+        Returns:
+            PrefixTrie: The trie.
+        """
+        prefixes = sorted(_as_prefix(network) for network in networks)
+        return cls.from_sorted((prefix, value) for prefix in prefixes)
+
+
+def connected_networks(devices):
+    """
+    Indexes the connected networks of the active interfaces of devices.
+
+    Args:
+        devices (iterable): The devices, e.g. a DeviceRegistry.
+
+    Returns:
+        PrefixTrie: Maps each connected network to the list of (device, interface) pairs
+            attached to it.
+    """
+    trie = PrefixTrie()
+    for device in devices:
+        for interface in device.get_active_interfaces():
+            packed_ip = interface.packed_ip
+            if packed_ip is None:
+                continue
+            address, prefixlen = packed_ip
+            key = (address & _netmask(prefixlen), prefixlen)
+            attached = trie.get(key)
+            if attached is None:
+                trie.insert(key, [(device, interface)])
+            else:
+                attached.append((device, interface))
+    return trie
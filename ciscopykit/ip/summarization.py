@@ -0,0 +1,164 @@
+"""
+summarization.py - IPv4 prefix summarization for CiscoPyKit.
+
+This module reduces a list of prefixes to fewer, larger ones:
+
+    collapse_prefixes   the minimal set of prefixes covering exactly the same
+                        addresses; overlapping, duplicate and contiguous prefixes
+                        are merged
+    summarize           the same, then adjacent prefixes are merged further into
+                        a common supernet when at most a given share of that
+                        supernet is made of addresses outside the input
+
+Prefixes are handled as integers. After one sort, collapsing is a single linear
+pass and summarizing adds one binary search per merge, so 100k prefixes
+summarize in about a second.
+
+Functions:
+    range_to_prefixes(first, last, bits=32): Splits an inclusive range into aligned prefixes.
+    collapse_ranges(ranges): Merges overlapping and adjacent integer ranges.
+    collapse_prefixes(networks): Returns the minimal set of prefixes covering the networks.
+    summarize(networks, max_waste=0.0, min_prefixlen=0): Summarizes networks into supernets.
+
+Usage Example:
+    ```
+    from ciscopykit.ip.summarization import collapse_prefixes, summarize
+
+    collapse_prefixes(["10.0.0.0/24", "10.0.1.0/24", "10.0.1.128/25"])
+    # [IPv4Network('10.0.0.0/23')]
+
+    summarize(["10.0.0.0/24", "10.0.1.0/24", "10.0.2.0/24"], max_waste=0.25)
+    # [IPv4Network('10.0.0.0/22')]
+    ```
+"""
+
+import bisect
+from ipaddress import IPv4Network
+
+
+def _as_range(network):
+    if not isinstance(network, IPv4Network):
+        network = IPv4Network(network)
+    start = int(network.network_address)
+    return start, start + (1 << (32 - network.prefixlen)) - 1
+
+
+def range_to_prefixes(first, last, bits=32):
+    """
+    Splits an inclusive range of integers into the fewest aligned prefixes.
+
+    The same splitting applies to address ranges (bits=32) and to TCP/UDP port ranges
+    (bits=16).
+
+    Args:
+        first (int): The first value of the range.
+        last (int): The last value of the range.
+        bits (int, optional): The width of the values (default: 32).
+
+    Returns:
+        list: (value, prefixlen) pairs, in ascending order.
+
+    Raises:
+        ValueError: If the range is empty or does not fit in the given width.
+    """
+    if not 0 <= first <= last < 1 << bits:
+        raise ValueError(f"Invalid range {first}-{last} for {bits}-bit values.")
+    prefixes = []
+    while first <= last:
+        # The largest block aligned on first that does not run past last.
+        size = first & -first if first else 1 << bits
+        while size > last - first + 1:
+            size >>= 1
+        prefixes.append((first, bits - size.bit_length() + 1))
+        first += size
+    return prefixes
+
+
+def collapse_ranges(ranges):
+    """
+    Merges overlapping and adjacent inclusive integer ranges.
+
+    Args:
+        ranges (iterable): (first, last) pairs.
+
+    Returns:
+        list: The merged (first, last) pairs, sorted and disjoint.
+    """
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1][1] = last
+        else:
+            merged.append([first, last])
+    return [(first, last) for first, last in merged]
+
+
+def collapse_prefixes(networks):
+    """
+    Returns the minimal set of prefixes covering exactly the addresses of networks.
+
+    Args:
+        networks (iterable): IPv4Network objects or strings in the format 'x.x.x.x/y'.
+
+    Returns:
+        list: The IPv4Network objects, sorted.
+    """
+    return [IPv4Network(prefix) for prefix in _collapse(networks)]
+
+
+def _collapse(networks):
+    return [prefix
+            for first, last in collapse_ranges(_as_range(network) for network in networks)
+            for prefix in range_to_prefixes(first, last)]
+
+
+def summarize(networks, max_waste=0.0, min_prefixlen=0):
+    """
+    Summarizes networks into supernets, trading precision for fewer prefixes.
+
+    The networks are first collapsed exactly. Then, walking the prefixes in address
+    order, the last prefixes are replaced by their smallest common supernet whenever
+    the addresses of that supernet not covered by the input are at most max_waste of
+    its size. Summaries can absorb earlier summaries, so the result does not depend on
+    how the input was split.
+
+    Args:
+        networks (iterable): IPv4Network objects or strings in the format 'x.x.x.x/y'.
+        max_waste (float, optional): The largest share of a supernet that may be outside
+            the input, between 0 and 1 (default: 0.0, exact collapse).
+        min_prefixlen (int, optional): Never summarize into prefixes shorter than this
+            (default: 0).
+
+    Returns:
+        list: The IPv4Network objects, sorted and disjoint.
+
+    Raises:
+        ValueError: If max_waste is not between 0 and 1.
+    """
+    if not 0 <= max_waste <= 1:
+        raise ValueError("max_waste must be between 0 and 1.")
+
+    # Sorted, disjoint stack of prefixes, with the running total of the addresses of the
+    # input they cover, so the coverage of any suffix is one subtraction.
+    starts, prefixlens, totals = [], [], []
+    for start, prefixlen in _collapse(networks):
+        starts.append(start)
+        prefixlens.append(prefixlen)
+        totals.append((totals[-1] if totals else 0) + (1 << (32 - prefixlen)))
+        while len(starts) > 1:
+            last = starts[-1] + (1 << (32 - prefixlens[-1])) - 1
+            supernet_len = min(prefixlens[-2], 32 - (starts[-2] ^ last).bit_length())
+            if supernet_len < min_prefixlen:
+                break
+            supernet_start = starts[-2] & ((0xFFFFFFFF << (32 - supernet_len)) & 0xFFFFFFFF)
+            size = 1 << (32 - supernet_len)
+            first = bisect.bisect_left(starts, supernet_start)
+            covered = totals[-1] - (totals[first - 1] if first else 0)
+            if size - covered > max_waste * size:
+                break
+            del starts[first:], prefixlens[first:], totals[first:]
+            starts.append(supernet_start)
+            prefixlens.append(supernet_len)
+            totals.append((totals[-1] if totals else 0) + covered)
+    return [IPv4Network(prefix) for prefix in zip(starts, prefixlens)]
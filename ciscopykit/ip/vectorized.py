@@ -0,0 +1,277 @@
+"""
+vectorized.py - Vectorized IPv4 subnetting backend for CiscoPyKit.
+
+This module represents a batch of IPv4 networks as two parallel NumPy arrays,
+the uint32 network addresses and the uint8 prefix lengths. Splitting, host
+indexing, netmask and wildcard computation and containment tests then run as
+single array operations over thousands of networks, instead of one
+`ipaddress` call per network. IPv4Network objects and dotted strings are only
+built when they are asked for.
+
+NumPy is required by this module. Install it with `pip install numpy`, or
+`pip install ciscopykit[fast]`.
+
+Classes:
+    NetworkArray: A batch of IPv4 networks stored as parallel integer arrays.
+
+Functions:
+    format_addresses(addresses): Formats integer addresses as dotted strings.
+
+Usage Example:
+    ```
+    from ciscopykit.ip.vectorized import NetworkArray, format_addresses
+
+    blocks = NetworkArray.from_networks(["10.0.0.0/16", "10.1.0.0/16"])
+    vlans = blocks.split(24)                  # 512 networks
+    gateways = vlans.host(1)                  # uint32 array
+    print(format_addresses(gateways[:3]))     # ['10.0.0.1', '10.0.1.1', '10.0.2.1']
+    print(vlans[0], vlans.wildcards()[0])
+    ```
+"""
+
+from ipaddress import IPv4Network
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional for the package
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The vectorized backend requires NumPy. Install it with 'pip install numpy'.")
+
+
+def format_addresses(addresses):
+    """
+    Formats integer IPv4 addresses as dotted-quad strings.
+
+    Args:
+        addresses (array-like): The addresses as unsigned 32-bit integers.
+
+    Returns:
+        list: The dotted-quad strings.
+    """
+    _require_numpy()
+    addresses = np.asarray(addresses, dtype=np.uint32)
+    octets = [((addresses >> shift) & 0xFF).tolist() for shift in (24, 16, 8, 0)]
+    return [f"{a}.{b}.{c}.{d}" for a, b, c, d in zip(*octets)]
+
+
+class NetworkArray:
+    """
+    A batch of IPv4 networks stored as parallel integer arrays.
+
+    Attributes:
+        addresses (numpy.ndarray): The uint32 network addresses.
+        prefixes (numpy.ndarray): The uint8 prefix lengths.
+
+    Methods:
+        from_networks(networks): Builds an array from networks or CIDR strings.
+        netmasks(): Returns the netmasks.
+        wildcards(): Returns the wildcard (host) masks.
+        broadcasts(): Returns the broadcast addresses.
+        num_addresses(): Returns the number of addresses of each network.
+        host(index): Returns the index-th address of each network.
+        split(new_prefix): Splits every network into subnets.
+        contains(addresses): Tests each address against the matching network.
+        lookup(addresses): Finds the network containing each address.
+        to_networks(): Builds the IPv4Network objects.
+        to_strings(): Formats the networks in CIDR notation.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If a network has host bits set or a prefix length above 32.
+    """
+
+    def __init__(self, addresses, prefixes, validate=True):
+        """
+        Initialize a NetworkArray.
+
+        Args:
+            addresses (array-like): The network addresses as unsigned 32-bit integers.
+            prefixes (array-like or int): The prefix lengths, or one prefix length for all.
+            validate (bool, optional): Check prefix lengths and host bits (default: True).
+
+        Raises:
+            ImportError: If NumPy is not installed.
+            ValueError: If the arrays differ in length, a prefix length is above 32, or a
+                network has host bits set.
+        """
+        _require_numpy()
+        self.addresses = np.asarray(addresses, dtype=np.uint32).ravel()
+        self.prefixes = np.broadcast_to(np.asarray(prefixes, dtype=np.uint8), self.addresses.shape).copy()
+        if validate:
+            if self.prefixes.size and self.prefixes.max() > 32:
+                raise ValueError("Prefix lengths must be between 0 and 32.")
+            if np.any(self.addresses & ~self.netmasks()):
+                raise ValueError("Networks must not have host bits set.")
+
+    @classmethod
+    def from_networks(cls, networks):
+        """
+        Builds an array from networks or CIDR strings.
+
+        Args:
+            networks (iterable): IPv4Network objects or strings in the format 'x.x.x.x/y'.
+
+        Returns:
+            NetworkArray: The networks.
+        """
+        networks = [network if isinstance(network, IPv4Network) else IPv4Network(network)
+                    for network in networks]
+        return cls([int(network.network_address) for network in networks],
+                   [network.prefixlen for network in networks], validate=False)
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return IPv4Network((int(self.addresses[index]), int(self.prefixes[index])))
+        return NetworkArray(self.addresses[index], self.prefixes[index], validate=False)
+
+    def __iter__(self):
+        return iter(self.to_networks())
+
+    def __repr__(self):
+        return f"NetworkArray({len(self)} networks)"
+
+    def netmasks(self):
+        """
+        Returns the netmasks.
+
+        Returns:
+            numpy.ndarray: The uint32 netmasks.
+        """
+        shift = (32 - self.prefixes.astype(np.uint64))
+        return ((np.uint64(0xFFFFFFFF) << shift) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    def wildcards(self):
+        """
+        Returns the wildcard masks, as used by ACLs and routing network statements.
+
+        Returns:
+            numpy.ndarray: The uint32 wildcard masks.
+        """
+        return ~self.netmasks()
+
+    def broadcasts(self):
+        """
+        Returns the broadcast (last) addresses.
+
+        Returns:
+            numpy.ndarray: The uint32 broadcast addresses.
+        """
+        return self.addresses | self.wildcards()
+
+    def num_addresses(self):
+        """
+        Returns the number of addresses of each network.
+
+        Returns:
+            numpy.ndarray: The uint64 address counts.
+        """
+        return np.uint64(1) << (32 - self.prefixes.astype(np.uint64))
+
+    def host(self, index):
+        """
+        Returns the index-th address of each network, like IPv4Network[index].
+
+        Args:
+            index (int or array-like): The address index, or one index per network.
+                Negative indexes count from the broadcast address.
+
+        Returns:
+            numpy.ndarray: The uint32 addresses.
+
+        Raises:
+            IndexError: If an index is out of range for its network.
+        """
+        index = np.broadcast_to(np.asarray(index, dtype=np.int64), self.addresses.shape)
+        sizes = self.num_addresses().astype(np.int64)
+        index = np.where(index < 0, sizes + index, index)
+        if np.any((index < 0) | (index >= sizes)):
+            raise IndexError("Address index out of range.")
+        return (self.addresses.astype(np.int64) + index).astype(np.uint32)
+
+    def split(self, new_prefix):
+        """
+        Splits every network into subnets, like IPv4Network.subnets(new_prefix=...).
+
+        The subnets of each network are consecutive in the result, in network order.
+
+        Args:
+            new_prefix (int or array-like): The prefix length of the subnets, or one per
+                network.
+
+        Returns:
+            NetworkArray: The subnets.
+
+        Raises:
+            ValueError: If a new prefix is shorter than its network's prefix or above 32.
+        """
+        new_prefix = np.broadcast_to(np.asarray(new_prefix, dtype=np.int64), self.prefixes.shape)
+        if np.any((new_prefix < self.prefixes) | (new_prefix > 32)):
+            raise ValueError("New prefix lengths must be between the network prefix length and 32.")
+        counts = np.int64(1) << (new_prefix - self.prefixes)
+        total = int(counts.sum())
+        firsts = np.repeat(np.cumsum(counts) - counts, counts)
+        steps = np.repeat(np.int64(1) << (32 - new_prefix), counts)
+        addresses = np.repeat(self.addresses.astype(np.int64), counts) + (np.arange(total) - firsts) * steps
+        return NetworkArray(addresses.astype(np.uint32), np.repeat(new_prefix, counts), validate=False)
+
+    def contains(self, addresses):
+        """
+        Tests each address against the network at the same position.
+
+        Args:
+            addresses (array-like or int): The addresses, one per network or one for all.
+
+        Returns:
+            numpy.ndarray: A boolean array.
+        """
+        addresses = np.asarray(addresses, dtype=np.uint32)
+        return (addresses & self.netmasks()) == self.addresses
+
+    def lookup(self, addresses):
+        """
+        Finds the network containing each address.
+
+        The networks must not overlap; use a prefix trie for nested networks.
+
+        Args:
+            addresses (array-like): The addresses to look up.
+
+        Returns:
+            numpy.ndarray: The int64 position of the containing network of each address,
+                or -1 when no network contains it.
+        """
+        addresses = np.asarray(addresses, dtype=np.uint32)
+        if not len(self):
+            return np.full(addresses.shape, -1, dtype=np.int64)
+        order = np.argsort(self.addresses, kind="stable")
+        position = np.searchsorted(self.addresses[order], addresses, side="right") - 1
+        candidate = order[np.maximum(position, 0)]
+        found = (position >= 0) & (addresses <= self.broadcasts()[candidate])
+        return np.where(found, candidate, -1).astype(np.int64)
+
+    def to_networks(self):
+        """
+        Builds the IPv4Network objects.
+
+        Returns:
+            list: The IPv4Network objects.
+        """
+        return [IPv4Network((address, prefix))
+                for address, prefix in zip(self.addresses.tolist(), self.prefixes.tolist())]
+
+    def to_strings(self):
+        """
+        Formats the networks in CIDR notation.
+
+        Returns:
+            list: The 'x.x.x.x/y' strings.
+        """
+        return [f"{address}/{prefix}"
+                for address, prefix in zip(format_addresses(self.addresses), self.prefixes.tolist())]
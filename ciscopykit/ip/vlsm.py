@@ -10,8 +10,13 @@ Functions:
     vlsm(network: str, new_prefixes: List[int]) -> List[ipaddress.IPv4Network]:
         Performs Variable Length Subnet Masking (VLSM) on an IPv4 network.
 
-    subnet(network: str, subnet_count: int) -> List[ipaddress.IPv4Network]:
-        Performs subnetting on an IPv4 network.
+    subnet(network: str, subnet_count: int, lazy: bool = False) -> List[ipaddress.IPv4Network]:
+        Performs subnetting on an IPv4 network. With lazy=True, returns a SubnetRange
+        that computes each subnet on access instead of building the whole list.
+
+Classes:
+    SubnetRange: A lazy sequence of the equal-sized subnets of a network, with O(1)
+        length, indexing and slicing.
 
 Usage Example:
     ```
@@ -42,14 +47,20 @@ customize the prefix lengths for each subnet or specify the number of subnets th
 """
 
 import argparse
+from collections.abc import Sequence
 from ipaddress import IPv4Network
 from math import log2
-from typing import List
+from typing import Iterator, List, Optional, Union
+
+from ciscopykit.ip.allocator import SubnetAllocator
 
 def vlsm(network: IPv4Network, new_prefixes: List[int]) -> List[IPv4Network]:
     """
     Performs VLSM (Variable Length Subnet Masking) on an IPv4 network.
 
+    Subnets are allocated largest first from a SubnetAllocator, so each one takes the
+    smallest free block that fits and no space is skipped between them.
+
     Args:
         network (IPv4Network): The IPv4 network in the format 'x.x.x.x/y'.
         new_prefixes (List[int]): The list of new prefix lengths for each subnet in the network.
@@ -61,6 +72,7 @@ def vlsm(network: IPv4Network, new_prefixes: List[int]) -> List[IPv4Network]:
         ValueError: If the new_prefixes list is empty.
         ValueError: If any of the new prefixes is not greater than the original prefix.
         ValueError: If any of the new prefixes is greater than 32 or less than the original prefix.
+        ValueError: If the network is too small for all the subnets.
     """
     if not new_prefixes:
         raise ValueError("The new_prefixes list cannot be empty.")
@@ -71,30 +83,113 @@ def vlsm(network: IPv4Network, new_prefixes: List[int]) -> List[IPv4Network]:
     if any(new_prefix > 32 or new_prefix < network.prefixlen for new_prefix in new_prefixes):
         raise ValueError("New prefix lengths must be between the original prefix length and 32.")
 
-    subnets = []
-    new_prefixes.sort()
-
-    subnet_list = network.subnets(new_prefix=new_prefixes[0])
-    subnets.append(subnet_list.__next__())
-    new_prefixes.pop(0)
+    allocator = SubnetAllocator([network])
+    return [allocator.allocate(new_prefix) for new_prefix in sorted(new_prefixes)]
 
-    for each_netmask in new_prefixes:
-        next_subnet = subnet_list.__next__()
-        to_add = next_subnet.subnets(new_prefix=each_netmask)
-        subnets.append(to_add.__next__())
-
-    return subnets
+class SubnetRange(Sequence):
+    """
+    A lazy, read-only sequence of the equal-sized subnets of an IPv4 network.
+
+    Subnets are computed from integer arithmetic when they are accessed, so the
+    length, indexing, slicing and membership tests are O(1) and iterating holds
+    one IPv4Network at a time, however many subnets the range spans.
+
+    Attributes:
+        network (IPv4Network): The network being split.
+        new_prefix (int): The prefix length of the subnets.
+        size (int): The number of subnets in the range, as len().
+
+    Usage Example:
+        ```
+        subnets = SubnetRange(IPv4Network("10.0.0.0/8"), 30)
+        len(subnets)          # 4194304
+        subnets[5]            # IPv4Network('10.0.0.20/30')
+        subnets[-1]           # IPv4Network('10.255.255.252/30')
+        subnets[10:20:2]      # SubnetRange of 5 subnets
+        ```
+    """
 
-def subnet(network: IPv4Network, subnet_count: int) -> List[IPv4Network]:
+    def __init__(self, network: IPv4Network, new_prefix: int, indices: Optional[range] = None):
+        """
+        Initialize a SubnetRange.
+
+        Args:
+            network (IPv4Network): The network to split.
+            new_prefix (int): The prefix length of the subnets.
+            indices (range, optional): The subnet numbers covered by the range. Defaults to
+                every subnet of the network.
+
+        Raises:
+            ValueError: If new_prefix is not between the network prefix length and 32.
+        """
+        if not network.prefixlen <= new_prefix <= 32:
+            raise ValueError("The new prefix must be between the network prefix length and 32.")
+        self.network = network
+        self.new_prefix = new_prefix
+        self._base = int(network.network_address)
+        self._block = 1 << (32 - new_prefix)
+        self._indices = indices if indices is not None else range(1 << (new_prefix - network.prefixlen))
+
+    @property
+    def size(self) -> int:
+        return len(self._indices)
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SubnetRange(self.network, self.new_prefix, self._indices[index])
+        try:
+            number = self._indices[index]
+        except IndexError:
+            raise IndexError("SubnetRange index out of range.") from None
+        return IPv4Network((self._base + number * self._block, self.new_prefix))
+
+    def __iter__(self) -> Iterator[IPv4Network]:
+        base, block, new_prefix = self._base, self._block, self.new_prefix
+        for number in self._indices:
+            yield IPv4Network((base + number * block, new_prefix))
+
+    def __reversed__(self) -> Iterator[IPv4Network]:
+        return iter(self[::-1])
+
+    def _number(self, candidate) -> Optional[int]:
+        if not isinstance(candidate, IPv4Network) or candidate.prefixlen != self.new_prefix:
+            return None
+        offset = int(candidate.network_address) - self._base
+        if offset < 0 or offset % self._block:
+            return None
+        return offset // self._block
+
+    def __contains__(self, candidate) -> bool:
+        number = self._number(candidate)
+        return number is not None and number in self._indices
+
+    def index(self, candidate) -> int:
+        number = self._number(candidate)
+        if number is None or number not in self._indices:
+            raise ValueError(f"{candidate} is not in the subnet range.")
+        return self._indices.index(number)
+
+    def count(self, candidate) -> int:
+        return 1 if candidate in self else 0
+
+    def __repr__(self) -> str:
+        return f"SubnetRange({self.network!r}, {self.new_prefix}, {self._indices!r})"
+
+def subnet(network: IPv4Network, subnet_count: int, lazy: bool = False) -> Union[List[IPv4Network], SubnetRange]:
     """
     Performs subnetting on an IPv4 network.
 
     Args:
         network (IPv4Network): The IPv4 network in the format 'x.x.x.x/y'.
         subnet_count (int): The number of subnets to create.
+        lazy (bool, optional): Return a SubnetRange computing subnets on access instead of
+            a list. Defaults to False.
 
     Returns:
-        List[IPv4Network]: The list of subnets created by the subnetting process.
+        List[IPv4Network] or SubnetRange: The subnets created by the subnetting process.
 
     Raises:
         ValueError: If the subnet_count is not a positive integer.
@@ -107,12 +202,12 @@ def subnet(network: IPv4Network, subnet_count: int) -> List[IPv4Network]:
     if subnet_count > max_subnets:
         raise ValueError(f"The subnet_count cannot be greater than {max_subnets} for this network.")
 
-    subnets = []
     pref_diff = log2(subnet_count).__ceil__()
-    nextworks = network.subnets(prefixlen_diff=pref_diff)
-    subnets.extend(nextworks)
+    subnets = SubnetRange(network, network.prefixlen + pref_diff)
+    if lazy:
+        return subnets
 
-    return subnets
+    return list(subnets)
 
 def parse_args():
     """
@@ -141,10 +236,10 @@ def main():
     else:
         if not args.subnet_count:
             raise ValueError("For subnetting, subnet-count argument is required.")
-        result = subnet(args.network, args.subnet_count)
+        result = subnet(args.network, args.subnet_count, lazy=True)
 
-    for subnet in result:
-        print(subnet)
+    for each_subnet in result:
+        print(each_subnet)
 
 if __name__ == "__main__":
     main()
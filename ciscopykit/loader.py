@@ -0,0 +1,394 @@
+"""
+loader.py - Streaming inventory loader for CiscoPyKit.
+
+This module builds Device and Interface objects from CSV or JSONL inventory
+exports. Files are read row by row, so memory stays bounded by the devices
+being built rather than by the size of the export, and reading stops as soon
+as a row limit or a site filter makes the rest of the file irrelevant.
+
+Each row describes one interface of a device:
+
+    device_type,hostname,site,layer,interface,ip_address
+    L2 Switch,sw1,site1,Access,GigabitEthernet0/1,10.0.0.2/24
+
+JSONL rows are objects with the same keys. The interface and ip_address
+fields may be empty for devices without interfaces or for unaddressed ports.
+The rows of a device are expected to be consecutive; a device whose rows are
+split across the file is merged back together by load_inventory().
+
+Rows are validated in batches. Invalid rows are reported as RowError records
+and skipped, and loading carries on with the next row.
+
+Classes:
+    RowError: A row that could not be loaded.
+    LoadResult: The devices and errors of a load.
+    InventoryLoader: Streams Device objects out of an export.
+
+Functions:
+    iter_rows(source, file_format=None, site=None): Yields the raw rows of an export.
+    iter_devices(source, **options): Yields the devices of an export as they are completed.
+    load_inventory(source, registry=None, **options): Loads an export into a DeviceRegistry.
+
+Usage Example:
+    ```
+    from ciscopykit.loader import load_inventory
+
+    result = load_inventory("inventory.csv", site="site1")
+    for error in result.errors:
+        print(error)
+    switches = result.registry.find(device_type="L2 Switch")
+    ```
+"""
+
+import csv
+import ipaddress
+import json
+import os
+
+from ciscopykit.device import DEVICE_CLASSES, CompactDevice, DeviceRegistry
+from ciscopykit.interface import CompactInterface, Interface
+
+REQUIRED_FIELDS = ("device_type", "hostname", "site", "layer")
+
+
+class RowError:
+    """
+    Represents a row that could not be loaded.
+
+    Attributes:
+        line_number (int): The line of the row in the source file.
+        row (dict or str): The raw row, or the raw line if it could not be parsed.
+        message (str): Why the row was rejected.
+    """
+
+    def __init__(self, line_number, row, message):
+        self.line_number = line_number
+        self.row = row
+        self.message = message
+
+    def __str__(self):
+        return f"line {self.line_number}: {self.message}"
+
+    def __repr__(self):
+        return f"RowError(line_number={self.line_number}, message={self.message!r})"
+
+
+class LoadResult:
+    """
+    Represents the outcome of a load_inventory() call.
+
+    Attributes:
+        registry (DeviceRegistry): The loaded devices.
+        errors (list): The RowError records of the rejected rows.
+        rows_read (int): The number of data rows read from the source.
+    """
+
+    def __init__(self, registry, errors, rows_read):
+        self.registry = registry
+        self.errors = errors
+        self.rows_read = rows_read
+
+    @property
+    def devices(self):
+        return self.registry.devices
+
+
+def _detect_format(source, file_format):
+    if file_format is not None:
+        file_format = file_format.lower()
+    else:
+        name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+        file_format = os.path.splitext(os.fspath(name))[1].lstrip(".").lower()
+        if file_format == "ndjson":
+            file_format = "jsonl"
+    if file_format not in ("csv", "jsonl"):
+        raise ValueError("Unsupported inventory format. Use 'csv' or 'jsonl'.")
+    return file_format
+
+
+def _read_csv(lines):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _read_jsonl(lines, site=None):
+    # The site name as it appears inside a JSON string, with or without non-ASCII
+    # characters escaped, and without quotes, since the value may be padded.
+    needles = {json.dumps(site)[1:-1], json.dumps(site, ensure_ascii=False)[1:-1]} if site is not None else None
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        # A line that does not even contain the site name cannot match the
+        # filter, so it is counted but never decoded.
+        if needles is not None and not any(needle in line for needle in needles):
+            yield line_number, None
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield line_number, RowError(line_number, line.rstrip("\n"), f"Invalid JSON: {error}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, RowError(line_number, row, "Row must be a JSON object.")
+            continue
+        yield line_number, row
+
+
+def iter_rows(source, file_format=None, site=None):
+    """
+    Yields the raw rows of an inventory export.
+
+    Args:
+        source (str, os.PathLike or file): The path of the export, or an open text file.
+        file_format (str, optional): 'csv' or 'jsonl'. Detected from the file extension
+            when omitted.
+        site (str, optional): Lets the JSONL reader skip lines that cannot belong to this
+            site without decoding them. Such lines are yielded as None.
+
+    Yields:
+        tuple: The line number and the row dictionary. The row is a RowError when the
+            line could not be parsed.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    file_format = _detect_format(source, file_format)
+    if hasattr(source, "read"):
+        lines = source
+        handle = None
+    else:
+        handle = lines = open(source, newline="", encoding="utf-8")
+    try:
+        if file_format == "csv":
+            yield from _read_csv(lines)
+        else:
+            yield from _read_jsonl(lines, site)
+    finally:
+        if handle is not None:
+            handle.close()
+
+
+def _validate(line_number, row):
+    """
+    Validates and normalizes one raw row.
+
+    Returns:
+        tuple or RowError: The normalized (device_type, hostname, site, layer, interface,
+            ip_address) fields, or the reason the row is rejected.
+    """
+    fields = []
+    for field in REQUIRED_FIELDS:
+        value = row.get(field)
+        value = value.strip() if isinstance(value, str) else value
+        if not value:
+            return RowError(line_number, row, f"Missing required field '{field}'.")
+        fields.append(value)
+    if fields[0] not in DEVICE_CLASSES:
+        return RowError(line_number, row, f"Unknown device type '{fields[0]}'.")
+
+    optional = []
+    for field in ("interface", "ip_address"):
+        value = row.get(field) or ""
+        if not isinstance(value, str):
+            return RowError(line_number, row, f"Field '{field}' must be a string.")
+        optional.append(value.strip())
+    interface, ip_address = optional
+    if ip_address:
+        if not interface:
+            return RowError(line_number, row, "An IP address requires an interface name.")
+        try:
+            ip_address = ipaddress.IPv4Interface(ip_address)
+        except ValueError:
+            return RowError(line_number, row, f"Invalid IP address '{ip_address}'.")
+    return (*fields, interface, ip_address or None)
+
+
+def _validate_batch(batch):
+    return [(line_number, row, _validate(line_number, row)) for line_number, row in batch]
+
+
+class InventoryLoader:
+    """
+    Streams Device objects out of an inventory export.
+
+    Iterating over the loader yields each device as soon as the first row of the next
+    device is read, so only the device being built is held in memory.
+
+    Attributes:
+        errors (list): The RowError records of the rows rejected so far.
+        rows_read (int): The number of data rows read so far.
+
+    Methods:
+        load(registry=None): Loads the export into a DeviceRegistry.
+    """
+
+    def __init__(self, source, file_format=None, limit=None, site=None, site_contiguous=False,
+                 batch_size=1000, compact=False):
+        """
+        Initialize an InventoryLoader.
+
+        Args:
+            source (str, os.PathLike or file): The path of the export, or an open text file.
+            file_format (str, optional): 'csv' or 'jsonl'. Detected from the file extension
+                when omitted.
+            limit (int, optional): Stop after reading this many data rows.
+            site (str, optional): Only load the rows of this site.
+            site_contiguous (bool, optional): The rows of a site are consecutive in the
+                export, so reading stops at the end of the selected site (default: False).
+            batch_size (int, optional): The number of rows validated at a time
+                (default: 1000).
+            compact (bool, optional): Build CompactDevice and CompactInterface objects
+                (default: False).
+
+        Raises:
+            ValueError: If the format is not supported or batch_size is not positive.
+        """
+        if batch_size <= 0:
+            raise ValueError("The batch_size must be a positive integer.")
+        self.source = source
+        self.file_format = _detect_format(source, file_format)
+        self.limit = limit
+        self.site = site
+        self.site_contiguous = site_contiguous
+        self.batch_size = batch_size
+        self.compact = compact
+        self.errors = []
+        self.rows_read = 0
+        self._device = None
+        # The (line number, row) of the first row of the device being built and of each
+        # of its interfaces, to report the rows rejected when devices are merged.
+        self._device_row = None
+        self._interface_rows = {}
+
+    def __iter__(self):
+        batch = []
+        seen_site = False
+        for line_number, row in iter_rows(self.source, self.file_format, self.site):
+            if self.limit is not None and self.rows_read >= self.limit:
+                break
+            self.rows_read += 1
+            if row is None:
+                continue
+            if isinstance(row, RowError):
+                self.errors.append(row)
+                continue
+            if self.site is not None:
+                row_site = row.get("site")
+                row_site = row_site.strip() if isinstance(row_site, str) else row_site
+                if row_site != self.site:
+                    if seen_site and self.site_contiguous:
+                        break
+                    continue
+                seen_site = True
+            batch.append((line_number, row))
+            if len(batch) >= self.batch_size:
+                yield from self._build(_validate_batch(batch))
+                batch = []
+        if batch:
+            yield from self._build(_validate_batch(batch))
+        if self._device is not None:
+            yield self._device
+            self._device = None
+
+    def _build(self, validated):
+        """
+        Builds the objects of a validated batch, yielding every completed device.
+        """
+        interface_class = CompactInterface if self.compact else Interface
+        for line_number, row, fields in validated:
+            if isinstance(fields, RowError):
+                self.errors.append(fields)
+                continue
+            device_type, hostname, site, layer, interface_name, ip_address = fields
+            device = self._device
+            if device is None or device.hostname != hostname or device.site != site:
+                if device is not None:
+                    yield device
+                if self.compact:
+                    device = CompactDevice(device_type, hostname, site, layer)
+                else:
+                    device = DEVICE_CLASSES[device_type](hostname, site, layer)
+                self._device = device
+                self._device_row = (line_number, row)
+                self._interface_rows = {}
+            elif device.device_type != device_type:
+                self.errors.append(RowError(
+                    line_number, row, f"Device {device.fqdn} is already loaded as a {device.device_type}."))
+                continue
+            if not interface_name:
+                continue
+            interface = interface_class(interface_name)
+            if ip_address is not None:
+                interface.assign_ip_address(ip_address)
+            try:
+                device.add_interface(interface)
+            except ValueError as error:
+                self.errors.append(RowError(line_number, row, str(error)))
+                continue
+            self._interface_rows[interface_name] = (line_number, row)
+
+    def load(self, registry=None):
+        """
+        Loads the export into a DeviceRegistry.
+
+        Rows of a device found in several places of the export are merged into a single
+        device, interface by interface: an interface already on the device is rejected
+        as the RowError of its own row.
+
+        Args:
+            registry (DeviceRegistry, optional): The registry to load into. A new registry
+                is created when omitted.
+
+        Returns:
+            LoadResult: The registry, the rejected rows and the number of rows read.
+        """
+        if registry is None:
+            registry = DeviceRegistry()
+        for device in self:
+            existing = registry.get(device.fqdn)
+            if existing is None:
+                registry.add_device(device)
+                continue
+            if existing.device_type != device.device_type:
+                line_number, row = self._device_row
+                self.errors.append(RowError(
+                    line_number, row, f"Device {device.fqdn} is already loaded as a {existing.device_type}."))
+                continue
+            for interface in device.get_active_interfaces():
+                try:
+                    existing.add_interface(interface)
+                except ValueError as error:
+                    line_number, row = self._interface_rows[interface.name]
+                    self.errors.append(RowError(line_number, row, str(error)))
+        return LoadResult(registry, self.errors, self.rows_read)
+
+
+def iter_devices(source, **options):
+    """
+    Yields the devices of an inventory export as they are completed.
+
+    Args:
+        source (str, os.PathLike or file): The path of the export, or an open text file.
+        **options: The InventoryLoader options.
+
+    Yields:
+        Device: The loaded devices. Rejected rows are skipped.
+    """
+    return iter(InventoryLoader(source, **options))
+
+
+def load_inventory(source, registry=None, **options):
+    """
+    Loads an inventory export into a DeviceRegistry.
+
+    Args:
+        source (str, os.PathLike or file): The path of the export, or an open text file.
+        registry (DeviceRegistry, optional): The registry to load into. A new registry
+            is created when omitted.
+        **options: The InventoryLoader options.
+
+    Returns:
+        LoadResult: The registry, the rejected rows and the number of rows read.
+    """
+    return InventoryLoader(source, **options).load(registry)
@@ -18,6 +18,9 @@ Usage:
     method. Please note that the 'configure' and 'generate_config' methods need to be implemented in the
     subclasses for each specific routing protocol.
 
+    Set `minimize_networks` on a protocol to collapse duplicate, overlapping and contiguous
+    networks into the fewest network statements covering the same addresses.
+
 Example:
     `RIP : Configure RIP routing protocol`
     
@@ -34,6 +37,8 @@ Example:
 """
 import ipaddress
 
+from ciscopykit.ip.summarization import collapse_prefixes
+
 class DynamicRoutingProtocol:
     """
     Base class for dynamic routing protocols.
@@ -48,6 +53,8 @@ class DynamicRoutingProtocol:
     Methods:
         configure(): Abstract method to configure the dynamic routing protocol on the device.
             Subclasses must implement this method.
+
+        minimized_networks(): Returns the fewest networks covering the advertised networks.
         
         generate_config(): Abstract method to generate the configuration for the dynamic routing
             protocol. Subclasses must implement this method.
@@ -66,6 +73,18 @@ class DynamicRoutingProtocol:
         """
         self.networks = networks
 
+    def minimized_networks(self):
+        """
+        Return the fewest networks covering exactly the addresses of the advertised networks.
+
+        Duplicate and overlapping networks are merged, and contiguous networks are
+        replaced by their common supernet when they fill it.
+
+        Returns:
+            list: The IPv4Network objects, sorted.
+        """
+        return collapse_prefixes(self.networks)
+
     def configure(self):
         """
         Abstract method to configure the dynamic routing protocol on the device.
@@ -101,6 +120,8 @@ class RIP(DynamicRoutingProtocol):
         networks (list): A list of networks to advertise with RIP.
         no_auto_summary (bool, optional): Whether to disable auto-summary (default: False).
         passive_interfaces (list, optional): A list of interfaces to be set as passive (default: None).
+        minimize_networks (bool, optional): Whether to emit one network statement per classful
+            network instead of one per entry (default: False).
     
     Methods:
         configure(): Configures the RIP routing protocol on the device.
@@ -119,7 +140,7 @@ class RIP(DynamicRoutingProtocol):
         print(rip_config) ```
     """
 
-    def __init__(self, version, networks, no_auto_summary=False, passive_interfaces=None):
+    def __init__(self, version, networks, no_auto_summary=False, passive_interfaces=None, minimize_networks=False):
         """
         Initialize a RIP routing protocol.
 
@@ -128,6 +149,8 @@ class RIP(DynamicRoutingProtocol):
             networks (list): A list of networks to advertise with RIP.
             no_auto_summary (bool, optional): Whether to disable auto-summary (default: False).
             passive_interfaces (list, optional): A list of interfaces to be set as passive (default: None).
+            minimize_networks (bool, optional): Whether to emit one network statement per classful
+                network instead of one per entry (default: False).
         
         Raises:
             ValueError: If the version is not 1 or 2.
@@ -140,6 +163,26 @@ class RIP(DynamicRoutingProtocol):
         self.version = version
         self.no_auto_summary = no_auto_summary
         self.passive_interfaces = passive_interfaces or []
+        self.minimize_networks = minimize_networks
+
+    def minimized_networks(self):
+        """
+        Return the classful networks covering the advertised networks.
+
+        RIP network statements always enable the whole classful network, so
+        every entry inside the same class A, B or C network needs only one statement.
+
+        Returns:
+            list: The IPv4Network objects, sorted.
+        """
+        classful = []
+        for network in collapse_prefixes(self.networks):
+            first_octet = int(network.network_address) >> 24
+            prefixlen = 8 if first_octet < 128 else 16 if first_octet < 192 else 24 if first_octet < 224 else None
+            if prefixlen is not None and network.prefixlen > prefixlen:
+                network = network.supernet(new_prefix=prefixlen)
+            classful.append(network)
+        return collapse_prefixes(classful)
 
     def configure(self):
         """
@@ -155,7 +198,12 @@ class RIP(DynamicRoutingProtocol):
         if self.no_auto_summary:
             rip_config += "no auto-summary\n"
 
-        for network in self.networks:
+        if self.minimize_networks:
+            networks = [network.network_address for network in self.minimized_networks()]
+        else:
+            networks = self.networks
+
+        for network in networks:
             rip_config += f"network {network}\n"
 
         for interface in self.passive_interfaces:
@@ -184,6 +232,8 @@ class OSPF(DynamicRoutingProtocol):
         process_id (int): The OSPF process ID.
         router_id (str): The OSPF router ID.
         ospf_options (dict, optional): Dictionary containing OSPF-specific options (default: None).
+            Set 'minimize_networks' to emit the fewest network statements, each with
+            its own wildcard mask.
 
     Raises:
         ValueError: If the process ID is not a positive integer.
@@ -228,6 +278,7 @@ class OSPF(DynamicRoutingProtocol):
         self.networks = self.ospf_options.get('networks', [])
         self.passive_interfaces = self.ospf_options.get('passive_interfaces', [])
         self.default_route_interface = self.ospf_options.get('default_route_interface')
+        self.minimize_networks = self.ospf_options.get('minimize_networks', False)
 
     def _validate_ip_addresses(self, ip_addresses):
         for ip in ip_addresses:
@@ -250,9 +301,13 @@ class OSPF(DynamicRoutingProtocol):
         ospf_config = [f"router ospf {self.process_id}"]
         ospf_config.append(f"router-id {self.router_id}")
 
-        for network in self.networks:
-            network_address = self._cidr_to_network(network)
-            ospf_config.append(f"network {network_address} 0.0.0.255 area 0")
+        if self.minimize_networks:
+            for network in self.minimized_networks():
+                ospf_config.append(f"network {network.network_address} {network.hostmask} area 0")
+        else:
+            for network in self.networks:
+                network_address = self._cidr_to_network(network)
+                ospf_config.append(f"network {network_address} 0.0.0.255 area 0")
 
         for interface in self.passive_interfaces:
             ospf_config.append(f"passive-interface {interface}")
@@ -280,6 +335,7 @@ class EIGRP(DynamicRoutingProtocol):
         metric_reliability (int, optional): Reliability metric for EIGRP (default: 255).
         metric_load (int, optional): Load metric for EIGRP (default: 1).
         metric_mtu (int, optional): MTU metric for EIGRP (default: 1500).
+        minimize_networks (bool, optional): Whether to emit the fewest network statements (default: False).
 
     Raises:
         ValueError: If the AS number is not in the valid range (1 to 65535).
@@ -308,7 +364,8 @@ class EIGRP(DynamicRoutingProtocol):
     """
 
     def __init__(self, as_number, networks, active_interfaces=None,
-                 metric_bandwidth=1000, metric_delay=1, metric_reliability=255, metric_load=1, metric_mtu=1500):
+                 metric_bandwidth=1000, metric_delay=1, metric_reliability=255, metric_load=1, metric_mtu=1500,
+                 minimize_networks=False):
         """
         Initialize an EIGRP routing protocol.
 
@@ -321,6 +378,7 @@ class EIGRP(DynamicRoutingProtocol):
             metric_reliability (int, optional): Reliability metric for EIGRP (default: 255).
             metric_load (int, optional): Load metric for EIGRP (default: 1).
             metric_mtu (int, optional): MTU metric for EIGRP (default: 1500).
+            minimize_networks (bool, optional): Whether to emit the fewest network statements (default: False).
 
         Raises:
             ValueError: If the AS number is not in the valid range (1 to 65535).
@@ -337,6 +395,7 @@ class EIGRP(DynamicRoutingProtocol):
         self.metric_reliability = metric_reliability
         self.metric_load = metric_load
         self.metric_mtu = metric_mtu
+        self.minimize_networks = minimize_networks
 
     def _validate_networks(self, networks):
         validated_networks = []
@@ -366,7 +425,8 @@ class EIGRP(DynamicRoutingProtocol):
         for interface in self.active_interfaces:
             eigrp_config.append(f"no passive-interface {interface}")
 
-        for network in self.networks:
+        networks = self.minimized_networks() if self.minimize_networks else self.networks
+        for network in networks:
             
             network_address, wildcard_mask = self._get_network_address_and_wildcard_mask(ipaddress.IPv4Network(network))
             eigrp_config.append(f"network {network_address} {wildcard_mask}")
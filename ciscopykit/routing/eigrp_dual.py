@@ -0,0 +1,802 @@
+"""
+eigrp_dual.py - EIGRP DUAL simulation for CiscoPyKit.
+
+This module computes the EIGRP topology table every router of a topology would
+converge to: for each destination, the feasible distance, the successors and
+the feasible successors, i.e. the loop-free alternates DUAL can switch to
+without going active.
+
+Each link carries the metric values of the outgoing interface: bandwidth in
+kbit/s, delay in tens of microseconds, reliability and load out of 255. Along a
+path the lowest bandwidth and reliability, the highest load and the sum of the
+delays make up the composite metric, with the classic IOS formula:
+
+    256 * (K1 * BW + K2 * BW / (256 - load) + K3 * delay) [* K5 / (reliability + K4)]
+
+where BW is 10^7 divided by the lowest bandwidth. The composite metric is not
+additive, so routes are computed the way EIGRP converges: each router takes the
+best path its neighbours report and passes every change on, until nothing
+changes. Paths are ranked by metric, then hop count, then neighbour, and paths
+over MAX_HOPS hops are dropped, so every hop makes a path strictly worse: the
+converged state is unique, whatever order the updates are handled in.
+
+With NumPy, the updates of many destinations are handled together, round after
+round, vectorized over all links. A round only passes on the changes whose
+metric is within a factor of the best pending change of their destination,
+which keeps paths from being replaced by better ones later. Prefixes advertised
+by the same routers with the same interface metrics share one computation, so
+tens of thousands of prefixes behind thousands of routers converge in seconds.
+Without NumPy, each destination is settled in plain Python, best path first,
+which gives the same state.
+
+Classes:
+    EIGRPTopology: Routers, links and advertised prefixes of an EIGRP AS.
+    EIGRPPath: One path of a topology table entry.
+    EIGRPRoute: One topology table entry of a router.
+    DUALSimulator: Converges the topology tables of every router.
+
+Functions:
+    composite_metric(bandwidth, delay, reliability=255, load=1, k_values=DEFAULT_K_VALUES): Returns an EIGRP composite metric.
+    interface_metric(interface_name): Returns the default bandwidth and delay of an interface.
+
+Usage Example:
+    ```
+    from ciscopykit.routing.eigrp_dual import DUALSimulator, EIGRPTopology
+
+    topology = EIGRPTopology.from_devices(registry, {"r1.hq": eigrp1, "r2.hq": eigrp2, "r3.hq": eigrp3})
+    simulator = DUALSimulator(topology)
+    for route in simulator.routing_table("r1.hq"):
+        print(route)
+
+    protected, learned = simulator.loop_free_coverage()
+    ```
+"""
+
+import heapq
+import ipaddress
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+DEFAULT_K_VALUES = (1, 0, 1, 0, 0)
+INFINITY = 0xFFFFFFFF
+MAX_HOPS = 100  # the IOS default of metric maximum-hops
+
+_INTERFACE_METRICS = (
+    ("TenGigabitEthernet", 10000000, 1),
+    ("GigabitEthernet", 1000000, 1),
+    ("FastEthernet", 100000, 10),
+    ("Ethernet", 10000, 100),
+    ("Serial", 1544, 2000),
+    ("Loopback", 8000000, 500),
+)
+
+_SCALE = 10 ** 7
+
+# The NumPy code works on blocks of destinations of about this many cells, and passes
+# on the changes within this factor of the best pending metric of their destination.
+_BLOCK_CELLS = 1 << 18
+_WINDOW = 2
+_NO_PATH = (INFINITY << 28) | 0xFFFFFFF
+
+
+def composite_metric(bandwidth, delay, reliability=255, load=1, k_values=DEFAULT_K_VALUES):
+    """
+    Returns the EIGRP composite metric of path metric values.
+
+    Works on integers as well as on NumPy integer arrays. The result is not capped at
+    the EIGRP infinity.
+
+    Args:
+        bandwidth (int): The lowest bandwidth along the path, in kbit/s.
+        delay (int): The total delay along the path, in tens of microseconds.
+        reliability (int, optional): The lowest reliability along the path, out of 255
+            (default: 255).
+        load (int, optional): The highest load along the path, out of 255 (default: 1).
+        k_values (tuple, optional): The K1 to K5 weights (default: (1, 0, 1, 0, 0)).
+
+    Returns:
+        int: The composite metric.
+    """
+    return _composite(_SCALE // bandwidth, delay, reliability, load, k_values)
+
+
+def _composite(scaled_bandwidth, delay, reliability, load, k_values):
+    # scaled_bandwidth is 10^7 / bandwidth: the lowest bandwidth of a path gives the
+    # highest scaled bandwidth of its links.
+    k1, k2, k3, k4, k5 = k_values
+    metric = k1 * scaled_bandwidth + k3 * delay
+    if k2:
+        metric = metric + k2 * scaled_bandwidth // (256 - load)
+    if k5:
+        metric = metric * k5 // (reliability + k4)
+    return 256 * metric
+
+
+def _expand(firsts, counts):
+    """
+    Lists the positions of several ranges of an array, given their first positions and
+    lengths, along with the range each position belongs to.
+    """
+    selected = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(selected)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return selected, firsts[selected] + offsets
+
+
+def interface_metric(interface_name):
+    """
+    Returns the default bandwidth and delay of an interface, from its type, as on IOS.
+
+    Args:
+        interface_name (str): The interface name, e.g. 'Serial0/0/0'.
+
+    Returns:
+        tuple or None: The bandwidth in kbit/s and the delay in tens of microseconds, or
+            None for an unknown interface type.
+    """
+    for prefix, bandwidth, delay in _INTERFACE_METRICS:
+        if interface_name.startswith(prefix):
+            return bandwidth, delay
+    return None
+
+
+def _validate_metric(bandwidth, delay, reliability, load):
+    for name, value, low, high in (("bandwidth", bandwidth, 1, 10 ** 7), ("delay", delay, 1, 1 << 24),
+                                   ("reliability", reliability, 1, 255), ("load", load, 1, 255)):
+        if not isinstance(value, int) or not low <= value <= high:
+            raise ValueError(f"Invalid EIGRP {name} '{value}'. It must be an integer from {low} to {high}.")
+
+
+def _validate_k_values(k_values):
+    k_values = tuple(k_values)
+    if len(k_values) != 5 or not all(isinstance(k, int) and 0 <= k <= 255 for k in k_values):
+        raise ValueError("The K values must be five integers from 0 to 255.")
+    return k_values
+
+
+class EIGRPTopology:
+    """
+    Represents the routers, links and advertised prefixes of an EIGRP autonomous system.
+
+    Attributes:
+        routers (set): The router names.
+        links (dict): Maps each router to {neighbour: (bandwidth, delay, reliability, load,
+            interface, neighbour address)}.
+        prefixes (dict): Maps each advertised IPv4Network to {router: (bandwidth, delay,
+            reliability, load)}.
+
+    Methods:
+        add_router(router): Adds a router.
+        add_link(router, neighbour, bandwidth, delay, reliability=255, load=1, interface=None, address=None): Adds a one-way link.
+        add_prefix(router, network, bandwidth, delay, reliability=255, load=1): Advertises a connected prefix.
+        from_devices(devices, eigrp_instances, metrics=None): Builds the topology of devices.
+    """
+
+    def __init__(self):
+        self.routers = set()
+        self.links = {}
+        self.prefixes = {}
+
+    def add_router(self, router):
+        """
+        Adds a router.
+
+        Args:
+            router (str): The router name.
+        """
+        if router not in self.routers:
+            self.routers.add(router)
+            self.links[router] = {}
+
+    def add_link(self, router, neighbour, bandwidth, delay, reliability=255, load=1, interface=None, address=None):
+        """
+        Adds a one-way link, or updates it. Of parallel links between the same routers,
+        the one with the lowest composite metric is kept.
+
+        Args:
+            router (str): The router the link leaves from.
+            neighbour (str): The router the link leads to.
+            bandwidth (int): The bandwidth of the outgoing interface, in kbit/s.
+            delay (int): The delay of the outgoing interface, in tens of microseconds.
+            reliability (int, optional): The reliability of the interface (default: 255).
+            load (int, optional): The load of the interface (default: 1).
+            interface (str, optional): The outgoing interface.
+            address (IPv4Address, optional): The address of the neighbour on the link.
+
+        Raises:
+            ValueError: If a metric value is out of range or the link is a loop.
+        """
+        _validate_metric(bandwidth, delay, reliability, load)
+        if router == neighbour:
+            raise ValueError("A link must join two different routers.")
+        self.add_router(router)
+        self.add_router(neighbour)
+        current = self.links[router].get(neighbour)
+        if current is None or composite_metric(bandwidth, delay) < composite_metric(current[0], current[1]):
+            self.links[router][neighbour] = (bandwidth, delay, reliability, load, interface, address)
+
+    def remove_link(self, router, neighbour):
+        """
+        Removes a one-way link.
+
+        Raises:
+            KeyError: If there is no such link.
+        """
+        del self.links[router][neighbour]
+
+    def add_prefix(self, router, network, bandwidth, delay, reliability=255, load=1):
+        """
+        Advertises a connected prefix from a router.
+
+        Args:
+            router (str): The router name.
+            network (IPv4Network or str): The prefix.
+            bandwidth (int): The bandwidth of the interface attached to it, in kbit/s.
+            delay (int): The delay of that interface, in tens of microseconds.
+            reliability (int, optional): The reliability of that interface (default: 255).
+            load (int, optional): The load of that interface (default: 1).
+
+        Raises:
+            ValueError: If a metric value is out of range.
+        """
+        _validate_metric(bandwidth, delay, reliability, load)
+        self.add_router(router)
+        advertisers = self.prefixes.setdefault(ipaddress.IPv4Network(network), {})
+        current = advertisers.get(router)
+        if current is None or composite_metric(bandwidth, delay) < composite_metric(current[0], current[1]):
+            advertisers[router] = (bandwidth, delay, reliability, load)
+
+    @classmethod
+    def from_devices(cls, devices, eigrp_instances, metrics=None):
+        """
+        Builds the topology of devices running EIGRP.
+
+        An interface takes part in EIGRP when its address falls in one of the networks of
+        the device's EIGRP instance. Its subnet is advertised, and when the interface is one
+        of the instance's active interfaces (every other interface is passive), every other
+        router with an active EIGRP interface on the same subnet becomes a neighbour.
+
+        Bandwidth and delay default to those of the interface type (interface_metric()),
+        or to the instance's metric_bandwidth and metric_delay for unknown types.
+        Reliability and load are the instance's metric_reliability and metric_load.
+
+        Args:
+            devices (iterable): The devices, e.g. a DeviceRegistry.
+            eigrp_instances (dict): Maps device fqdns to their EIGRP objects. Devices without
+                an instance are left out.
+            metrics (dict, optional): Maps (fqdn, interface name) pairs to (bandwidth, delay)
+                pairs overriding the defaults.
+
+        Returns:
+            EIGRPTopology: The topology, with routers named by fqdn.
+        """
+        metrics = metrics or {}
+        topology = cls()
+        segments = {}
+        for device in devices:
+            eigrp = eigrp_instances.get(device.fqdn)
+            if eigrp is None:
+                continue
+            topology.add_router(device.fqdn)
+            networks = [ipaddress.IPv4Network(network) for network in eigrp.networks]
+            active = set(eigrp.active_interfaces)
+            for interface in device.get_active_interfaces():
+                packed_ip = interface.packed_ip
+                if packed_ip is None:
+                    continue
+                address = ipaddress.IPv4Address(packed_ip[0])
+                if not any(address in network for network in networks):
+                    continue
+                subnet = ipaddress.IPv4Network((packed_ip[0], packed_ip[1]), strict=False)
+                bandwidth, delay = metrics.get((device.fqdn, interface.name)) or interface_metric(interface.name) \
+                    or (eigrp.metric_bandwidth, eigrp.metric_delay)
+                values = (bandwidth, delay, eigrp.metric_reliability, eigrp.metric_load)
+                topology.add_prefix(device.fqdn, subnet, *values)
+                if interface.name in active:
+                    segments.setdefault(subnet, []).append((device.fqdn, interface.name, address, values))
+        for members in segments.values():
+            for router, interface, _, values in members:
+                for neighbour, _, address, _ in members:
+                    if neighbour != router:
+                        topology.add_link(router, neighbour, *values, interface=interface, address=address)
+        return topology
+
+
+class EIGRPPath:
+    """
+    Represents one path of a topology table entry.
+
+    Attributes:
+        neighbour (str): The neighbouring router.
+        interface (str): The outgoing interface.
+        address (IPv4Address): The address of the neighbour.
+        distance (int): The composite metric through the neighbour.
+        reported_distance (int): The composite metric the neighbour reports.
+    """
+
+    __slots__ = ("neighbour", "interface", "address", "distance", "reported_distance")
+
+    def __init__(self, neighbour, interface, address, distance, reported_distance):
+        self.neighbour = neighbour
+        self.interface = interface
+        self.address = address
+        self.distance = distance
+        self.reported_distance = reported_distance
+
+    def __str__(self):
+        return f"via {self.address or self.neighbour} ({self.distance}/{self.reported_distance}), {self.interface}"
+
+    def __repr__(self):
+        return f"<EIGRPPath {self}>"
+
+
+class EIGRPRoute:
+    """
+    Represents one topology table entry of a router.
+
+    Attributes:
+        network (IPv4Network): The destination prefix.
+        feasible_distance (int): The best composite metric to the prefix.
+        successors (list): The EIGRPPath objects of the equal-cost best paths. Empty for
+            the router's own prefixes.
+        feasible_successors (list): The EIGRPPath objects of the other neighbours meeting
+            the feasibility condition, whose reported distance is below the feasible
+            distance: the loop-free alternates.
+    """
+
+    __slots__ = ("network", "feasible_distance", "successors", "feasible_successors")
+
+    def __init__(self, network, feasible_distance, successors, feasible_successors):
+        self.network = network
+        self.feasible_distance = feasible_distance
+        self.successors = successors
+        self.feasible_successors = feasible_successors
+
+    @property
+    def connected(self):
+        return not self.successors
+
+    def __str__(self):
+        if self.connected:
+            return f"P {self.network}, 1 successors, FD is {self.feasible_distance}\n        via Connected"
+        lines = [f"P {self.network}, {len(self.successors)} successors, FD is {self.feasible_distance}"]
+        lines.extend(f"        {path}" for path in self.successors + self.feasible_successors)
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"<EIGRPRoute {self.network} FD {self.feasible_distance}>"
+
+
+class DUALSimulator:
+    """
+    Converges the EIGRP topology tables of every router of a topology.
+
+    The topology is converged once, when the simulator is created; create a new
+    simulator after changing the topology.
+
+    Attributes:
+        topology (EIGRPTopology): The topology.
+        k_values (tuple): The K1 to K5 weights.
+        routers (list): The router names, sorted.
+        rounds (int): The number of update rounds the convergence took, over all blocks
+            of destinations. Always 0 without NumPy.
+
+    Methods:
+        route(router, network): Returns the topology table entry of a prefix.
+        routing_table(router): Returns the topology table of a router.
+        loop_free_alternates(router): Returns the feasible successors of a router's routes.
+        loop_free_coverage(): Counts the learned routes that have a loop-free alternate.
+    """
+
+    def __init__(self, topology, k_values=DEFAULT_K_VALUES):
+        """
+        Initialize a DUALSimulator and converge the topology.
+
+        Args:
+            topology (EIGRPTopology): The topology.
+            k_values (tuple, optional): The K1 to K5 weights (default: (1, 0, 1, 0, 0)).
+
+        Raises:
+            ValueError: If the K values are invalid.
+        """
+        self.topology = topology
+        self.k_values = _validate_k_values(k_values)
+        self.routers = sorted(topology.routers)
+        self.rounds = 0
+        self._index = {router: position for position, router in enumerate(self.routers)}
+
+        # Links sorted by router, then neighbour: (router, neighbour, scaled bandwidth,
+        # delay, reliability, load), and the positions of each router's links.
+        self._links = []
+        self._interfaces = []
+        self._outgoing = []
+        for router in self.routers:
+            first = len(self._links)
+            for neighbour in sorted(topology.links[router]):
+                bandwidth, delay, reliability, load, interface, address = topology.links[router][neighbour]
+                self._links.append((self._index[router], self._index[neighbour], _SCALE // bandwidth, delay,
+                                    reliability, load))
+                self._interfaces.append((interface, address))
+            self._outgoing.append(range(first, len(self._links)))
+        self._incoming = [[] for _ in self.routers]
+        for link, (_, neighbour, *_) in enumerate(self._links):
+            self._incoming[neighbour].append(link)
+
+        # Prefixes advertised by the same routers with the same metrics share a destination.
+        self._destinations = []
+        self._destination_of = {}
+        self._prefix_counts = []
+        known = {}
+        for network, advertisers in topology.prefixes.items():
+            key = tuple(sorted((self._index[router], _SCALE // bandwidth, delay, reliability, load)
+                               for router, (bandwidth, delay, reliability, load) in advertisers.items()))
+            destination = known.get(key)
+            if destination is None:
+                destination = known[key] = len(self._destinations)
+                self._destinations.append(key)
+                self._prefix_counts.append(0)
+            self._destination_of[network] = destination
+            self._prefix_counts[destination] += 1
+
+        if np is not None:
+            self._converge_arrays()
+        else:
+            self._converge_lists()
+
+    def _metric(self, scaled_bandwidth, delay, reliability, load):
+        return min(_composite(scaled_bandwidth, delay, reliability, load, self.k_values), INFINITY)
+
+    def _converge_lists(self):
+        """
+        Converges every destination in plain Python, one destination at a time.
+        """
+        size = len(self._destinations)
+        state = [self._settle(destination) for destination in range(size)]
+        self._state = tuple([[state[destination][router][position] for destination in range(size)]
+                             for router in range(len(self.routers))] for position in range(6))
+        self._origin = [[False] * size for _ in self.routers]
+        for destination, advertisers in enumerate(self._destinations):
+            for router, *_ in advertisers:
+                self._origin[router][destination] = True
+
+    def _settle(self, destination):
+        """
+        Computes the converged state of every router towards a destination, growing the
+        paths outwards from the advertising routers, best first.
+
+        Every hop makes a path strictly worse in (metric, hops) order, so the converged
+        state is unique, and this finds the same one as the update rounds.
+
+        Returns:
+            list: The (metric, scaled bandwidth, delay, hops, reliability, load) tuple of
+                every router.
+        """
+        links, outgoing = self._links, self._outgoing
+        state = [(INFINITY, 0, 0, 0, 0, 0)] * len(self.routers)
+        origins = set()
+        heap = []
+        for router, *values in self._destinations[destination]:
+            origins.add(router)
+            heap.append((self._metric(*values), 0, router, 0, tuple(values)))
+        heapq.heapify(heap)
+        settled = set()
+        while heap:
+            path_metric, hops, router, _, values = heapq.heappop(heap)
+            if router in settled or (hops and router in origins):
+                continue
+            settled.add(router)
+            scaled_bandwidth, delay, reliability, load = values
+            state[router] = (path_metric, scaled_bandwidth, delay, hops, reliability, load)
+            if hops == MAX_HOPS:
+                continue
+            for link in self._incoming[router]:
+                neighbour, _, link_scaled_bandwidth, link_delay, link_reliability, link_load = links[link]
+                if neighbour in settled:
+                    continue
+                path = (max(scaled_bandwidth, link_scaled_bandwidth), min(delay + link_delay, INFINITY),
+                        min(reliability, link_reliability), max(load, link_load))
+                via = self._metric(*path)
+                if via < INFINITY:
+                    heapq.heappush(heap, (via, hops + 1, neighbour, link - outgoing[neighbour].start, path))
+        return state
+
+    def _converge_arrays(self):
+        """
+        Converges every destination with NumPy, one block of destinations at a time.
+
+        As with EIGRP updates, a router only weighs the path through a neighbour again when
+        that neighbour's path changed, and each round handles the pending changes of every
+        (router, destination) pair of the block at once.
+        """
+        count, size = len(self.routers), len(self._destinations)
+        self._state = tuple(np.zeros((count, size), dtype=dtype)
+                            for dtype in (np.uint32, np.uint32, np.uint32, np.uint8, np.uint8, np.uint8))
+        self._state[0].fill(INFINITY)
+        self._origin = np.zeros((count, size), dtype=bool)
+        links = np.array(self._links, dtype=np.int64).reshape(-1, 6)
+        self._link_arrays = links
+        self._degree = np.bincount(links[:, 0], minlength=count)
+        self._first = np.concatenate(([0], np.cumsum(self._degree)))
+        self._local = np.arange(len(links)) - self._first[links[:, 0]]
+        self._fan_in = np.argsort(links[:, 1], kind="stable")
+        self._first_in = np.concatenate(([0], np.cumsum(np.bincount(links[:, 1], minlength=count))))
+        block = max(1, _BLOCK_CELLS // max(count, 1))
+        for first in range(0, size, block):
+            self._converge_block(first, min(size, first + block))
+
+    def _tracked(self):
+        # Reliability and load only matter with K5, respectively K2.
+        return (True, True, True, True, bool(self.k_values[4]), bool(self.k_values[1]))
+
+    def _converge_block(self, first, last):
+        """
+        Converges destinations first to last. Each (router, destination) cell keeps the key
+        of its path: the metric, then the hops, then the position of the neighbour among
+        the router's links, so the lowest key is the path a router takes.
+        """
+        count, width = len(self.routers), last - first
+        state = [np.zeros(count * width, dtype=np.int64) for _ in range(6)]
+        state[0].fill(INFINITY)
+        keys = np.full(count * width, _NO_PATH, dtype=np.int64)
+        origin = np.zeros(count * width, dtype=bool)
+        for destination in range(first, last):
+            for router, *values in self._destinations[destination]:
+                cell = router * width + destination - first
+                state[0][cell] = self._metric(*values)
+                state[1][cell], state[2][cell], state[4][cell], state[5][cell] = values
+                origin[cell] = True
+        tracked = self._tracked()
+        links = self._link_arrays
+        lowest = np.full(count * width, _NO_PATH, dtype=np.int64)
+        pending = origin.copy()
+        while len(links):
+            changed_cells = np.flatnonzero(pending)
+            if not changed_cells.size:
+                break
+            self.rounds += 1
+            routers, columns = np.divmod(changed_cells, width)
+            # Only the changes within a factor of the best pending metric of their destination
+            # are passed on, so few paths are replaced by better ones later.
+            metrics = state[0][changed_cells]
+            best_pending = np.full(width, INFINITY, dtype=np.int64)
+            np.minimum.at(best_pending, columns, metrics)
+            passed = metrics <= np.minimum(best_pending * _WINDOW, INFINITY)[columns]
+            changed_cells, routers, columns = changed_cells[passed], routers[passed], columns[passed]
+            pending[changed_cells] = False
+
+            # The routers linking to a changed cell weigh the path through it.
+            selected, positions = _expand(self._first_in[routers], self._first_in[routers + 1] - self._first_in[routers])
+            link = self._fan_in[positions]
+            targets = links[link, 0] * width + columns[selected]
+            learned = ~origin[targets]
+            link, targets, neighbour_cells = link[learned], targets[learned], changed_cells[selected[learned]]
+            path = self._extend(state, neighbour_cells, link, tracked)
+            path_keys = (path[0] << 28) | (path[3] << 20) | self._local[link]
+            path_keys[path[0] >= INFINITY] = _NO_PATH
+            current = keys[targets]
+            successor = (current & 0xFFFFF) == self._local[link]
+
+            # A path through the current successor got worse: weigh every neighbour again.
+            worse = successor & (path_keys > current)
+            recompute = np.zeros(count * width, dtype=bool)
+            recompute[targets[worse]] = True
+            # Otherwise the best of the current path and the changed ones is taken.
+            candidate = ((path_keys < current) | (successor & (path_keys == current))) & ~recompute[targets]
+            np.minimum.at(lowest, targets[candidate], path_keys[candidate])
+            winner = candidate & (path_keys == lowest[targets])
+            lowest[targets[candidate]] = _NO_PATH
+            cells, winner = targets[winner], np.flatnonzero(winner)
+            changed = keys[cells] != path_keys[winner]
+            for position, values in enumerate(path):
+                if tracked[position]:
+                    changed |= state[position][cells] != values[winner]
+                    state[position][cells] = values[winner]
+            keys[cells] = path_keys[winner]
+            pending[cells[changed]] = True
+
+            cells = np.flatnonzero(recompute)
+            if cells.size:
+                pending[cells[self._recompute(state, keys, cells, width, tracked)]] = True
+        for values, block in zip(self._state, state):
+            values[:, first:last] = block.reshape(count, width)
+        self._origin[:, first:last] = origin.reshape(count, width)
+
+    def _recompute(self, state, keys, cells, width, tracked):
+        """
+        Weighs the paths through every neighbour of cells and takes the best one.
+
+        Returns:
+            numpy.ndarray: Whether each cell changed.
+        """
+        links = self._link_arrays
+        routers, columns = np.divmod(cells, width)
+        selected, link = _expand(self._first[routers], self._degree[routers])
+        group = np.cumsum(self._degree[routers]) - self._degree[routers]
+        path = self._extend(state, links[link, 1] * width + columns[selected], link, tracked)
+        path_keys = (path[0] << 28) | (path[3] << 20) | self._local[link]
+        path_keys[path[0] >= INFINITY] = _NO_PATH
+        best = np.minimum.reduceat(path_keys, group)
+        chosen = group + (best & 0xFFFFF)
+        unreachable = best == _NO_PATH
+        changed = keys[cells] != best
+        for position, values in enumerate(path):
+            if not tracked[position]:
+                continue
+            new = values[chosen]
+            new[unreachable] = INFINITY if position == 0 else 0
+            changed |= new != state[position][cells]
+            state[position][cells] = new
+        keys[cells] = best
+        return changed
+
+    def _extend(self, state, neighbour_cells, link, tracked):
+        """
+        Returns the metric, scaled bandwidth, delay, hops, reliability and load of the
+        paths over links to the given (neighbour, destination) cells of state. Untracked
+        reliability and load are left out of the metric.
+        """
+        links = self._link_arrays
+        scaled_bandwidth = np.maximum(state[1][neighbour_cells], links[link, 2])
+        delay = np.minimum(state[2][neighbour_cells] + links[link, 3], INFINITY)
+        hops = state[3][neighbour_cells] + 1
+        reliability = np.minimum(state[4][neighbour_cells], links[link, 4]) if tracked[4] else None
+        load = np.maximum(state[5][neighbour_cells], links[link, 5]) if tracked[5] else None
+        metric = _composite(scaled_bandwidth, delay, 255 if reliability is None else reliability,
+                            1 if load is None else load, self.k_values)
+        np.minimum(metric, INFINITY, out=metric)
+        metric[(state[0][neighbour_cells] >= INFINITY) | (hops > MAX_HOPS)] = INFINITY
+        return metric, scaled_bandwidth, delay, hops, reliability, load
+
+    def _rows(self, router):
+        """
+        Returns the metric, scaled bandwidth, delay, hops, reliability and load of a router
+        towards every destination, as lists.
+        """
+        if np is not None:
+            return [values[router].tolist() for values in self._state]
+        return [values[router] for values in self._state]
+
+    def _entries(self, router, destinations):
+        """
+        Builds the topology table entries of a router for destinations, as (destination,
+        feasible distance, successors, feasible successors) tuples.
+        """
+        position = self._index[router]
+        distances = self._rows(position)[0]
+        origin = self._origin[position]
+        if np is not None:
+            origin = origin.tolist()
+        neighbours = []
+        for link in self._outgoing[position]:
+            interface, address = self._interfaces[link]
+            neighbour = self._links[link][1]
+            neighbours.append((self.routers[neighbour], interface, address, self._links[link][2:],
+                               self._rows(neighbour)))
+        entries = []
+        for destination in destinations:
+            distance = distances[destination]
+            if distance >= INFINITY:
+                continue
+            if origin[destination]:
+                entries.append((destination, distance, [], []))
+                continue
+            successors, feasible = [], []
+            for name, interface, address, link, rows in neighbours:
+                reported = rows[0][destination]
+                if reported >= INFINITY or rows[3][destination] >= MAX_HOPS:
+                    continue
+                via = self._metric(max(link[0], rows[1][destination]), link[1] + rows[2][destination],
+                                   min(link[2], rows[4][destination]), max(link[3], rows[5][destination]))
+                if via >= INFINITY:
+                    continue
+                if via == distance:
+                    successors.append(EIGRPPath(name, interface, address, via, reported))
+                elif reported < distance:
+                    feasible.append(EIGRPPath(name, interface, address, via, reported))
+            feasible.sort(key=lambda path: (path.distance, path.neighbour))
+            entries.append((destination, distance, successors, feasible))
+        return entries
+
+    def route(self, router, network):
+        """
+        Returns the topology table entry of a router for a prefix.
+
+        Args:
+            router (str): The router name.
+            network (IPv4Network or str): The advertised prefix.
+
+        Returns:
+            EIGRPRoute or None: The entry, or None when the prefix is not advertised or
+                not reachable.
+
+        Raises:
+            KeyError: If the router is not in the topology.
+        """
+        if router not in self._index:
+            raise KeyError(router)
+        network = ipaddress.IPv4Network(network)
+        destination = self._destination_of.get(network)
+        if destination is None:
+            return None
+        for _, distance, successors, feasible in self._entries(router, (destination,)):
+            return EIGRPRoute(network, distance, successors, feasible)
+        return None
+
+    def routing_table(self, router):
+        """
+        Returns the topology table of a router: one entry per reachable prefix.
+
+        Args:
+            router (str): The router name.
+
+        Returns:
+            list: The EIGRPRoute objects, sorted by prefix.
+
+        Raises:
+            KeyError: If the router is not in the topology.
+        """
+        entries = {destination: entry for destination, *entry in self._entries(router, range(len(self._destinations)))}
+        table = [EIGRPRoute(network, *entries[destination])
+                 for network, destination in self._destination_of.items() if destination in entries]
+        table.sort(key=lambda route: route.network)
+        return table
+
+    def loop_free_alternates(self, router):
+        """
+        Returns the feasible successors of a router's learned routes.
+
+        Args:
+            router (str): The router name.
+
+        Returns:
+            dict: Maps each prefix having at least one feasible successor to the list of its
+                feasible successors, as EIGRPPath objects.
+
+        Raises:
+            KeyError: If the router is not in the topology.
+        """
+        return {route.network: route.feasible_successors
+                for route in self.routing_table(router) if route.feasible_successors}
+
+    def loop_free_coverage(self):
+        """
+        Counts, over every router, the learned routes that have at least one feasible
+        successor, i.e. that survive the loss of their successor without going active.
+
+        Returns:
+            tuple: The number of learned routes with a feasible successor, and the number of
+                learned routes.
+        """
+        counts = self._prefix_counts
+        if np is None or not self._links or not counts:
+            protected = learned = 0
+            for router in self.routers:
+                for destination, _, successors, feasible in self._entries(router, range(len(counts))):
+                    if successors:
+                        learned += counts[destination]
+                        protected += counts[destination] if feasible else 0
+            return protected, learned
+
+        metric = self._state[0]
+        weights = np.asarray(counts, dtype=np.int64)
+        learned_routes = (metric < INFINITY) & ~self._origin
+        learned = int((learned_routes.sum(axis=0) * weights).sum())
+        links, tracked = self._link_arrays, self._tracked()
+        sources = np.flatnonzero(self._degree)
+        starts = self._first[sources]
+        protected = 0
+        block = max(1, _BLOCK_CELLS // len(links))
+        for first in range(0, len(counts), block):
+            last = min(len(counts), first + block)
+            width = last - first
+            state = [values[:, first:last].astype(np.int64).ravel() for values in self._state]
+            columns = np.arange(width)
+            distance = state[0][links[:, 0:1] * width + columns]
+            neighbour_cells = links[:, 1:2] * width + columns
+            via = self._extend(state, neighbour_cells, np.arange(len(links))[:, None], tracked)[0]
+            alternate = (state[0][neighbour_cells] < distance) & (via != distance) & (via < INFINITY)
+            covered = np.logical_or.reduceat(alternate, starts, axis=0) & learned_routes[sources, first:last]
+            protected += int((covered.sum(axis=0) * weights[first:last]).sum())
+        return protected, learned
@@ -0,0 +1,406 @@
+"""
+redistribution.py - Route redistribution loop analysis for CiscoPyKit.
+
+This module checks the redistribution of a whole fleet before any
+configuration is pushed. Redistributing routes between two routing domains at
+more than one router, or around a chain of domains, lets routes come back
+into the domain they were learned from, with a metric and administrative
+distance that can win over the original routes: a routing feedback loop.
+
+Every `redistribute` statement of every router is a redistribution point, an
+edge from the source domain to the target domain of a directed graph whose
+nodes are the routing domains. A domain is named after its protocol and
+process, e.g. 'ospf 1' or 'eigrp 100', unless mapped to another name. The
+analyzer reports:
+
+    loops       strongly connected components of the domain graph, found with
+                Tarjan's algorithm in time linear in the domains and points
+    two-way     pairs of domains redistributed into each other
+
+A loop whose points are all on one router cannot feed routes back, since the
+router does not redistribute the routes it redistributed itself again; it is
+reported, but only loops spanning several routers are feedback loops.
+
+Classes:
+    RedistributionPoint: One `redistribute` statement of a router.
+    RedistributionLoop: Domains redistributing routes around a cycle.
+    TwoWayRedistribution: Two domains redistributed into each other.
+    RedistributionReport: The loops and two-way redistributions of a fleet.
+    RedistributionAnalyzer: Collects redistribution points and analyzes them.
+
+Functions:
+    parse_redistribution(config): Returns the redistribute statements of a configuration.
+    find_redistribution_loops(configs, domains=None): Analyzes the configurations of a fleet.
+
+Usage Example:
+    ```
+    from ciscopykit.routing.redistribution import find_redistribution_loops
+
+    report = find_redistribution_loops({"r1.hq": r1_config, "r2.hq": r2_config})
+    for loop in report.feedback_loops:
+        print(loop)
+    ```
+"""
+
+# Protocols whose `router` and `redistribute` statements name a process.
+_NUMBERED = {"ospf", "eigrp", "bgp"}
+_PROTOCOLS = _NUMBERED | {"rip", "isis", "static", "connected"}
+
+
+def _protocol(words, process_optional=False):
+    """
+    Returns the protocol named by the words of a statement and the number of words used.
+
+    With process_optional, a protocol written without its process is named after the
+    protocol alone, e.g. 'eigrp'.
+
+    Raises:
+        ValueError: If the protocol is not supported or its process is missing.
+    """
+    if not words or words[0].lower() not in _PROTOCOLS:
+        raise ValueError(f"Unsupported protocol '{' '.join(words)}'.")
+    protocol = words[0].lower()
+    if protocol not in _NUMBERED:
+        return protocol, 1
+    if len(words) < 2 or not words[1].isdigit():
+        if process_optional:
+            return protocol, 1
+        raise ValueError(f"Missing process for protocol '{protocol}'.")
+    return f"{protocol} {int(words[1])}", 2
+
+
+def parse_redistribution(config):
+    """
+    Returns the redistribute statements of a configuration.
+
+    A `redistribute` line belongs to the routing process of the last `router` line
+    before it, as in the output of configure_route_redistribution() and of the
+    dynamic routing protocol classes, whether indented or not. A `router` line
+    without its process number, such as the `router eigrp` written by
+    configure_route_redistribution(), names the domain after the protocol alone.
+
+    Args:
+        config (str): The configuration text.
+
+    Returns:
+        list: (source, target, route_map) tuples, with the protocols named as 'ospf 1',
+              'eigrp 100', 'rip' or 'static', and route_map None when there is none.
+
+    Raises:
+        ValueError: If a statement names an unsupported protocol, a redistribute line
+                    names a numbered protocol without its process, or a redistribute
+                    line is outside any routing process.
+    """
+    statements = []
+    target = None
+    for line in config.splitlines():
+        words = line.split()
+        if not words:
+            continue
+        keyword = words[0].lower()
+        if keyword == "router":
+            target = _protocol(words[1:], process_optional=True)[0]
+        elif keyword == "redistribute":
+            if target is None:
+                raise ValueError(f"Redistribution outside a routing process: '{line.strip()}'.")
+            source, used = _protocol(words[1:])
+            options = [word.lower() for word in words[1 + used:]]
+            route_map = words[1 + used + options.index("route-map") + 1] \
+                if "route-map" in options[:-1] else None
+            statements.append((source, target, route_map))
+        elif keyword in ("!", "exit", "end", "interface", "hostname"):
+            target = None
+    return statements
+
+
+class RedistributionPoint:
+    """
+    Represents one `redistribute` statement of a router.
+
+    Attributes:
+        router (str): The router redistributing.
+        source (str): The domain routes are taken from.
+        target (str): The domain routes are redistributed into.
+        route_map (str or None): The route map filtering the routes, if any.
+    """
+
+    __slots__ = ("router", "source", "target", "route_map")
+
+    def __init__(self, router, source, target, route_map=None):
+        self.router = router
+        self.source = source
+        self.target = target
+        self.route_map = route_map
+
+    def __str__(self):
+        route_map = f" route-map {self.route_map}" if self.route_map else ""
+        return f"{self.router}: {self.source} -> {self.target}{route_map}"
+
+    def __repr__(self):
+        return f"<RedistributionPoint {self}>"
+
+
+class RedistributionLoop:
+    """
+    Represents domains redistributing routes around a cycle.
+
+    Attributes:
+        domains (list): The domains of the cycle, sorted.
+        points (list): The RedistributionPoints between those domains.
+        routers (list): The routers of those points, sorted.
+    """
+
+    def __init__(self, domains, points):
+        self.domains = domains
+        self.points = points
+        self.routers = sorted({point.router for point in points})
+
+    @property
+    def feedback(self):
+        """
+        bool: Whether the points span several routers, so routes can be fed back.
+        """
+        return len(self.routers) > 1
+
+    @property
+    def filtered(self):
+        """
+        bool: Whether every point of the loop has a route map, which may break it.
+        """
+        return all(point.route_map for point in self.points)
+
+    def __str__(self):
+        return (f"loop between {', '.join(self.domains)} at {', '.join(self.routers)} "
+                f"({len(self.points)} points)")
+
+
+class TwoWayRedistribution:
+    """
+    Represents two domains redistributed into each other.
+
+    Attributes:
+        domains (tuple): The two domains, sorted.
+        forward (list): The RedistributionPoints from the first domain into the second.
+        backward (list): The RedistributionPoints from the second domain into the first.
+    """
+
+    def __init__(self, domains, forward, backward):
+        self.domains = domains
+        self.forward = forward
+        self.backward = backward
+
+    @property
+    def routers(self):
+        """
+        list: The routers redistributing in either direction, sorted.
+        """
+        return sorted({point.router for point in self.forward + self.backward})
+
+    @property
+    def feedback(self):
+        """
+        bool: Whether the redistribution happens at several routers.
+        """
+        return len(self.routers) > 1
+
+    def __str__(self):
+        return f"two-way redistribution between {self.domains[0]} and {self.domains[1]} at {', '.join(self.routers)}"
+
+
+class RedistributionReport:
+    """
+    Represents the loops and two-way redistributions of a fleet.
+
+    Attributes:
+        points (int): The number of redistribution points analyzed.
+        loops (list): The RedistributionLoops, largest first.
+        two_way (list): The TwoWayRedistributions, sorted by domains.
+    """
+
+    def __init__(self, points, loops, two_way):
+        self.points = points
+        self.loops = loops
+        self.two_way = two_way
+
+    @property
+    def feedback_loops(self):
+        """
+        list: The loops spanning several routers.
+        """
+        return [loop for loop in self.loops if loop.feedback]
+
+    def __bool__(self):
+        """
+        A report is true when it found no feedback loop.
+        """
+        return not self.feedback_loops
+
+    def __str__(self):
+        return (f"{self.points} redistribution points, {len(self.loops)} loops "
+                f"({len(self.feedback_loops)} feedback), {len(self.two_way)} two-way")
+
+
+class RedistributionAnalyzer:
+    """
+    Collects the redistribution points of a fleet and analyzes them.
+
+    Attributes:
+        points (list): The RedistributionPoints added.
+        domains (dict): Maps protocols ('ospf 1') or (router, protocol) pairs to domain
+            names, for processes that are not one domain across the fleet.
+
+    Methods:
+        add_point(router, source, target, route_map=None): Adds a redistribution point.
+        add_config(router, config): Adds the redistribute statements of a configuration.
+        analyze(): Finds the loops and two-way redistributions.
+    """
+
+    def __init__(self, domains=None):
+        """
+        Initialize a RedistributionAnalyzer.
+
+        Args:
+            domains (dict, optional): Maps protocols ('ospf 1') or (router, protocol)
+                pairs to domain names. Each protocol process is one domain across the
+                fleet by default.
+        """
+        self.points = []
+        self.domains = domains or {}
+
+    def _domain(self, router, protocol):
+        domain = self.domains.get((router, protocol))
+        if domain is None:
+            domain = self.domains.get(protocol, protocol)
+        return domain
+
+    def add_point(self, router, source, target, route_map=None):
+        """
+        Adds a redistribution point.
+
+        Args:
+            router (str): The router redistributing.
+            source (str): The protocol routes are taken from, e.g. 'ospf 1'.
+            target (str): The protocol routes are redistributed into.
+            route_map (str, optional): The route map filtering the routes.
+
+        Returns:
+            RedistributionPoint: The point, with the protocols mapped to their domains.
+        """
+        point = RedistributionPoint(router, self._domain(router, source), self._domain(router, target), route_map)
+        self.points.append(point)
+        return point
+
+    def add_config(self, router, config):
+        """
+        Adds the redistribute statements of a router's configuration.
+
+        Args:
+            router (str): The router.
+            config (str): Its configuration text.
+
+        Raises:
+            ValueError: If the configuration has an invalid redistribute statement.
+        """
+        for source, target, route_map in parse_redistribution(config):
+            self.add_point(router, source, target, route_map)
+
+    def _components(self, edges):
+        """
+        Returns the strongly connected components of the domain graph, with Tarjan's
+        algorithm, iteratively.
+        """
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in edges:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(edges[root]))]
+            while work:
+                domain, targets = work[-1]
+                for target in targets:
+                    if target not in index:
+                        index[target] = lowlink[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(edges.get(target, ()))))
+                        break
+                    if target in on_stack:
+                        lowlink[domain] = min(lowlink[domain], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[domain])
+                    if lowlink[domain] == index[domain]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == domain:
+                                break
+                        components.append(component)
+        return components
+
+    def analyze(self):
+        """
+        Finds the loops and two-way redistributions of the points added.
+
+        Runs in time linear in the number of points.
+
+        Returns:
+            RedistributionReport: The loops and two-way redistributions.
+        """
+        edges = {}
+        for point in self.points:
+            edges.setdefault(point.source, {}).setdefault(point.target, []).append(point)
+
+        component_of = {}
+        cyclic = []
+        for component in self._components(edges):
+            if len(component) > 1 or component[0] in edges.get(component[0], ()):
+                for domain in component:
+                    component_of[domain] = len(cyclic)
+                cyclic.append(component)
+        loop_points = [[] for _ in cyclic]
+        for point in self.points:
+            number = component_of.get(point.source)
+            if number is not None and component_of.get(point.target) == number:
+                loop_points[number].append(point)
+        loops = [RedistributionLoop(sorted(component), points) for component, points in zip(cyclic, loop_points)]
+        loops.sort(key=lambda loop: (-len(loop.domains), loop.domains))
+
+        two_way = []
+        for source, targets in edges.items():
+            for target, forward in targets.items():
+                if source < target and source in edges.get(target, ()):
+                    two_way.append(TwoWayRedistribution((source, target), forward, edges[target][source]))
+        two_way.sort(key=lambda pair: pair.domains)
+        return RedistributionReport(len(self.points), loops, two_way)
+
+
+def find_redistribution_loops(configs, domains=None):
+    """
+    Analyzes the redistribution of a fleet.
+
+    Args:
+        configs (dict): Maps router names to their configuration texts.
+        domains (dict, optional): Maps protocols ('ospf 1') or (router, protocol) pairs
+            to domain names, as for RedistributionAnalyzer.
+
+    Returns:
+        RedistributionReport: The loops and two-way redistributions.
+
+    Raises:
+        ValueError: If a configuration has an invalid redistribute statement.
+    """
+    analyzer = RedistributionAnalyzer(domains)
+    for router, config in configs.items():
+        analyzer.add_config(router, config)
+    return analyzer.analyze()
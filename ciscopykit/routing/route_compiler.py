@@ -0,0 +1,335 @@
+"""
+route_compiler.py - Bulk static route compiler for CiscoPyKit.
+
+This module turns a large route table, such as a CSV export, into `ip route`
+commands. Routes are read one at a time and each new route is written out
+straight away, in the same format as static_routing.configure_static_route().
+Along the way the compiler:
+
+    - drops routes identical to one already written
+    - reports routes repeating a destination and next hop with another
+      administrative distance; the first one read is kept
+    - optionally aggregates contiguous destinations sharing a next hop and
+      administrative distance into fewer, larger prefixes
+
+Only a small integer key per distinct route is kept, never the rows or the
+generated lines. Aggregation needs the whole table, so with it enabled the
+lines are written when the input ends.
+
+An aggregate is only used when it routes every address exactly like the
+original routes did: it is not used when another next hop has a route whose
+prefix length falls between the aggregate and the routes it replaces.
+
+CSV and JSONL tables have one route per row:
+
+    destination,next_hop,administrative_distance
+    10.10.0.0/24,192.168.1.1,1
+
+Classes:
+    RouteConflict: A route repeating a destination and next hop with another distance.
+    CompileResult: The counts, conflicts and errors of a compilation.
+    StaticRouteCompiler: Streams routes into `ip route` commands.
+
+Functions:
+    compile_static_routes(routes, output=None, aggregate=False, file_format=None): Compiles a route table.
+
+Usage Example:
+    ```
+    from ciscopykit.routing.route_compiler import compile_static_routes
+
+    result = compile_static_routes("routes.csv", "core1-routes.txt", aggregate=True)
+    print(result)
+    for conflict in result.conflicts:
+        print(conflict)
+    ```
+"""
+
+import ipaddress
+import os
+import sys
+
+from ciscopykit.ip.prefix_trie import PrefixTrie
+from ciscopykit.ip.summarization import collapse_ranges, range_to_prefixes
+from ciscopykit.loader import RowError, iter_rows
+
+_NETMASKS = [str(ipaddress.IPv4Address((0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF)) for prefixlen in range(33)]
+
+
+def _format_address(address):
+    return f"{address >> 24}.{address >> 16 & 255}.{address >> 8 & 255}.{address & 255}"
+
+
+def _parse_route(route):
+    """
+    Parses one route given as a row dictionary or a tuple.
+
+    Returns:
+        tuple: The destination address, prefix length, next hop and administrative distance.
+
+    Raises:
+        ValueError: If a field is missing or invalid.
+    """
+    if isinstance(route, dict):
+        destination = route.get("destination")
+        next_hop = route.get("next_hop")
+        distance = route.get("administrative_distance")
+    else:
+        destination, next_hop = route[0], route[1]
+        distance = route[2] if len(route) > 2 else None
+    destination = destination.strip() if isinstance(destination, str) else destination
+    next_hop = next_hop.strip() if isinstance(next_hop, str) else next_hop
+    if not destination:
+        raise ValueError("Missing required field 'destination'.")
+    if not next_hop:
+        raise ValueError("Missing required field 'next_hop'.")
+    try:
+        network = ipaddress.IPv4Network(destination)
+    except ValueError:
+        raise ValueError(f"Invalid destination '{destination}'.")
+    try:
+        next_hop = str(ipaddress.IPv4Address(next_hop))
+    except ValueError:
+        # An exit interface rather than a next-hop address.
+        next_hop = str(next_hop)
+    if isinstance(distance, str):
+        distance = distance.strip()
+    try:
+        distance = int(distance) if distance not in (None, "") else 1
+    except ValueError:
+        raise ValueError(f"Invalid administrative distance '{distance}'.")
+    if not 1 <= distance <= 255:
+        raise ValueError(f"Invalid administrative distance '{distance}'.")
+    return int(network.network_address), network.prefixlen, sys.intern(next_hop), distance
+
+
+class RouteConflict:
+    """
+    Represents a route repeating a destination and next hop with another distance.
+
+    Attributes:
+        destination (IPv4Network): The destination of the routes.
+        next_hop (str): The next hop of the routes.
+        kept_distance (int): The administrative distance of the route written.
+        rejected_distance (int): The administrative distance of the route dropped.
+        line_number (int or None): The line of the dropped route, when read from a file.
+    """
+
+    def __init__(self, destination, next_hop, kept_distance, rejected_distance, line_number=None):
+        self.destination = destination
+        self.next_hop = next_hop
+        self.kept_distance = kept_distance
+        self.rejected_distance = rejected_distance
+        self.line_number = line_number
+
+    def __str__(self):
+        where = f"line {self.line_number}: " if self.line_number is not None else ""
+        return (f"{where}route {self.destination} via {self.next_hop} has administrative distance "
+                f"{self.rejected_distance}, already configured with {self.kept_distance}")
+
+
+class CompileResult:
+    """
+    Represents the outcome of a compilation.
+
+    Attributes:
+        routes_read (int): The number of routes read.
+        lines_written (int): The number of `ip route` lines written.
+        duplicates (int): The number of identical routes dropped.
+        conflicts (list): The RouteConflict records.
+        errors (list): The RowError records of the invalid routes.
+    """
+
+    def __init__(self, routes_read, lines_written, duplicates, conflicts, errors):
+        self.routes_read = routes_read
+        self.lines_written = lines_written
+        self.duplicates = duplicates
+        self.conflicts = conflicts
+        self.errors = errors
+
+    def __str__(self):
+        return (f"{self.routes_read} routes read, {self.lines_written} lines written, "
+                f"{self.duplicates} duplicates, {len(self.conflicts)} conflicts, {len(self.errors)} errors")
+
+
+class StaticRouteCompiler:
+    """
+    Streams routes into `ip route` commands.
+
+    Attributes:
+        conflicts (list): The RouteConflict records found so far.
+        errors (list): The RowError records of the invalid routes found so far.
+
+    Methods:
+        add(route, line_number=None): Adds one route.
+        compile(source, file_format=None): Adds the routes of a table.
+        close(): Writes the aggregated routes and returns the result.
+    """
+
+    def __init__(self, output=None, aggregate=False):
+        """
+        Initialize a StaticRouteCompiler.
+
+        Args:
+            output (str, os.PathLike or file, optional): The path of the file to write, or an
+                open text file. Lines go to stdout when omitted.
+            aggregate (bool, optional): Aggregate contiguous destinations sharing a next hop
+                and administrative distance (default: False).
+        """
+        if output is None:
+            self._output, self._owned = sys.stdout, False
+        elif isinstance(output, (str, os.PathLike)):
+            self._output, self._owned = open(output, "w", encoding="utf-8"), True
+        else:
+            self._output, self._owned = output, False
+        self.aggregate = aggregate
+        self.conflicts = []
+        self.errors = []
+        self.routes_read = 0
+        self.lines_written = 0
+        self.duplicates = 0
+        self._routes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, address, prefixlen, next_hop, distance):
+        self._output.write(f"ip route {_format_address(address)} {_NETMASKS[prefixlen]} {next_hop} {distance}\n")
+        self.lines_written += 1
+
+    def add(self, route, line_number=None):
+        """
+        Adds one route.
+
+        Args:
+            route (tuple or dict): A (destination, next_hop[, administrative_distance])
+                tuple, or a dictionary with those keys.
+            line_number (int, optional): The line of the route, for error reports.
+
+        Returns:
+            bool: Whether the route is new.
+        """
+        self.routes_read += 1
+        try:
+            address, prefixlen, next_hop, distance = _parse_route(route)
+        except ValueError as error:
+            self.errors.append(RowError(line_number if line_number is not None else self.routes_read,
+                                        route, str(error)))
+            return False
+        key = (address << 6 | prefixlen, next_hop)
+        kept = self._routes.get(key)
+        if kept is not None:
+            if kept == distance:
+                self.duplicates += 1
+            else:
+                self.conflicts.append(RouteConflict(ipaddress.IPv4Network((address, prefixlen)), next_hop,
+                                                    kept, distance, line_number))
+            return False
+        self._routes[key] = distance
+        if not self.aggregate:
+            self._write(address, prefixlen, next_hop, distance)
+        return True
+
+    def compile(self, source, file_format=None):
+        """
+        Adds the routes of a table.
+
+        Args:
+            source (str, os.PathLike, file or iterable): The path of a CSV or JSONL table, an
+                open text file, or an iterable of routes as accepted by add().
+            file_format (str, optional): 'csv' or 'jsonl'. Detected from the file extension
+                when omitted.
+
+        Raises:
+            ValueError: If the file format is not supported.
+        """
+        if isinstance(source, (str, os.PathLike)) or hasattr(source, "read"):
+            for line_number, row in iter_rows(source, file_format):
+                if isinstance(row, RowError):
+                    self.routes_read += 1
+                    self.errors.append(row)
+                else:
+                    self.add(row, line_number)
+        else:
+            for route in source:
+                self.add(route)
+
+    def _aggregated(self):
+        """
+        Returns the routes to write, with contiguous destinations aggregated.
+        """
+        groups = {}
+        trie = PrefixTrie()
+        for (key, next_hop), distance in self._routes.items():
+            prefix = (key >> 6, key & 0x3F)
+            groups.setdefault((next_hop, distance), []).append(prefix)
+            users = trie.get(prefix)
+            if users is None:
+                trie.insert(prefix, {(next_hop, distance)})
+            else:
+                users.add((next_hop, distance))
+
+        routes = []
+        for group, prefixes in groups.items():
+            ranges = collapse_ranges((address, address + (1 << (32 - prefixlen)) - 1)
+                                     for address, prefixlen in prefixes)
+            for first, last in ranges:
+                for address, prefixlen in range_to_prefixes(first, last):
+                    covered = trie.covered((address, prefixlen))
+                    replaced = [network for network, users in covered if group in users]
+                    longest = max(network.prefixlen for network in replaced)
+                    if any(users != {group} and prefixlen <= network.prefixlen <= longest
+                           for network, users in covered):
+                        # Another next hop would win or lose addresses: keep the originals.
+                        routes.extend((int(network.network_address), network.prefixlen, *group)
+                                      for network in replaced)
+                    else:
+                        routes.append((address, prefixlen, *group))
+        routes.sort()
+        return routes
+
+    def close(self):
+        """
+        Writes the aggregated routes, if aggregating, and closes the output file if the
+        compiler opened it.
+
+        Returns:
+            CompileResult: The counts, conflicts and errors of the compilation.
+        """
+        if self.aggregate and self._routes:
+            for route in self._aggregated():
+                self._write(*route)
+            self._routes = {}
+        if self._owned:
+            self._output.close()
+        else:
+            self._output.flush()
+        return CompileResult(self.routes_read, self.lines_written, self.duplicates, self.conflicts, self.errors)
+
+
+def compile_static_routes(routes, output=None, aggregate=False, file_format=None):
+    """
+    Compiles a route table into `ip route` commands.
+
+    Args:
+        routes (str, os.PathLike, file or iterable): The path of a CSV or JSONL table, an
+            open text file, or an iterable of (destination, next_hop[,
+            administrative_distance]) tuples.
+        output (str, os.PathLike or file, optional): Where to write the lines. Lines go to
+            stdout when omitted.
+        aggregate (bool, optional): Aggregate contiguous destinations sharing a next hop and
+            administrative distance (default: False).
+        file_format (str, optional): 'csv' or 'jsonl'. Detected from the file extension when
+            omitted.
+
+    Returns:
+        CompileResult: The counts, conflicts and errors of the compilation.
+    """
+    compiler = StaticRouteCompiler(output, aggregate)
+    try:
+        compiler.compile(routes, file_format)
+    finally:
+        result = compiler.close()
+    return result
@@ -0,0 +1,577 @@
+"""
+spf.py - OSPF shortest path first simulation for CiscoPyKit.
+
+This module computes the routes OSPF would install on every router of a
+topology, to validate a design before any configuration is pushed.
+
+The topology is a directed graph of routers, stored as plain adjacency
+dictionaries. A link from one router to another carries the OSPF cost of the
+outgoing interface. Routers sharing a multi-access segment are linked to each
+other directly, which yields the same distances as the segment's pseudonode.
+Each router also advertises the subnets of its OSPF interfaces as stub
+prefixes. OSPFTopology.from_devices() builds the topology from devices and
+their OSPF instances.
+
+SPFEngine runs Dijkstra once per router, on demand, and keeps the distances and
+first hops (with equal-cost multipath) of each shortest path tree. When a single
+link is added, removed or changes cost, only the trees that the change can
+affect are repaired, and only over the routers below the changed link:
+
+    cost increase or removal   only trees using the link are touched; the
+                               routers below it are detached and re-attached
+                               from their unaffected neighbours
+    cost decrease or addition  only trees the link improves or ties are
+                               touched; the improvement is propagated from the
+                               far end of the link
+
+Classes:
+    OSPFTopology: Routers, links and stub prefixes of an OSPF area.
+    OSPFRoute: One route of a router's OSPF routing table.
+    SPFEngine: Per-router shortest path trees with incremental updates.
+
+Functions:
+    default_cost(interface_name): Returns the default OSPF cost of an interface.
+
+Usage Example:
+    ```
+    from ciscopykit.routing.spf import OSPFTopology, SPFEngine
+
+    topology = OSPFTopology.from_devices(registry, {"r1.hq": ospf1, "r2.hq": ospf2, "r3.hq": ospf3})
+    engine = SPFEngine(topology)
+    for route in engine.routing_table("r1.hq"):
+        print(route)
+
+    changed = engine.set_cost("r1.hq", "r2.hq", 50)    # routers whose paths changed
+    engine.remove_adjacency("r2.hq", "r3.hq")
+    ```
+"""
+
+import heapq
+import ipaddress
+
+REFERENCE_BANDWIDTH = 100000  # kbit/s, the IOS default of 100 Mbit/s
+
+_BANDWIDTHS = (
+    ("TenGigabitEthernet", 10000000),
+    ("GigabitEthernet", 1000000),
+    ("FastEthernet", 100000),
+    ("Ethernet", 10000),
+    ("Serial", 1544),
+    ("Loopback", 8000000),
+)
+
+
+def default_cost(interface_name):
+    """
+    Returns the default OSPF cost of an interface, from its type.
+
+    The cost is the 100 Mbit/s reference bandwidth divided by the default bandwidth of
+    the interface type, and at least 1, as on IOS.
+
+    Args:
+        interface_name (str): The interface name, e.g. 'Serial0/0/0'.
+
+    Returns:
+        int: The cost.
+    """
+    for prefix, bandwidth in _BANDWIDTHS:
+        if interface_name.startswith(prefix):
+            return max(1, REFERENCE_BANDWIDTH // bandwidth)
+    return 1
+
+
+class OSPFTopology:
+    """
+    Represents the routers, links and stub prefixes of an OSPF area.
+
+    Attributes:
+        routers (set): The router names.
+        links (dict): Maps each router to {neighbour: (cost, interface, neighbour address)}.
+        reverse (dict): Maps each router to {router linking to it: cost}.
+        prefixes (dict): Maps each advertised IPv4Network to {router: cost}.
+
+    Methods:
+        add_router(router): Adds a router.
+        add_link(router, neighbour, cost=1, interface=None, address=None): Adds a one-way link.
+        add_prefix(router, network, cost=1): Advertises a stub prefix.
+        from_devices(devices, ospf_instances, costs=None): Builds the topology of devices.
+    """
+
+    def __init__(self):
+        self.routers = set()
+        self.links = {}
+        self.reverse = {}
+        self.prefixes = {}
+
+    def add_router(self, router):
+        """
+        Adds a router.
+
+        Args:
+            router (str): The router name.
+        """
+        if router not in self.routers:
+            self.routers.add(router)
+            self.links[router] = {}
+            self.reverse[router] = {}
+
+    def add_link(self, router, neighbour, cost=1, interface=None, address=None):
+        """
+        Adds a one-way link, or updates it. Of parallel links between the same routers,
+        the cheapest one is kept.
+
+        Args:
+            router (str): The router the link leaves from.
+            neighbour (str): The router the link leads to.
+            cost (int, optional): The OSPF cost of the outgoing interface (default: 1).
+            interface (str, optional): The outgoing interface.
+            address (IPv4Address, optional): The address of the neighbour on the link.
+
+        Raises:
+            ValueError: If the cost is not a positive integer or the link is a loop.
+        """
+        if not isinstance(cost, int) or cost < 1:
+            raise ValueError("The OSPF cost must be a positive integer.")
+        if router == neighbour:
+            raise ValueError("A link must join two different routers.")
+        self.add_router(router)
+        self.add_router(neighbour)
+        current = self.links[router].get(neighbour)
+        if current is None or cost < current[0]:
+            self.links[router][neighbour] = (cost, interface, address)
+            self.reverse[neighbour][router] = cost
+
+    def remove_link(self, router, neighbour):
+        """
+        Removes a one-way link.
+
+        Raises:
+            KeyError: If there is no such link.
+        """
+        del self.links[router][neighbour]
+        del self.reverse[neighbour][router]
+
+    def add_prefix(self, router, network, cost=1):
+        """
+        Advertises a stub prefix from a router.
+
+        Args:
+            router (str): The router name.
+            network (IPv4Network or str): The prefix.
+            cost (int, optional): The cost of the interface attached to it (default: 1).
+        """
+        self.add_router(router)
+        advertisers = self.prefixes.setdefault(ipaddress.IPv4Network(network), {})
+        advertisers[router] = min(cost, advertisers.get(router, cost))
+
+    @classmethod
+    def from_devices(cls, devices, ospf_instances, costs=None):
+        """
+        Builds the topology of devices running OSPF.
+
+        An interface takes part in OSPF when its address falls in one of the networks of
+        the device's OSPF instance. Its subnet is advertised, and unless the interface is
+        passive, every other router with an OSPF interface on the same subnet becomes a
+        neighbour.
+
+        Args:
+            devices (iterable): The devices, e.g. a DeviceRegistry.
+            ospf_instances (dict): Maps device fqdns to their OSPF objects. Devices without
+                an instance are left out.
+            costs (dict, optional): Maps (fqdn, interface name) pairs to OSPF costs.
+                default_cost() is used for the others.
+
+        Returns:
+            OSPFTopology: The topology, with routers named by fqdn.
+        """
+        costs = costs or {}
+        topology = cls()
+        segments = {}
+        for device in devices:
+            ospf = ospf_instances.get(device.fqdn)
+            if ospf is None:
+                continue
+            topology.add_router(device.fqdn)
+            networks = [ipaddress.IPv4Network(network) for network in ospf.networks]
+            passive = set(ospf.passive_interfaces)
+            for interface in device.get_active_interfaces():
+                packed_ip = interface.packed_ip
+                if packed_ip is None:
+                    continue
+                address = ipaddress.IPv4Address(packed_ip[0])
+                if not any(address in network for network in networks):
+                    continue
+                subnet = ipaddress.IPv4Network((packed_ip[0], packed_ip[1]), strict=False)
+                cost = costs.get((device.fqdn, interface.name), default_cost(interface.name))
+                topology.add_prefix(device.fqdn, subnet, cost)
+                if interface.name not in passive:
+                    segments.setdefault(subnet, []).append((device.fqdn, interface.name, address, cost))
+        for members in segments.values():
+            for router, interface, _, cost in members:
+                for neighbour, _, address, _ in members:
+                    if neighbour != router:
+                        topology.add_link(router, neighbour, cost, interface, address)
+        return topology
+
+
+class OSPFRoute:
+    """
+    Represents one route of a router's OSPF routing table.
+
+    Attributes:
+        network (IPv4Network): The destination prefix.
+        cost (int): The total cost to the prefix.
+        next_hops (list): The (neighbour, interface, neighbour address) first hops of the
+            equal-cost paths, sorted. Empty for the router's own prefixes.
+    """
+
+    __slots__ = ("network", "cost", "next_hops")
+
+    def __init__(self, network, cost, next_hops):
+        self.network = network
+        self.cost = cost
+        self.next_hops = next_hops
+
+    @property
+    def connected(self):
+        return not self.next_hops
+
+    def __str__(self):
+        if self.connected:
+            return f"C {self.network} is directly connected, cost {self.cost}"
+        paths = ", ".join(f"via {address or neighbour}, {interface}" for neighbour, interface, address in self.next_hops)
+        return f"O {self.network} [110/{self.cost}] {paths}"
+
+    def __repr__(self):
+        return f"<OSPFRoute {self}>"
+
+
+class _Tree:
+    """
+    The shortest path tree of one router: distances and first hops of every reachable router.
+    """
+
+    __slots__ = ("distance", "first_hops")
+
+    def __init__(self):
+        self.distance = {}
+        self.first_hops = {}
+
+
+class SPFEngine:
+    """
+    Computes per-router shortest path trees and routing tables, with incremental updates.
+
+    Change the topology through the engine's methods so the computed trees are repaired;
+    after changing the topology directly, call reset().
+
+    Attributes:
+        topology (OSPFTopology): The topology.
+        full_runs (int): The number of full Dijkstra runs so far.
+        repairs (int): The number of incremental tree repairs so far.
+
+    Methods:
+        distances(router): Returns the distance to every reachable router.
+        routing_table(router): Returns the OSPF routes of a router.
+        set_cost(router, neighbour, cost): Changes the cost of a link.
+        add_link(router, neighbour, cost=1, interface=None, address=None): Adds a link.
+        remove_link(router, neighbour): Removes a link.
+        remove_adjacency(router, neighbour): Removes the links both ways.
+        reset(): Drops every computed tree.
+    """
+
+    def __init__(self, topology):
+        """
+        Initialize an SPFEngine.
+
+        Args:
+            topology (OSPFTopology): The topology.
+        """
+        self.topology = topology
+        self.full_runs = 0
+        self.repairs = 0
+        self._trees = {}
+        self._tables = {}
+
+    def reset(self):
+        """
+        Drops every computed tree and routing table.
+        """
+        self._trees.clear()
+        self._tables.clear()
+
+    def _hops(self, source, tree, router, neighbour):
+        """
+        Returns the first hops of the paths reaching neighbour through router.
+        """
+        if router == source:
+            cost, interface, address = self.topology.links[router][neighbour]
+            return frozenset(((neighbour, interface, address),))
+        return tree.first_hops[router]
+
+    def _tree(self, source):
+        tree = self._trees.get(source)
+        if tree is not None:
+            return tree
+        if source not in self.topology.routers:
+            raise KeyError(source)
+        self.full_runs += 1
+        tree = _Tree()
+        distance, first_hops = tree.distance, tree.first_hops
+        distance[source] = 0
+        first_hops[source] = frozenset()
+        heap = [(0, source)]
+        done = set()
+        links = self.topology.links
+        while heap:
+            current, router = heapq.heappop(heap)
+            if router in done:
+                continue
+            done.add(router)
+            for neighbour, (cost, _, _) in links[router].items():
+                candidate = current + cost
+                known = distance.get(neighbour)
+                if known is None or candidate < known:
+                    distance[neighbour] = candidate
+                    first_hops[neighbour] = self._hops(source, tree, router, neighbour)
+                    heapq.heappush(heap, (candidate, neighbour))
+                elif candidate == known and neighbour not in done:
+                    first_hops[neighbour] = first_hops[neighbour] | self._hops(source, tree, router, neighbour)
+        self._trees[source] = tree
+        return tree
+
+    def distances(self, router):
+        """
+        Returns the distance from a router to every router it can reach.
+
+        Args:
+            router (str): The router name.
+
+        Returns:
+            dict: Maps router names to total costs.
+
+        Raises:
+            KeyError: If the router is not in the topology.
+        """
+        return dict(self._tree(router).distance)
+
+    def routing_table(self, router):
+        """
+        Returns the OSPF routes of a router.
+
+        For each advertised prefix, the cheapest advertising routers are kept, and the
+        first hops of all of them are the equal-cost next hops.
+
+        Args:
+            router (str): The router name.
+
+        Returns:
+            list: The OSPFRoute objects, sorted by prefix.
+
+        Raises:
+            KeyError: If the router is not in the topology.
+        """
+        table = self._tables.get(router)
+        if table is not None:
+            return table
+        tree = self._tree(router)
+        table = []
+        for network, advertisers in self.topology.prefixes.items():
+            best, hops = None, set()
+            for advertiser, cost in advertisers.items():
+                distance = tree.distance.get(advertiser)
+                if distance is None:
+                    continue
+                total = distance + cost
+                if best is None or total < best:
+                    best, hops = total, set(tree.first_hops[advertiser])
+                elif total == best:
+                    hops |= tree.first_hops[advertiser]
+            if best is not None:
+                table.append(OSPFRoute(network, best, [] if router in advertisers and best == advertisers[router]
+                                       else sorted(hops, key=str)))
+        table.sort(key=lambda route: route.network)
+        self._tables[router] = table
+        return table
+
+    def _below(self, tree, router):
+        """
+        Returns router and every router whose shortest paths may run through it.
+        """
+        distance, links = tree.distance, self.topology.links
+        found = {router}
+        stack = [router]
+        while stack:
+            current = stack.pop()
+            for neighbour, (cost, _, _) in links[current].items():
+                if neighbour not in found and distance.get(neighbour) == distance[current] + cost:
+                    found.add(neighbour)
+                    stack.append(neighbour)
+        return found
+
+    def _rebuild_hops(self, source, tree, routers):
+        """
+        Recomputes the first hops of routers, whose distances are final, from their
+        predecessors on shortest paths.
+        """
+        distance, reverse = tree.distance, self.topology.reverse
+        for router in sorted((router for router in routers if router in distance), key=distance.get):
+            if router == source:
+                continue
+            hops = frozenset()
+            for previous, cost in reverse[router].items():
+                if distance.get(previous) is not None and distance[previous] + cost == distance[router]:
+                    hops |= self._hops(source, tree, previous, router)
+            tree.first_hops[router] = hops
+
+    def _repair_increase(self, source, tree, router, neighbour, old_cost):
+        distance = tree.distance
+        if distance.get(router) is None or distance.get(neighbour) != distance[router] + old_cost:
+            return False
+        # Detach every router that may depend on the link, then re-attach them from the rest.
+        detached = self._below(tree, neighbour)
+        detached.discard(source)
+        for member in detached:
+            del distance[member]
+            del tree.first_hops[member]
+        heap = []
+        for member in detached:
+            for previous, cost in self.topology.reverse[member].items():
+                if previous in distance:
+                    heap.append((distance[previous] + cost, member))
+        heapq.heapify(heap)
+        links = self.topology.links
+        while heap:
+            current, member = heapq.heappop(heap)
+            if member in distance:
+                continue
+            distance[member] = current
+            for following, (cost, _, _) in links[member].items():
+                if following in detached and following not in distance:
+                    heapq.heappush(heap, (current + cost, following))
+        self._rebuild_hops(source, tree, detached)
+        return True
+
+    def _repair_decrease(self, source, tree, router, neighbour, new_cost):
+        distance = tree.distance
+        if distance.get(router) is None:
+            return False
+        candidate = distance[router] + new_cost
+        known = distance.get(neighbour)
+        if known is not None and candidate > known:
+            return False
+        links = self.topology.links
+        if known is None or candidate < known:
+            distance[neighbour] = candidate
+            heap = [(candidate, neighbour)]
+            while heap:
+                current, member = heapq.heappop(heap)
+                if current > distance[member]:
+                    continue
+                for following, (cost, _, _) in links[member].items():
+                    known = distance.get(following)
+                    if known is None or current + cost < known:
+                        distance[following] = current + cost
+                        heapq.heappush(heap, (current + cost, following))
+        self._rebuild_hops(source, tree, self._below(tree, neighbour))
+        return True
+
+    def _update(self, router, neighbour, old_cost, new_cost):
+        """
+        Repairs every computed tree after the cost of a link changed, None meaning absent.
+
+        Returns:
+            set: The routers whose tree changed.
+        """
+        changed = set()
+        for source, tree in self._trees.items():
+            if old_cost is not None and (new_cost is None or new_cost > old_cost):
+                repaired = self._repair_increase(source, tree, router, neighbour, old_cost)
+            else:
+                repaired = self._repair_decrease(source, tree, router, neighbour, new_cost)
+            if repaired:
+                self.repairs += 1
+                changed.add(source)
+                self._tables.pop(source, None)
+        return changed
+
+    def set_cost(self, router, neighbour, cost):
+        """
+        Changes the cost of a link.
+
+        Args:
+            router (str): The router the link leaves from.
+            neighbour (str): The router the link leads to.
+            cost (int): The new cost.
+
+        Returns:
+            set: The routers whose shortest paths changed.
+
+        Raises:
+            KeyError: If there is no such link.
+            ValueError: If the cost is not a positive integer.
+        """
+        if not isinstance(cost, int) or cost < 1:
+            raise ValueError("The OSPF cost must be a positive integer.")
+        old_cost, interface, address = self.topology.links[router][neighbour]
+        if cost == old_cost:
+            return set()
+        self.topology.links[router][neighbour] = (cost, interface, address)
+        self.topology.reverse[neighbour][router] = cost
+        return self._update(router, neighbour, old_cost, cost)
+
+    def add_link(self, router, neighbour, cost=1, interface=None, address=None):
+        """
+        Adds a one-way link, e.g. when an adjacency comes up.
+
+        Args:
+            router (str): The router the link leaves from.
+            neighbour (str): The router the link leads to.
+            cost (int, optional): The OSPF cost of the outgoing interface (default: 1).
+            interface (str, optional): The outgoing interface.
+            address (IPv4Address, optional): The address of the neighbour on the link.
+
+        Returns:
+            set: The routers whose shortest paths changed.
+        """
+        current = self.topology.links.get(router, {}).get(neighbour)
+        if current is not None:
+            if cost < current[0]:
+                self.topology.links[router][neighbour] = (cost, interface, address)
+                self.topology.reverse[neighbour][router] = cost
+                return self._update(router, neighbour, current[0], cost)
+            return set()
+        self.topology.add_link(router, neighbour, cost, interface, address)
+        return self._update(router, neighbour, None, cost)
+
+    def remove_link(self, router, neighbour):
+        """
+        Removes a one-way link.
+
+        Args:
+            router (str): The router the link leaves from.
+            neighbour (str): The router the link leads to.
+
+        Returns:
+            set: The routers whose shortest paths changed.
+
+        Raises:
+            KeyError: If there is no such link.
+        """
+        old_cost = self.topology.links[router][neighbour][0]
+        self.topology.remove_link(router, neighbour)
+        return self._update(router, neighbour, old_cost, None)
+
+    def remove_adjacency(self, router, neighbour):
+        """
+        Removes the links between two routers in both directions, e.g. when an adjacency
+        goes down.
+
+        Returns:
+            set: The routers whose shortest paths changed.
+        """
+        changed = set()
+        for first, second in ((router, neighbour), (neighbour, router)):
+            if second in self.topology.links.get(first, {}):
+                changed |= self.remove_link(first, second)
+        return changed
@@ -8,10 +8,14 @@ Functions:
 - configure_static_route(destination, next_hop, administrative_distance=1): Configures a static route on the device.
 - configure_default_route(next_hop, exit_interface): Configures a default route on the device.
 - configure_route_redistribution(source_protocol, destination_protocol): Configures route redistribution between routing protocols.
+- build_route_table(routes): Indexes static routes for longest-prefix-match lookups.
+- parse_static_route(command): Parses an 'ip route' command back into its arguments.
 """
 
 import ipaddress
 
+from ciscopykit.ip.prefix_trie import PrefixTrie
+
 
 def configure_static_route(destination, next_hop, administrative_distance=1):
     """
@@ -130,3 +134,56 @@ redistribute connected
     return redistribution_config
 
 
+def build_route_table(routes):
+    """
+    Index static routes for longest-prefix-match lookups.
+
+    When several routes share a destination, the one with the lowest administrative
+    distance is kept, as the routing table would.
+
+    Args:
+        routes (iterable): (destination, next_hop) or (destination, next_hop,
+                           administrative_distance) tuples, with the same meaning as the
+                           arguments of configure_static_route.
+
+    Returns:
+        PrefixTrie: Maps each destination network to its (next_hop, administrative_distance)
+                    pair. Use its longest_match(address) method to find the route of an address.
+
+    Example:
+        table = build_route_table([("10.0.0.0/8", "192.168.1.1"), ("10.1.0.0/16", "192.168.1.2", 5)])
+        network, (next_hop, distance) = table.longest_match("10.1.2.3")
+    """
+    table = PrefixTrie()
+    for route in routes:
+        destination, next_hop = route[0], route[1]
+        administrative_distance = int(route[2]) if len(route) > 2 else 1
+        destination = ipaddress.IPv4Network(destination)
+        current = table.get(destination)
+        if current is None or administrative_distance < current[1]:
+            table.insert(destination, (str(next_hop), administrative_distance))
+    return table
+
+
+def parse_static_route(command):
+    """
+    Parse an 'ip route' command, as generated by configure_static_route, back into its arguments.
+
+    Args:
+        command (str): The command, e.g. 'ip route 10.10.10.0 255.255.255.0 10.0.0.1 1'.
+
+    Returns:
+        tuple: The destination in CIDR notation, the next hop and the administrative distance.
+
+    Raises:
+        ValueError: If the command is not a valid 'ip route' command.
+    """
+    fields = command.split()
+    if len(fields) not in (5, 6) or fields[:2] != ["ip", "route"]:
+        raise ValueError(f"Invalid static route command: '{command}'.")
+    try:
+        destination = ipaddress.IPv4Network(f"{fields[2]}/{fields[3]}")
+        administrative_distance = int(fields[5]) if len(fields) == 6 else 1
+    except ValueError:
+        raise ValueError(f"Invalid static route command: '{command}'.")
+    return str(destination), fields[4], administrative_distance
@@ -1,22 +1,407 @@
+import bisect
 from abc import ABC, abstractmethod
 
+MAX_SEQUENCE = 2147483647
+SEQUENCE_STEP = 10
+
+ANY = (0, 0xFFFFFFFF)
+
+# Port names IOS accepts in place of TCP and UDP port numbers, with the http, https and
+# ssh aliases other platforms write.
+PORT_NAMES = {
+    "echo": 7, "discard": 9, "daytime": 13, "chargen": 19, "ftp-data": 20, "ftp": 21, "ssh": 22,
+    "telnet": 23, "smtp": 25, "time": 37, "nameserver": 42, "whois": 43, "tacacs": 49, "domain": 53,
+    "bootps": 67, "bootpc": 68, "tftp": 69, "gopher": 70, "finger": 79, "www": 80, "http": 80,
+    "hostname": 101, "pop2": 109, "pop3": 110, "sunrpc": 111, "ident": 113, "nntp": 119, "ntp": 123,
+    "netbios-ns": 137, "netbios-dgm": 138, "netbios-ss": 139, "snmp": 161, "snmptrap": 162,
+    "xdmcp": 177, "bgp": 179, "irc": 194, "dnsix": 195, "mobile-ip": 434, "https": 443,
+    "pim-auto-rp": 496, "isakmp": 500, "exec": 512, "biff": 512, "login": 513, "who": 513,
+    "cmd": 514, "syslog": 514, "lpd": 515, "talk": 517, "rip": 520, "uucp": 540, "klogin": 543,
+    "kshell": 544, "drip": 3949, "non500-isakmp": 4500, "onep-plain": 15001, "onep-tls": 15002,
+}
+
+PROTOCOL_NUMBERS = {
+    "icmp": 1, "igmp": 2, "ipinip": 4, "tcp": 6, "udp": 17, "gre": 47, "esp": 50, "ahp": 51, "eigrp": 88,
+    "ospf": 89, "nos": 94, "pim": 103, "pcp": 108,
+}
+
+_PORT_PROTOCOLS = {"tcp", "udp", "6", "17"}
+
+# Operands naming groups defined elsewhere in the configuration, which entries are kept
+# as written for.
+_GROUP_OPERANDS = {"object-group", "addrgroup", "portgroup"}
+
+
+def _parse_address(value):
+    octets = value.split(".")
+    if len(octets) != 4 or not all(octet.isdigit() and int(octet) <= 255 for octet in octets):
+        raise ValueError(f"Invalid address '{value}'.")
+    return int(octets[0]) << 24 | int(octets[1]) << 16 | int(octets[2]) << 8 | int(octets[3])
+
+
+def _parse_port(value):
+    port = PORT_NAMES.get(value.lower()) if not value.isdigit() else int(value)
+    if port is None or not 0 <= port <= 65535:
+        raise ValueError(f"Invalid port '{value}'.")
+    return port
+
+
+def _is_port(value):
+    return value.isdigit() or value.lower() in PORT_NAMES
+
+
+def _uses_groups(text):
+    words = text.lower().split()
+    if words and words[0].isdigit():
+        words.pop(0)
+    return bool(words) and words[0] in ("permit", "deny") and not _GROUP_OPERANDS.isdisjoint(words)
+
+
+def protocol_number(protocol):
+    """
+    Returns the IP protocol number of an ACL protocol keyword or number.
+
+    Args:
+        protocol (str or int): The protocol, e.g. "tcp", "17" or 89.
+
+    Returns:
+        int: The protocol number.
+
+    Raises:
+        ValueError: If the protocol is unknown or not between 0 and 255.
+    """
+    if isinstance(protocol, int):
+        number = protocol
+    elif protocol.isdigit():
+        number = int(protocol)
+    elif protocol.lower() in PROTOCOL_NUMBERS:
+        number = PROTOCOL_NUMBERS[protocol.lower()]
+    else:
+        raise ValueError(f"Unknown protocol '{protocol}'.")
+    if not 0 <= number <= 255:
+        raise ValueError(f"Invalid protocol {number}.")
+    return number
+
+
+class AclEntry:
+    """
+    Represents one entry of an ACL.
+
+    Addresses are (address, wildcard) pairs of integers, with the address bits under the
+    wildcard cleared, so ('any') is (0, 0xFFFFFFFF) and ('host 10.0.0.1') is
+    (167772161, 0). Ports are tuples of inclusive (first, last) ranges, or None when any
+    port matches.
+
+    An entry matching `object-group`, `addrgroup` or `portgroup` operands, whose fields
+    cannot be parsed without the groups, can be kept as written with unparsed(). Its
+    fields are left empty and it is marked opaque, for the tools working on fields to
+    leave alone.
+
+    Attributes:
+        sequence (int or None): The sequence number. None until the entry is added to an
+            ACL, when an entry written without one gets the highest one plus 10.
+        action (str): 'permit', 'deny' or 'remark'.
+        protocol (str or None): The protocol of an extended entry, e.g. 'ip' or 'tcp'.
+        source (tuple): The source (address, wildcard) pair.
+        source_ports (tuple or None): The source port ranges.
+        destination (tuple or None): The destination (address, wildcard) pair, None for
+            standard entries.
+        destination_ports (tuple or None): The destination port ranges.
+        options (tuple): The remaining keywords, e.g. ('established', 'log').
+        remark (str or None): The text of a remark.
+        text (str): The entry as written.
+        opaque (bool): Whether the entry is kept as written, without parsed fields.
+    """
+
+    __slots__ = ("sequence", "action", "protocol", "source", "source_ports", "destination",
+                 "destination_ports", "options", "remark", "text", "opaque")
+
+    def __init__(self, action, source=ANY, destination=None, protocol=None, source_ports=None,
+                 destination_ports=None, options=(), sequence=None, remark=None, text=None):
+        """
+        Initialize an AclEntry.
+
+        Args:
+            action (str): 'permit', 'deny' or 'remark'.
+            source (tuple, optional): The source (address, wildcard) pair (default: any).
+            destination (tuple, optional): The destination pair, for extended entries.
+            protocol (str, optional): The protocol, for extended entries.
+            source_ports (tuple, optional): The source (first, last) port ranges.
+            destination_ports (tuple, optional): The destination (first, last) port ranges.
+            options (tuple, optional): The remaining keywords.
+            sequence (int, optional): The sequence number.
+            remark (str, optional): The text of a remark.
+            text (str, optional): The entry as written. Formatted from the fields when omitted.
+
+        Raises:
+            ValueError: If the action or the sequence number is invalid.
+        """
+        if action not in ("permit", "deny", "remark"):
+            raise ValueError(f"Invalid action '{action}'.")
+        if sequence is not None and not 1 <= sequence <= MAX_SEQUENCE:
+            raise ValueError(f"Invalid sequence number {sequence}.")
+        self.sequence = sequence
+        self.action = action
+        self.protocol = protocol
+        self.source = (source[0] & ~source[1] & 0xFFFFFFFF, source[1])
+        self.destination = None if destination is None else \
+            (destination[0] & ~destination[1] & 0xFFFFFFFF, destination[1])
+        self.source_ports = tuple(source_ports) if source_ports is not None else None
+        self.destination_ports = tuple(destination_ports) if destination_ports is not None else None
+        self.options = tuple(options)
+        self.remark = remark
+        self.opaque = False
+        if text is None:
+            text = self.body() if sequence is None else f"{sequence} {self.body()}"
+        self.text = text
+
+    @classmethod
+    def unparsed(cls, text):
+        """
+        Returns an entry kept as written, without parsing its fields.
+
+        Only its sequence number and action are read, the action being None when the
+        entry does not start with 'permit', 'deny' or 'remark'.
+
+        Args:
+            text (str): The entry, e.g. '30 permit tcp object-group SRC object-group DST eq 443'.
+
+        Returns:
+            AclEntry: The opaque entry.
+        """
+        words = text.split()
+        entry = cls.__new__(cls)
+        entry.sequence = None
+        if words and words[0].isdigit():
+            sequence = int(words.pop(0))
+            if 1 <= sequence <= MAX_SEQUENCE:
+                entry.sequence = sequence
+        action = words[0].lower() if words else None
+        entry.action = action if action in ("permit", "deny", "remark") else None
+        entry.protocol = entry.destination = entry.source_ports = entry.destination_ports = None
+        entry.remark = None
+        entry.source = ANY
+        entry.options = ()
+        entry.text = text
+        entry.opaque = True
+        return entry
+
+    @classmethod
+    def parse(cls, text, standard=False):
+        """
+        Parses an entry.
+
+        Args:
+            text (str): The entry, e.g. '10 permit tcp any host 10.0.0.1 eq 443'.
+            standard (bool, optional): Parse a standard entry, with a source only
+                (default: False).
+
+        Returns:
+            AclEntry: The entry.
+
+        Raises:
+            ValueError: If the entry is invalid.
+        """
+        words = text.split()
+        sequence = None
+        if words and words[0].isdigit():
+            sequence = int(words.pop(0))
+        if not words:
+            raise ValueError(f"Invalid ACL entry '{text}'.")
+        action = words[0].lower()
+        if action == "remark":
+            return cls("remark", sequence=sequence, remark=" ".join(words[1:]), text=text)
+        if action not in ("permit", "deny"):
+            raise ValueError(f"Invalid action in ACL entry '{text}'.")
+        position = 1
+
+        def address():
+            nonlocal position
+            if position >= len(words):
+                raise ValueError(f"Missing address in ACL entry '{text}'.")
+            word = words[position].lower()
+            if word == "any":
+                position += 1
+                return ANY
+            if word == "host":
+                if position + 1 >= len(words):
+                    raise ValueError(f"Missing host address in ACL entry '{text}'.")
+                position += 2
+                return _parse_address(words[position - 1]), 0
+            value = _parse_address(words[position])
+            position += 1
+            if position < len(words) and "." in words[position]:
+                position += 1
+                return value, _parse_address(words[position - 1])
+            if not standard:
+                raise ValueError(f"Missing wildcard mask in ACL entry '{text}'.")
+            return value, 0
+
+        def ports():
+            nonlocal position
+            if position >= len(words):
+                return None
+            operator = words[position].lower()
+            if operator not in ("eq", "neq", "lt", "gt", "range"):
+                return None
+            values = []
+            limit = {"range": 2, "lt": 1, "gt": 1}.get(operator)
+            position += 1
+            while position < len(words) and _is_port(words[position]) and (limit is None or len(values) < limit):
+                values.append(_parse_port(words[position]))
+                position += 1
+            if not values or operator == "range" and len(values) != 2:
+                raise ValueError(f"Invalid port match in ACL entry '{text}'.")
+            if operator == "eq":
+                return tuple((port, port) for port in sorted(set(values)))
+            if operator == "range":
+                if values[0] > values[1]:
+                    raise ValueError(f"Invalid port range in ACL entry '{text}'.")
+                return ((values[0], values[1]),)
+            if operator == "lt":
+                return ((0, values[0] - 1),) if values[0] > 0 else ()
+            if operator == "gt":
+                return ((values[0] + 1, 65535),) if values[0] < 65535 else ()
+            ranges, first = [], 0
+            for port in sorted(set(values)):
+                if port > first:
+                    ranges.append((first, port - 1))
+                first = port + 1
+            if first <= 65535:
+                ranges.append((first, 65535))
+            return tuple(ranges)
+
+        if standard:
+            source = address()
+            return cls(action, source, sequence=sequence, options=words[position:], text=text)
+        if position >= len(words):
+            raise ValueError(f"Missing protocol in ACL entry '{text}'.")
+        protocol = words[position].lower()
+        position += 1
+        source = address()
+        source_ports = ports() if protocol in _PORT_PROTOCOLS else None
+        destination = address()
+        destination_ports = ports() if protocol in _PORT_PROTOCOLS else None
+        return cls(action, source, destination, protocol, source_ports, destination_ports,
+                   words[position:], sequence, text=text)
+
+    @staticmethod
+    def _format_address(pair):
+        address, wildcard = pair
+        dotted = f"{address >> 24}.{address >> 16 & 255}.{address >> 8 & 255}.{address & 255}"
+        if wildcard == 0xFFFFFFFF:
+            return "any"
+        if wildcard == 0:
+            return f"host {dotted}"
+        return f"{dotted} {wildcard >> 24}.{wildcard >> 16 & 255}.{wildcard >> 8 & 255}.{wildcard & 255}"
+
+    @staticmethod
+    def _format_ports(ranges):
+        if ranges is None:
+            return []
+        if len(ranges) == 1:
+            first, last = ranges[0]
+            if (first, last) == (0, 65535):
+                return []
+            if first == last:
+                return [f"eq {first}"]
+            if first == 0:
+                return [f"lt {last + 1}"]
+            if last == 65535:
+                return [f"gt {first - 1}"]
+            return [f"range {first} {last}"]
+        if all(first == last for first, last in ranges):
+            return ["eq " + " ".join(str(first) for first, _ in ranges)]
+        gaps, previous = [], -1
+        for first, last in list(ranges) + [(65536, 65536)]:
+            gaps.extend(range(previous + 1, first))
+            previous = last
+        if len(gaps) == len(ranges) - 1 + (ranges[0][0] > 0) + (ranges[-1][1] < 65535):
+            return ["neq " + " ".join(str(port) for port in gaps)]
+        raise ValueError("Port ranges cannot be written as a single match.")
+
+    def body(self):
+        """
+        Returns the entry without its sequence number, formatted from its fields.
+
+        Returns:
+            str: The entry, e.g. 'permit tcp any host 10.0.0.1 eq 443'.
+        """
+        if self.opaque:
+            first, _, rest = self.text.strip().partition(" ")
+            return rest.lstrip() if first.isdigit() else self.text.strip()
+        if self.action == "remark":
+            return f"remark {self.remark}" if self.remark else "remark"
+        words = [self.action]
+        if self.protocol is not None:
+            words.append(self.protocol)
+        words.append(self._format_address(self.source))
+        words.extend(self._format_ports(self.source_ports))
+        if self.destination is not None:
+            words.append(self._format_address(self.destination))
+            words.extend(self._format_ports(self.destination_ports))
+        words.extend(self.options)
+        return " ".join(words)
+
+    def line(self):
+        """
+        Returns the entry with its sequence number, as written under `ip access-list`.
+
+        Returns:
+            str: The entry, e.g. '10 permit ip any any'.
+        """
+        first, _, rest = self.text.partition(" ")
+        text = rest.lstrip() if first.isdigit() else self.text
+        return f"{self.sequence} {text}" if self.sequence is not None else text
+
+    def key(self):
+        """
+        Returns the fields of the entry, without its sequence number and text.
+
+        Returns:
+            tuple: The action, protocol, addresses, ports, options and remark; for an opaque
+                entry, its words.
+        """
+        if self.opaque:
+            return ("opaque", tuple(self.body().split()))
+        return (self.action, self.protocol, self.source, self.source_ports, self.destination,
+                self.destination_ports, self.options, self.remark)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"<AclEntry {self.line()}>"
+
 class ACL(ABC):
     """
     Abstract base class representing an Access Control List (ACL).
 
+    Entries are kept as written, in the order they were added, and indexed by sequence
+    number. An entry written without a sequence number gets the highest one plus 10, as
+    on IOS, without changing how it is written. A permit or deny entry using
+    `object-group`, `addrgroup` or `portgroup` operands is kept as an opaque entry; any
+    other entry that cannot be parsed is rejected.
+
     Attributes:
         acl_identifier (int or str): The ACL identifier (number or name).
-        entries (list): List of ACL entries.
+        entries (list): List of ACL entries, as written.
+        standard (bool): Whether entries match a source address only.
 
     Methods:
         add_entry(entry): Add an entry to the ACL.
+        extend(entries): Add several entries to the ACL.
         remove_entry(entry): Remove an entry from the ACL.
+        get_entry(sequence): Return the entry with a sequence number.
+        ordered_entries(): Return the entries in sequence order.
         configure(): Generate the configuration for the ACL.
 
     Raises:
         ValueError: If an entry with the same sequence number already exists (for numbered ACLs).
     """
 
+    standard = False
+
     def __init__(self, acl_identifier):
         """
         Initialize an ACL.
@@ -26,6 +411,12 @@ class ACL(ABC):
         """
         self.acl_identifier = acl_identifier
         self.entries = []
+        self._by_sequence = {}
+        self._sequences = []
+        self._sequences_of = {}
+
+    def __len__(self):
+        return len(self.entries)
 
     @abstractmethod
     def configure(self):
@@ -39,30 +430,130 @@ class ACL(ABC):
         """
         pass
 
+    def _parse(self, entry):
+        if not isinstance(entry, AclEntry):
+            try:
+                return AclEntry.parse(entry, self.standard)
+            except ValueError:
+                if not _uses_groups(entry):
+                    raise
+                return AclEntry.unparsed(entry)
+        if entry.opaque:
+            return AclEntry.unparsed(entry.text)
+        if entry.action != "remark" and (entry.destination is None) != self.standard:
+            kind = "standard" if self.standard else "extended"
+            raise ValueError(f"Entry '{entry.text}' does not fit a {kind} ACL.")
+        # A copy, so that numbering it leaves the caller's entry alone.
+        return AclEntry(entry.action, entry.source, entry.destination, entry.protocol, entry.source_ports,
+                        entry.destination_ports, entry.options, entry.sequence, entry.remark, entry.text)
+
+    def _store(self, entry):
+        self.entries.append(entry.text)
+        self._by_sequence[entry.sequence] = entry
+        self._sequences_of.setdefault(entry.text, []).append(entry.sequence)
+
     def add_entry(self, entry):
         """
         Add an entry to the ACL.
 
         Args:
-            entry (str): The ACL entry to add.
+            entry (str or AclEntry): The ACL entry to add.
+
+        Returns:
+            AclEntry: The entry added, with its sequence number.
+
+        Raises:
+            ValueError: If the entry is invalid or an entry with the same sequence number
+                already exists.
+        """
+        entry = self._parse(entry)
+        if entry.sequence is None:
+            entry.sequence = (self._sequences[-1] if self._sequences else 0) + SEQUENCE_STEP
+            if entry.sequence > MAX_SEQUENCE:
+                raise ValueError("No sequence number left after the last entry.")
+            self._sequences.append(entry.sequence)
+        elif entry.sequence in self._by_sequence:
+            raise ValueError("Entry with the same sequence number already exists.")
+        else:
+            bisect.insort(self._sequences, entry.sequence)
+        self._store(entry)
+        return entry
+
+    def extend(self, entries):
+        """
+        Add several entries to the ACL.
+
+        The entries are all validated before any is added, so either all or none of them
+        are added.
+
+        Args:
+            entries (iterable): The ACL entries to add, as strings or AclEntry objects.
+
+        Returns:
+            list: The AclEntry objects added, with their sequence numbers.
 
         Raises:
-            ValueError: If an entry with the same sequence number already exists.
+            ValueError: If an entry is invalid or repeats a sequence number.
         """
-        for existing_entry in self.entries:
-            if existing_entry.split()[0] == entry.split()[0]:
-                raise ValueError("Entry with the same sequence number already exists.")
-        self.entries.append(entry)
+        parsed = [self._parse(entry) for entry in entries]
+        last = self._sequences[-1] if self._sequences else 0
+        sequences = set()
+        for entry in parsed:
+            if entry.sequence is None:
+                entry.sequence = last + SEQUENCE_STEP
+                if entry.sequence > MAX_SEQUENCE:
+                    raise ValueError("No sequence number left after the last entry.")
+            if entry.sequence in sequences or entry.sequence in self._by_sequence:
+                raise ValueError(f"Entry with the same sequence number {entry.sequence} already exists.")
+            sequences.add(entry.sequence)
+            last = max(last, entry.sequence)
+        previous = self._sequences[-1] if self._sequences else 0
+        for entry in parsed:
+            self._store(entry)
+        self._sequences.extend(sorted(sequences))
+        if sequences and min(sequences) < previous:
+            # Two sorted runs: merged in linear time.
+            self._sequences.sort()
+        return parsed
 
     def remove_entry(self, entry):
         """
         Remove an entry from the ACL.
 
         Args:
-            entry (str): The ACL entry to remove.
+            entry (str or AclEntry): The ACL entry to remove.
+        """
+        text = entry.text if isinstance(entry, AclEntry) else entry
+        sequences = self._sequences_of.get(text)
+        if not sequences:
+            return
+        sequence = sequences.pop(0)
+        if not sequences:
+            del self._sequences_of[text]
+        del self._by_sequence[sequence]
+        del self._sequences[bisect.bisect_left(self._sequences, sequence)]
+        self.entries.remove(text)
+
+    def get_entry(self, sequence):
         """
-        if entry in self.entries:
-            self.entries.remove(entry)
+        Return the entry with a sequence number.
+
+        Args:
+            sequence (int): The sequence number.
+
+        Returns:
+            AclEntry or None: The entry, or None if there is none.
+        """
+        return self._by_sequence.get(sequence)
+
+    def ordered_entries(self):
+        """
+        Return the entries in sequence order, the order a device evaluates them in.
+
+        Returns:
+            list: The AclEntry objects.
+        """
+        return [self._by_sequence[sequence] for sequence in self._sequences]
 
 class StandardNumberedACL(ACL):
     """
@@ -72,6 +563,8 @@ class StandardNumberedACL(ACL):
         configure(): Generate the configuration for the standard numbered ACL.
     """
 
+    standard = True
+
     def __init__(self, acl_number):
         """
         Initialize a standard numbered ACL.
@@ -138,6 +631,8 @@ class NamedStandardACL(ACL):
         configure(): Generate the configuration for the named standard ACL.
     """
 
+    standard = True
+
     def __init__(self, acl_name):
         """
         Initialize a named standard ACL.
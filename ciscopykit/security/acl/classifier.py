@@ -0,0 +1,446 @@
+"""
+classifier.py - Offline ACL packet classification for CiscoPyKit.
+
+This module tells which entry of an ACL matches a packet, to check what an
+ACL permits without pushing it to a device. Packets are 5-tuples of protocol,
+source address, source port, destination address and destination port, and
+the first matching entry in sequence order wins, as on a device.
+
+An ACL is compiled once into one table per field. The values of a field are
+split at every bound of an entry, and each resulting range of values maps to
+the set of entries matching it, as a bitset over the entries in sequence order.
+Ranges whose sets are equal share one bitset. A packet then matches the
+entries in the intersection of its five bitsets, and the lowest set bit is its
+entry. Entries whose wildcard masks are not contiguous are compiled as the
+range of addresses they span and checked bit by bit when they come first.
+
+With NumPy installed, classify_many() looks up whole arrays of packets at once:
+ports and protocols through a direct table, addresses with a binary search,
+and the bitsets are intersected 64 entries at a time, dropping each packet as
+soon as it has its match, which handles millions of packets per second.
+
+Entries with match options a 5-tuple does not carry (`established`, ICMP
+types, DSCP values and the like) are left out, as for the first packet of a
+connection, and listed in AclClassifier.skipped, as are opaque entries, such
+as those using object groups.
+
+Classes:
+    AclClassifier: An ACL compiled for packet classification.
+
+Functions:
+    find_difference(first, second, max_boxes=1000000): Returns a packet two ACLs treat
+        differently.
+
+Usage Example:
+    ```
+    from ciscopykit.security.acl.classifier import AclClassifier
+
+    classifier = AclClassifier(acl)
+    print(classifier.classify("tcp", "10.0.0.5", 40000, "192.168.1.10", 443))   # e.g. 30
+    print(classifier.permits(6, "10.0.0.5", 40000, "192.168.1.10", 22))
+    sequences = classifier.classify_many(protocols, sources, source_ports, destinations, destination_ports)
+    ```
+"""
+
+import bisect
+import ipaddress
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+from ciscopykit.security.acl.acl import protocol_number
+
+_PORT_PROTOCOLS = (6, 17)
+_LOG_OPTIONS = {"log", "log-input"}
+
+# (field, number of values) in the order of a 5-tuple.
+_FIELDS = (("protocol", 256), ("source", 1 << 32), ("source_ports", 65536), ("destination", 1 << 32),
+           ("destination_ports", 65536))
+
+
+def _as_address(address):
+    if isinstance(address, int):
+        return address
+    return int(address if isinstance(address, ipaddress.IPv4Address) else ipaddress.IPv4Address(address))
+
+
+class _FieldTable:
+    """
+    The ranges of values of one field, and the bitset of entries matching each.
+    """
+
+    def __init__(self, bounds, classes, bitsets):
+        self.bounds = bounds
+        self.classes = classes
+        self.bitsets = bitsets
+
+    @classmethod
+    def build(cls, ranges, size, every):
+        """
+        Builds the table from (entry, (first, last) ranges) pairs; every is the bitset of
+        the entries matching any value.
+        """
+        toggles = {}
+        for bit, entry_ranges in ranges:
+            for first, last in entry_ranges:
+                toggles[first] = toggles.get(first, 0) ^ bit
+                if last + 1 < size:
+                    toggles[last + 1] = toggles.get(last + 1, 0) ^ bit
+        toggles.setdefault(0, 0)
+        bounds, classes, numbers = [], [], {}
+        running = 0
+        for bound in sorted(toggles):
+            running ^= toggles[bound]
+            number = numbers.setdefault(running | every, len(numbers))
+            if not classes or classes[-1] != number:
+                bounds.append(bound)
+                classes.append(number)
+        return cls(bounds, classes, list(numbers))
+
+    def bitset(self, value):
+        return self.bitsets[self.classes[bisect.bisect_right(self.bounds, value) - 1]]
+
+
+class AclClassifier:
+    """
+    Represents an ACL compiled for packet classification.
+
+    Attributes:
+        entries (list): The AclEntry objects compiled, in sequence order.
+        skipped (list): The AclEntry objects left out for their match options, or for
+            being opaque.
+
+    Methods:
+        classify(protocol, source, source_port, destination, destination_port): Returns the
+            sequence number of the entry matching a packet.
+        permits(protocol, source, source_port, destination, destination_port): Returns
+            whether a packet is permitted.
+        classify_many(protocols, sources, source_ports, destinations, destination_ports):
+            Returns the sequence number of the entry matching each packet.
+        permits_many(protocols, sources, source_ports, destinations, destination_ports):
+            Returns whether each packet is permitted.
+    """
+
+    def __init__(self, acl):
+        """
+        Compiles an ACL.
+
+        Args:
+            acl (ACL): The ACL.
+
+        Raises:
+            ValueError: If an entry has an unknown protocol.
+        """
+        self.entries = []
+        self.skipped = []
+        for entry in acl.ordered_entries():
+            if entry.action == "remark":
+                continue
+            if entry.opaque or any(option.lower() not in _LOG_OPTIONS for option in entry.options):
+                self.skipped.append(entry)
+            else:
+                self.entries.append(entry)
+
+        fields = [([], 0) for _ in _FIELDS]
+        self._irregular = []
+        for position, entry in enumerate(self.entries):
+            bit = 1 << position
+            protocol = protocol_number(entry.protocol) if entry.protocol not in (None, "ip") else None
+            destination = entry.destination if entry.destination is not None else (0, 0xFFFFFFFF)
+            values = (
+                None if protocol is None else ((protocol, protocol),),
+                self._address_range(position, 0, entry.source),
+                entry.source_ports if protocol in _PORT_PROTOCOLS else None,
+                self._address_range(position, 1, destination),
+                entry.destination_ports if protocol in _PORT_PROTOCOLS else None,
+            )
+            for number, ranges in enumerate(values):
+                if ranges is None:
+                    fields[number] = (fields[number][0], fields[number][1] | bit)
+                else:
+                    fields[number][0].append((bit, ranges))
+        self._tables = [_FieldTable.build(ranges, size, every)
+                        for (ranges, every), (_, size) in zip(fields, _FIELDS)]
+        self._sequences = [entry.sequence for entry in self.entries]
+        self._permits = [entry.action == "permit" for entry in self.entries]
+        self._irregular_bits = {}
+        for position, side, address in self._irregular:
+            self._irregular_bits.setdefault(position, []).append((side, address))
+        if np is not None:
+            self._compile_arrays()
+
+    def _address_range(self, position, side, address):
+        value, wildcard = address
+        if wildcard == 0xFFFFFFFF:
+            return None
+        if wildcard & (wildcard + 1):
+            # Not a prefix: compiled as the addresses it spans, checked exactly later.
+            self._irregular.append((position, side, address))
+            span = (1 << wildcard.bit_length()) - 1
+            return ((value & ~span, value | span),)
+        return ((value, value | wildcard),)
+
+    def _compile_arrays(self):
+        words = max(1, (len(self.entries) + 63) // 64)
+        self._words = words
+        self._lookups = []
+        self._bitset_arrays = []
+        for table, (_, size) in zip(self._tables, _FIELDS):
+            if size <= 65536:
+                bounds = np.asarray(table.bounds + [size], dtype=np.int64)
+                lookup = np.repeat(np.asarray(table.classes, dtype=np.int32), np.diff(bounds))
+            else:
+                lookup = (np.asarray(table.bounds, dtype=np.uint32), np.asarray(table.classes, dtype=np.int32))
+            self._lookups.append(lookup)
+            bitsets = np.frombuffer(b"".join(bitset.to_bytes(words * 8, "little") for bitset in table.bitsets),
+                                    dtype="<u8").reshape(len(table.bitsets), words)
+            # One contiguous row of classes per word, for the gathers of classify_many().
+            self._bitset_arrays.append(np.ascontiguousarray(bitsets.T))
+        self._sequence_array = np.asarray(self._sequences + [0], dtype=np.int64)
+        self._permit_array = np.asarray(self._permits + [False], dtype=bool)
+        self._irregular_words = {}
+        for position, checks in self._irregular_bits.items():
+            self._irregular_words.setdefault(position // 64, []).append((np.uint64(1 << position % 64), checks))
+
+    def _match(self, protocol, source, source_port, destination, destination_port):
+        values = (protocol, source, source_port, destination, destination_port)
+        matches = -1
+        for table, value in zip(self._tables, values):
+            matches &= table.bitset(value)
+        while matches:
+            position = (matches & -matches).bit_length() - 1
+            checks = self._irregular_bits.get(position)
+            if checks is None or all((values[1 + 2 * side] & ~wildcard) == value
+                                     for side, (value, wildcard) in checks):
+                return position
+            matches &= matches - 1
+        return None
+
+    def _permits_packet(self, packet):
+        position = self._match(*packet)
+        return position is not None and self._permits[position]
+
+    def _normalize(self, protocol, source, source_port, destination, destination_port):
+        return (protocol_number(protocol), _as_address(source), int(source_port), _as_address(destination),
+                int(destination_port))
+
+    def classify(self, protocol, source, source_port, destination, destination_port):
+        """
+        Returns the sequence number of the entry matching a packet.
+
+        Args:
+            protocol (int or str): The IP protocol, as a number or a name such as 'tcp'.
+            source (IPv4Address, str or int): The source address.
+            source_port (int): The source port, ignored by entries without ports.
+            destination (IPv4Address, str or int): The destination address.
+            destination_port (int): The destination port.
+
+        Returns:
+            int or None: The sequence number of the first matching entry, or None when the
+                packet falls through to the implicit deny.
+        """
+        position = self._match(*self._normalize(protocol, source, source_port, destination, destination_port))
+        return None if position is None else self._sequences[position]
+
+    def permits(self, protocol, source, source_port, destination, destination_port):
+        """
+        Returns whether a packet is permitted.
+
+        Args:
+            protocol (int or str): The IP protocol, as a number or a name such as 'tcp'.
+            source (IPv4Address, str or int): The source address.
+            source_port (int): The source port.
+            destination (IPv4Address, str or int): The destination address.
+            destination_port (int): The destination port.
+
+        Returns:
+            bool: Whether the first matching entry permits the packet.
+        """
+        return self._permits_packet(self._normalize(protocol, source, source_port, destination, destination_port))
+
+    def _match_arrays(self, protocols, sources, source_ports, destinations, destination_ports):
+        """
+        Returns the position of the entry matching each packet, or len(entries).
+        """
+        columns = []
+        for values, lookup in zip((protocols, sources, source_ports, destinations, destination_ports),
+                                  self._lookups):
+            if isinstance(lookup, tuple):
+                bounds, classes = lookup
+                columns.append(classes[np.searchsorted(bounds, values, side="right") - 1])
+            else:
+                columns.append(lookup[values])
+        count = len(columns[0])
+        positions = np.full(count, len(self.entries), dtype=np.int64)
+        pending = np.arange(count)
+        for word in range(self._words):
+            if not pending.size:
+                break
+            matches = self._bitset_arrays[0][word][columns[0][pending]]
+            for number in range(1, len(columns)):
+                matches &= self._bitset_arrays[number][word][columns[number][pending]]
+            for bit, checks in self._irregular_words.get(word, ()):
+                failed = np.zeros(pending.size, dtype=bool)
+                for side, (value, wildcard) in checks:
+                    addresses = (sources if side == 0 else destinations)[pending]
+                    failed |= (addresses & np.uint32(~wildcard & 0xFFFFFFFF)) != np.uint32(value)
+                matches[failed] &= ~bit
+            hit = matches != 0
+            if hit.any():
+                found = matches[hit]
+                lowest = found & (~found + np.uint64(1))
+                positions[pending[hit]] = word * 64 + np.log2(lowest.astype(np.float64)).astype(np.int64)
+                pending = pending[~hit]
+        return positions
+
+    def _arrays(self, protocols, sources, source_ports, destinations, destination_ports):
+        if not isinstance(protocols, np.ndarray) or protocols.dtype.kind not in "iu":
+            protocols = np.fromiter((protocol_number(protocol) for protocol in protocols), dtype=np.int64)
+        arrays = [protocols]
+        for values, convert in ((sources, _as_address), (source_ports, int), (destinations, _as_address),
+                                (destination_ports, int)):
+            if not isinstance(values, np.ndarray):
+                values = np.fromiter((convert(value) for value in values), dtype=np.int64)
+            arrays.append(values)
+        return [arrays[0].astype(np.intp, copy=False), arrays[1].astype(np.uint32, copy=False),
+                arrays[2].astype(np.intp, copy=False), arrays[3].astype(np.uint32, copy=False),
+                arrays[4].astype(np.intp, copy=False)]
+
+    def classify_many(self, protocols, sources, source_ports, destinations, destination_ports):
+        """
+        Returns the sequence number of the entry matching each of many packets.
+
+        Args:
+            protocols (iterable or array-like): The IP protocols, as numbers or names.
+            sources (iterable or array-like): The source addresses, as integers,
+                IPv4Address objects or strings.
+            source_ports (iterable or array-like): The source ports.
+            destinations (iterable or array-like): The destination addresses.
+            destination_ports (iterable or array-like): The destination ports.
+
+        Returns:
+            numpy.ndarray or list: The sequence number of the first matching entry of each
+                packet, or 0 when it falls through to the implicit deny. A NumPy int64
+                array when NumPy is installed, a list otherwise.
+        """
+        if np is not None:
+            return self._sequence_array[self._match_arrays(*self._arrays(
+                protocols, sources, source_ports, destinations, destination_ports))]
+        return [self.classify(*packet) or 0
+                for packet in zip(protocols, sources, source_ports, destinations, destination_ports)]
+
+    def permits_many(self, protocols, sources, source_ports, destinations, destination_ports):
+        """
+        Returns whether each of many packets is permitted.
+
+        Args:
+            protocols (iterable or array-like): The IP protocols, as numbers or names.
+            sources (iterable or array-like): The source addresses.
+            source_ports (iterable or array-like): The source ports.
+            destinations (iterable or array-like): The destination addresses.
+            destination_ports (iterable or array-like): The destination ports.
+
+        Returns:
+            numpy.ndarray or list: Whether each packet is permitted. A NumPy bool array when
+                NumPy is installed, a list otherwise.
+        """
+        if np is not None:
+            return self._permit_array[self._match_arrays(*self._arrays(
+                protocols, sources, source_ports, destinations, destination_ports))]
+        return [self.permits(*packet)
+                for packet in zip(protocols, sources, source_ports, destinations, destination_ports)]
+
+
+def _field_pairs(first, second):
+    """
+    Returns one (value, first bitset, second bitset) triple per distinct pair of bitsets
+    of a field in two tables.
+    """
+    pairs = {}
+    for value in sorted(set(first.bounds) | set(second.bounds)):
+        pairs.setdefault((first.bitset(value), second.bitset(value)), value)
+    return [(value, first_bits, second_bits) for (first_bits, second_bits), value in pairs.items()]
+
+
+def _field_suffixes(classifier):
+    """
+    Returns, for each field, the bitset of the entries matching every value of all the
+    later fields.
+    """
+    suffixes = [-1] * len(_FIELDS)
+    for number in range(len(_FIELDS) - 1, 0, -1):
+        common = -1
+        for bitset in classifier._tables[number].bitsets:
+            common &= bitset
+        suffixes[number - 1] = suffixes[number] & common
+    return suffixes
+
+
+def find_difference(first, second, max_boxes=1000000):
+    """
+    Returns a packet that two ACLs permit or deny differently.
+
+    Between two consecutive bounds of any entry of either ACL, in every field, both ACLs
+    give every packet the same outcome, so comparing one packet per box of such ranges
+    is exact. The boxes are searched one field at a time: the ranges of a field giving
+    the same entries of both ACLs are checked once, and a box is not split further once
+    the first entry matching it in each ACL matches every value of the remaining fields.
+
+    Args:
+        first (ACL or AclClassifier): The first ACL.
+        second (ACL or AclClassifier): The second ACL.
+        max_boxes (int, optional): The most boxes to search before giving up
+            (default: 1000000).
+
+    Returns:
+        tuple or None: A (protocol, source, source_port, destination, destination_port)
+            packet of integers permitted by only one of the ACLs, or None when they are
+            equivalent.
+
+    Raises:
+        ValueError: If an ACL has opaque entries, whose packets are unknown, or entries
+            with wildcard masks that are not contiguous, or if the search needs more than
+            max_boxes boxes.
+    """
+    classifiers = [acl if isinstance(acl, AclClassifier) else AclClassifier(acl) for acl in (first, second)]
+    if any(entry.opaque for classifier in classifiers for entry in classifier.skipped):
+        raise ValueError("ACLs with opaque entries cannot be compared.")
+    if any(classifier._irregular for classifier in classifiers):
+        raise ValueError("ACLs with non-contiguous wildcard masks cannot be compared.")
+    fields = [_field_pairs(*tables) for tables in zip(classifiers[0]._tables, classifiers[1]._tables)]
+    suffixes = [_field_suffixes(classifier) for classifier in classifiers]
+    permits = [classifier._permits for classifier in classifiers]
+    seen = set()
+    packet = [0] * len(_FIELDS)
+
+    def outcome(side, matches, number):
+        # The outcome of the whole box, or None while it depends on the later fields.
+        if not matches:
+            return False
+        lowest = matches & -matches
+        if lowest & suffixes[side][number]:
+            return permits[side][lowest.bit_length() - 1]
+        return None
+
+    def search(number, first_matches, second_matches):
+        for value, first_bits, second_bits in fields[number]:
+            matches = (first_matches & first_bits, second_matches & second_bits)
+            if (number, matches) in seen:
+                continue
+            seen.add((number, matches))
+            if len(seen) > max_boxes:
+                raise ValueError(f"The ACLs need more than {max_boxes} boxes to be compared.")
+            packet[number] = value
+            outcomes = (outcome(0, matches[0], number), outcome(1, matches[1], number))
+            if None not in outcomes:
+                if outcomes[0] != outcomes[1]:
+                    return tuple(packet[:number + 1]) + (0,) * (len(_FIELDS) - number - 1)
+                continue
+            found = search(number + 1, *matches)
+            if found is not None:
+                return found
+        return None
+
+    return search(0, -1, -1)
@@ -0,0 +1,232 @@
+"""
+diff.py - Minimal in-place ACL updates for CiscoPyKit.
+
+This module compares two versions of an ACL and returns the fewest
+sequence-numbered edits that turn the first into the second on a device,
+instead of replacing the whole ACL:
+
+    no 30
+    25 permit tcp any host 10.0.0.5 eq 443
+
+Entries are compared by what they match, not by how they are written or
+numbered. The entries kept in place are the longest run of old entries that
+appear in the same order in the new version: a longest common subsequence,
+found as a longest increasing subsequence over every pair of equal entries in
+O((n + r) log n) for r such pairs, so repeated entries such as remark
+separators are matched wherever keeping them saves edits. Every other old
+entry is removed and every other new entry is added, numbered between the
+kept entries around it, spread out to leave room for later edits.
+
+Additions are made before removals, so no packet falls through while an entry
+is being replaced; an entry is only removed first when its sequence number is
+needed. Only when the gap between two kept entries is too small for the
+entries to add there is the ACL renumbered, with one `ip access-list
+resequence` command after the removals.
+
+Classes:
+    AclDiff: The edits turning one version of an ACL into another.
+
+Functions:
+    diff_acls(old, new): Computes the edits turning old into new.
+
+Usage Example:
+    ```
+    from ciscopykit.security.acl.diff import diff_acls
+
+    diff = diff_acls(running_acl, rendered_acl)
+    print(diff)
+    print("\\n".join(diff.commands()))
+    ```
+"""
+
+import bisect
+
+from ciscopykit.security.acl.acl import MAX_SEQUENCE, SEQUENCE_STEP, AclEntry
+
+
+def _numbered(entry, sequence):
+    """
+    Returns a copy of an entry with another sequence number, written like the original.
+    """
+    if entry.opaque:
+        copy = AclEntry.unparsed(entry.body())
+        copy.sequence = sequence
+        copy.text = copy.line()
+        return copy
+    copy = AclEntry(entry.action, entry.source, entry.destination, entry.protocol, entry.source_ports,
+                    entry.destination_ports, entry.options, entry.sequence, entry.remark, entry.text)
+    copy.sequence = sequence
+    copy.text = copy.line()
+    return copy
+
+
+def _kept_pairs(old_entries, new_entries):
+    """
+    Returns the (old position, new position) pairs of the longest run of entries found in
+    the same order in both versions.
+    """
+    occurrences = {}
+    for position, entry in enumerate(old_entries):
+        occurrences.setdefault(entry.key(), []).append(position)
+    # Every old copy of an entry is a candidate for every new copy, listed from the last
+    # old position to the first, so that a new entry is kept at most once in a strictly
+    # increasing run (Hunt-Szymanski).
+    matches = []
+    for new_position, entry in enumerate(new_entries):
+        for old_position in reversed(occurrences.get(entry.key(), ())):
+            matches.append((old_position, new_position))
+
+    # Longest strictly increasing subsequence of the old positions, in new order.
+    tails, tail_indexes, previous = [], [], [None] * len(matches)
+    for index, (old_position, _) in enumerate(matches):
+        slot = bisect.bisect_left(tails, old_position)
+        previous[index] = tail_indexes[slot - 1] if slot else None
+        if slot == len(tails):
+            tails.append(old_position)
+            tail_indexes.append(index)
+        else:
+            tails[slot] = old_position
+            tail_indexes[slot] = index
+    kept = []
+    index = tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        kept.append(matches[index])
+        index = previous[index]
+    kept.reverse()
+    return kept
+
+
+def _spread(first, last, count):
+    """
+    Returns count sequence numbers spread out strictly between first and last, last being
+    None after the last entry.
+    """
+    if last is None:
+        return [first + SEQUENCE_STEP * (number + 1) for number in range(count)]
+    return [first + (last - first) * (number + 1) // (count + 1) for number in range(count)]
+
+
+class AclDiff:
+    """
+    Represents the edits turning one version of an ACL into another.
+
+    Attributes:
+        acl_identifier (int or str): The ACL identifier (number or name).
+        standard (bool): Whether the ACL is a standard one.
+        kept (int): The number of entries left in place.
+        removals (list): The sequence numbers of the old entries to remove, before any
+            renumbering.
+        resequence (tuple or None): The (start, step) of the renumbering of the kept entries,
+            when the gaps between them are too small, or None.
+        additions (list): The AclEntry objects to add, with their new sequence numbers.
+        early_removals (set): The removals that must come before the additions, because
+            their sequence numbers are reused.
+    """
+
+    def __init__(self, acl_identifier, standard, kept, removals, resequence, additions, early_removals):
+        self.acl_identifier = acl_identifier
+        self.standard = standard
+        self.kept = kept
+        self.removals = removals
+        self.resequence = resequence
+        self.additions = additions
+        self.early_removals = early_removals
+
+    def __len__(self):
+        return len(self.removals) + len(self.additions) + (self.resequence is not None)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __str__(self):
+        renumbered = ", renumbered" if self.resequence else ""
+        return f"{self.kept} entries kept, {len(self.removals)} removed, {len(self.additions)} added{renumbered}"
+
+    def commands(self):
+        """
+        Returns the configuration commands applying the edits.
+
+        Returns:
+            list: The commands, starting with `ip access-list`; empty when there is nothing
+                to change.
+        """
+        if not self:
+            return []
+        header = f"ip access-list {'standard' if self.standard else 'extended'} {self.acl_identifier}"
+        if self.resequence is not None:
+            commands = []
+            if self.removals:
+                commands.append(header)
+                commands.extend(f"no {sequence}" for sequence in self.removals)
+                commands.append("exit")
+            commands.append(f"ip access-list resequence {self.acl_identifier} {self.resequence[0]} "
+                            f"{self.resequence[1]}")
+            commands.append(header)
+            commands.extend(entry.text for entry in self.additions)
+            return commands
+        commands = [header]
+        commands.extend(f"no {sequence}" for sequence in self.removals if sequence in self.early_removals)
+        commands.extend(entry.text for entry in self.additions)
+        commands.extend(f"no {sequence}" for sequence in self.removals if sequence not in self.early_removals)
+        return commands
+
+
+def diff_acls(old, new):
+    """
+    Computes the edits turning one version of an ACL into another.
+
+    Args:
+        old (ACL): The ACL as configured on the device.
+        new (ACL): The ACL wanted. Its sequence numbers are ignored: the edits keep the
+            order of its entries.
+
+    Returns:
+        AclDiff: The edits.
+
+    Raises:
+        ValueError: If more entries must be added after the last kept one than sequence
+            numbers are left.
+    """
+    old_entries = old.ordered_entries()
+    new_entries = new.ordered_entries()
+    kept = _kept_pairs(old_entries, new_entries)
+    kept_old = {old_position for old_position, _ in kept}
+    removals = [entry.sequence for position, entry in enumerate(old_entries) if position not in kept_old]
+
+    # The entries to add before each kept entry, and after the last one.
+    gaps = [[] for _ in range(len(kept) + 1)]
+    gap = 0
+    kept_new = {new_position: number for number, (_, new_position) in enumerate(kept)}
+    for position, entry in enumerate(new_entries):
+        number = kept_new.get(position)
+        if number is None:
+            gaps[gap].append(entry)
+        else:
+            gap = number + 1
+    sequences = [old_entries[old_position].sequence for old_position, _ in kept]
+
+    resequence = None
+    fits = all(len(entries) < (sequences[number] - (sequences[number - 1] if number else 0))
+               for number, entries in enumerate(gaps[:-1]))
+    if not fits:
+        step = SEQUENCE_STEP
+        widest = max(len(entries) for entries in gaps[:-1])
+        while step <= widest:
+            step += SEQUENCE_STEP
+        resequence = (step, step)
+        sequences = [step * (number + 1) for number in range(len(kept))]
+
+    additions = []
+    for number, entries in enumerate(gaps):
+        if not entries:
+            continue
+        first = sequences[number - 1] if number else 0
+        last = sequences[number] if number < len(sequences) else None
+        numbers = _spread(first, last, len(entries))
+        if numbers[-1] > MAX_SEQUENCE:
+            raise ValueError("No sequence numbers left after the last entry.")
+        additions.extend(_numbered(entry, sequence) for entry, sequence in zip(entries, numbers))
+
+    removed = set(removals)
+    early_removals = set() if resequence else {entry.sequence for entry in additions if entry.sequence in removed}
+    return AclDiff(new.acl_identifier, new.standard, len(kept), removals, resequence, additions, early_removals)
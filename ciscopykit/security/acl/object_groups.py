@@ -0,0 +1,423 @@
+"""
+object_groups.py - Object-group compression of extended ACL policies for CiscoPyKit.
+
+This module compiles a policy of rules over sets of networks and services into
+`object-group network` and `object-group service` definitions and a few ACEs
+referring to them, instead of one flat ACE per source, destination and
+service:
+
+    object-group network WEB_NET_1
+     10.1.0.0 255.255.254.0
+     host 10.9.0.5
+    object-group service WEB_SVC_1
+     tcp eq 80
+     tcp eq 443
+    ip access-list extended WEB
+     permit object-group WEB_SVC_1 object-group WEB_NET_1 any
+
+Consecutive rules with the same action can be reordered freely, so each such
+run is handled as one set of (source, destination, service) triples. The set
+is factorized exactly: sources with the same (destination, service) pairs are
+grouped, then, for each source group, destinations with the same services.
+All six orders of the three fields are tried and the one giving the fewest
+lines is kept. Groups with the same members are defined once, the networks of
+a group are collapsed to the fewest prefixes, and a group of one member is
+written inline.
+
+CompiledPolicy.equivalent() checks that the ACEs, with their groups expanded,
+permit exactly the packets the flat ACL does.
+
+Classes:
+    ObjectGroup: An `object-group network` or `object-group service` definition.
+    CompiledPolicy: The object groups and ACEs of a policy.
+
+Functions:
+    compile_policy(name, rules): Compiles a policy into object groups and ACEs.
+
+Usage Example:
+    ```
+    from ciscopykit.security.acl.object_groups import compile_policy
+
+    policy = compile_policy("WEB", [
+        ("permit", ["10.1.0.0/24", "10.1.1.0/24"], ["192.168.10.0/24", "192.168.20.0/24"],
+         ["tcp 80", "tcp 443"]),
+        ("deny", ["any"], ["any"], ["ip"]),
+    ])
+    print(policy)           # e.g. "8 lines instead of 9"
+    print(policy.configure())
+    assert policy.equivalent()
+    ```
+"""
+
+import bisect
+import itertools
+import re
+from ipaddress import IPv4Network
+
+from ciscopykit.ip.summarization import collapse_prefixes
+from ciscopykit.security.acl.acl import PORT_NAMES, AclEntry, NamedExtendedACL
+
+_PORT_PROTOCOLS = {"tcp", "udp"}
+
+
+def _parse_network(network):
+    if isinstance(network, IPv4Network):
+        return network
+    if network.strip().lower() == "any":
+        return IPv4Network("0.0.0.0/0")
+    words = network.split()
+    if len(words) == 2 and words[0].lower() == "host":
+        return IPv4Network(words[1])
+    return IPv4Network(network)
+
+
+def _parse_port(port):
+    if isinstance(port, str) and not port.isdigit():
+        number = PORT_NAMES.get(port.lower())
+    else:
+        number = int(port)
+    if number is None or not 0 <= number <= 65535:
+        raise ValueError(f"Invalid port '{port}'.")
+    return number
+
+
+def _parse_service(service):
+    """
+    Returns a service as a (protocol, (first, last) port range or None) pair.
+
+    Services are written 'tcp 443', 'tcp 1000-2000', 'udp domain', 'tcp' (any port),
+    'icmp' or 'ip', or given as (protocol[, port[, last_port]]) tuples.
+
+    Raises:
+        ValueError: If the service is invalid.
+    """
+    if isinstance(service, str):
+        # A hyphen between numbers is a range; port names such as ftp-data keep theirs.
+        words = re.sub(r"(?<=\d)\s*-\s*(?=\d)", " ", service).split()
+    else:
+        words = list(service)
+    if not words:
+        raise ValueError("Empty service.")
+    protocol = str(words[0]).lower()
+    if len(words) == 1:
+        return protocol, None
+    if protocol not in _PORT_PROTOCOLS or len(words) > 3:
+        raise ValueError(f"Invalid service '{service}'.")
+    first = _parse_port(words[1])
+    last = _parse_port(words[2]) if len(words) == 3 else first
+    if first > last:
+        raise ValueError(f"Invalid port range in service '{service}'.")
+    return protocol, (first, last)
+
+
+def _pair(network):
+    return int(network.network_address), int(network.hostmask)
+
+
+def _format_network(network):
+    if network.prefixlen == 0:
+        return "any"
+    if network.prefixlen == 32:
+        return f"host {network.network_address}"
+    return f"{network.network_address} {network.hostmask}"
+
+
+def _format_ports(ports):
+    if ports is None:
+        return ""
+    first, last = ports
+    return f" eq {first}" if first == last else f" range {first} {last}"
+
+
+class ObjectGroup:
+    """
+    Represents an `object-group network` or `object-group service` definition.
+
+    Attributes:
+        kind (str): 'network' or 'service'.
+        name (str): The name of the group.
+        members (list): The IPv4Network objects, or (protocol, ports) services, of the group.
+    """
+
+    def __init__(self, kind, name, members):
+        self.kind = kind
+        self.name = name
+        self.members = members
+
+    def __len__(self):
+        return len(self.members)
+
+    def configure(self):
+        """
+        Generate the configuration for the object group.
+
+        Returns:
+            str: The configuration commands defining the group.
+        """
+        lines = [f"object-group {self.kind} {self.name}"]
+        if self.kind == "network":
+            for network in self.members:
+                if network.prefixlen == 32:
+                    lines.append(f" host {network.network_address}")
+                else:
+                    lines.append(f" {network.network_address} {network.netmask}")
+        else:
+            for protocol, ports in self.members:
+                lines.append(f" {protocol}{_format_ports(ports)}")
+        return "\n".join(lines)
+
+
+class _Ace:
+    """
+    An ACE over sets of sources, destinations and services.
+    """
+
+    __slots__ = ("action", "sources", "destinations", "services")
+
+    def __init__(self, action, sources, destinations, services):
+        self.action = action
+        self.sources = sources
+        self.destinations = destinations
+        self.services = services
+
+
+def _factorize(triples, order):
+    """
+    Returns (first, second, third) sets covering exactly the triples, grouping the fields
+    in the given order.
+    """
+    by_first = {}
+    for triple in triples:
+        by_first.setdefault(triple[order[0]], set()).add((triple[order[1]], triple[order[2]]))
+    first_groups = {}
+    for value, pairs in by_first.items():
+        first_groups.setdefault(frozenset(pairs), []).append(value)
+    factors = []
+    for pairs, firsts in first_groups.items():
+        by_second = {}
+        for second, third in pairs:
+            by_second.setdefault(second, set()).add(third)
+        second_groups = {}
+        for second, thirds in by_second.items():
+            second_groups.setdefault(frozenset(thirds), []).append(second)
+        for thirds, seconds in second_groups.items():
+            fields = [None, None, None]
+            fields[order[0]], fields[order[1]], fields[order[2]] = firsts, seconds, list(thirds)
+            factors.append(fields)
+    return factors
+
+
+def _service_order(service):
+    protocol, ports = service
+    return protocol, ports or (-1, -1)
+
+
+def _collapsed(networks):
+    networks = collapse_prefixes(networks)
+    return [IPv4Network("0.0.0.0/0")] if any(network.prefixlen == 0 for network in networks) else networks
+
+
+def _members(field):
+    return field.members if isinstance(field, ObjectGroup) else [field]
+
+
+def _same_packets(first, second):
+    """
+    Returns whether two lists of (source, destination, service) triples match the same
+    packets.
+
+    Every address and service is split into the smallest pieces that the networks and
+    services of both lists are made of: ranges between the bounds of the networks and,
+    for services, a protocol with a range between the bounds of its port ranges. The
+    lists match the same packets when they match the same set of pieces.
+    """
+    triples = first + second
+    bounds = [sorted({bound for triple in triples
+                      for bound in (int(triple[side].network_address), int(triple[side].broadcast_address) + 1)})
+              for side in (0, 1)]
+    port_bounds = {"tcp": {0, 65536}, "udp": {0, 65536}}
+    protocols = {"tcp", "udp", None}
+    for _, _, (protocol, ports) in triples:
+        if protocol != "ip":
+            protocols.add(protocol)
+        if ports is not None:
+            port_bounds[protocol].update((ports[0], ports[1] + 1))
+    port_bounds = {protocol: sorted(values) for protocol, values in port_bounds.items()}
+
+    def ranges(values, low, high):
+        return range(bisect.bisect_left(values, low), bisect.bisect_left(values, high + 1))
+
+    def services(service):
+        protocol, ports = service
+        if protocol == "ip":
+            # Every protocol; None stands for the protocols no service names.
+            return [piece for other in protocols for piece in services((other, None))]
+        if protocol not in port_bounds:
+            return [(protocol, 0)]
+        low, high = ports if ports is not None else (0, 65535)
+        return [(protocol, number) for number in ranges(port_bounds[protocol], low, high)]
+
+    def pieces(triples):
+        matched = set()
+        for source, destination, service in triples:
+            matched.update(itertools.product(
+                ranges(bounds[0], int(source.network_address), int(source.broadcast_address)),
+                ranges(bounds[1], int(destination.network_address), int(destination.broadcast_address)),
+                services(service)))
+        return matched
+
+    return pieces(first) == pieces(second)
+
+
+class CompiledPolicy:
+    """
+    Represents the object groups and ACEs of a compiled policy.
+
+    Attributes:
+        name (str): The name of the ACL.
+        object_groups (list): The ObjectGroup definitions.
+        entries (list): The ACEs, as strings, in order.
+        flat_lines (int): The number of ACEs of the flat ACL.
+        lines (int): The number of lines of the object groups and ACEs.
+    """
+
+    def __init__(self, name, object_groups, runs, flat):
+        self.name = name
+        self.object_groups = object_groups
+        self._runs = runs
+        self._aces = [ace for _, _, aces in runs for ace in aces]
+        self._flat = flat
+        self.entries = [self._format(ace) for ace in self._aces]
+        self.flat_lines = len(flat)
+        self.lines = len(self.entries) + sum(len(group) + 1 for group in object_groups)
+
+    def __str__(self):
+        return (f"{self.lines} lines instead of {self.flat_lines}: {len(self.object_groups)} object groups, "
+                f"{len(self.entries)} ACEs")
+
+    def _format(self, ace):
+        if isinstance(ace.services, ObjectGroup):
+            protocol, ports = f"object-group {ace.services.name}", ""
+        else:
+            protocol, ports = ace.services[0], _format_ports(ace.services[1])
+        addresses = [f"object-group {field.name}" if isinstance(field, ObjectGroup) else _format_network(field)
+                     for field in (ace.sources, ace.destinations)]
+        return f"{ace.action} {protocol} {addresses[0]} {addresses[1]}{ports}"
+
+    def configure(self):
+        """
+        Generate the configuration of the object groups and of the ACL using them.
+
+        Returns:
+            str: The configuration commands.
+        """
+        lines = [group.configure() for group in self.object_groups]
+        lines.append(f"ip access-list extended {self.name}")
+        lines.extend(self.entries)
+        return "\n".join(lines)
+
+    def flat_acl(self):
+        """
+        Returns the policy as a flat ACL, with one ACE per source, destination and service.
+
+        Returns:
+            NamedExtendedACL: The flat ACL.
+        """
+        acl = NamedExtendedACL(self.name)
+        acl.extend(self._flat)
+        return acl
+
+    def expanded_acl(self):
+        """
+        Returns the compiled ACEs as a flat ACL, with their object groups expanded.
+
+        Returns:
+            NamedExtendedACL: The expanded ACL.
+        """
+        acl = NamedExtendedACL(self.name)
+        acl.extend(AclEntry(ace.action, _pair(source), _pair(destination), protocol,
+                            destination_ports=None if ports is None else (ports,))
+                   for ace in self._aces
+                   for source, destination, (protocol, ports) in itertools.product(
+                       _members(ace.sources), _members(ace.destinations), _members(ace.services)))
+        return acl
+
+    def equivalent(self):
+        """
+        Checks that the compiled ACEs permit exactly the packets the flat ACL does.
+
+        Both keep the runs of rules with the same action in the same order, so they are
+        equivalent when each run matches the same packets in both.
+
+        Returns:
+            bool: Whether the two are equivalent.
+        """
+        return all(_same_packets(triples, [triple for ace in aces for triple in itertools.product(
+            _members(ace.sources), _members(ace.destinations), _members(ace.services))])
+            for _, triples, aces in self._runs)
+
+
+def compile_policy(name, rules):
+    """
+    Compiles a policy into object groups and a few ACEs.
+
+    Args:
+        name (str): The name of the ACL, also used to name the object groups.
+        rules (iterable): (action, sources, destinations, services) tuples, in order.
+            Sources and destinations are IPv4Network objects or strings such as
+            '10.0.0.0/24', 'host 10.0.0.1' or 'any'. Services are strings such as
+            'tcp 443', 'tcp 1000-2000', 'udp domain', 'icmp' or 'ip'.
+
+    Returns:
+        CompiledPolicy: The object groups and ACEs.
+
+    Raises:
+        ValueError: If an action, network or service is invalid.
+    """
+    runs = []
+    flat = []
+    for action, sources, destinations, services in rules:
+        if action not in ("permit", "deny"):
+            raise ValueError(f"Invalid action '{action}'.")
+        sources = [_parse_network(network) for network in sources]
+        destinations = [_parse_network(network) for network in destinations]
+        services = [_parse_service(service) for service in services]
+        if not runs or runs[-1][0] != action:
+            runs.append((action, {}))
+        triples = runs[-1][1]
+        for triple in itertools.product(sources, destinations, services):
+            if triple not in triples:
+                triples[triple] = None
+                source, destination, (protocol, ports) = triple
+                flat.append(f"{action} {protocol} {_format_network(source)} {_format_network(destination)}"
+                            f"{_format_ports(ports)}")
+
+    groups = {}
+    object_groups = []
+
+    def group(kind, members):
+        if len(members) == 1:
+            return members[0]
+        key = (kind, frozenset(members))
+        if key not in groups:
+            prefix = "NET" if kind == "network" else "SVC"
+            count = sum(1 for existing in object_groups if existing.kind == kind) + 1
+            groups[key] = ObjectGroup(kind, f"{name}_{prefix}_{count}", members)
+            object_groups.append(groups[key])
+        return groups[key]
+
+    compiled = []
+    for action, triples in runs:
+        aces = []
+        best = None
+        for order in itertools.permutations(range(3)):
+            factors = [(_collapsed(sources), _collapsed(destinations), sorted(services, key=_service_order))
+                       for sources, destinations, services in _factorize(triples, order)]
+            cost = (len(factors), sum(len(field) for factor in factors for field in factor if len(field) > 1))
+            if best is None or cost < best[0]:
+                best = (cost, factors)
+        for sources, destinations, services in best[1]:
+            aces.append(_Ace(action, group("network", sources), group("network", destinations),
+                             group("service", services)))
+        compiled.append((action, list(triples), aces))
+    return CompiledPolicy(name, object_groups, compiled, flat)
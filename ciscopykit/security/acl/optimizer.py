@@ -0,0 +1,427 @@
+"""
+optimizer.py - ACL minimization for CiscoPyKit.
+
+This module removes the entries of an ACL that can never change its result and
+merges entries that can be written as one, without changing what the ACL
+permits. Entries are evaluated in sequence order and the first match wins, so:
+
+    shadowed    an earlier entry with the other action matches every packet
+                the entry matches, so it never matches
+    redundant   an earlier entry with the same action matches every packet the
+                entry matches, or every packet it matches would get the same
+                action from the next entries (or from the implicit deny at
+                the end) anyway
+    merged      consecutive entries with the same action differing in only one
+                field are replaced by the fewest entries covering their union,
+                e.g. two adjacent /25 sources become one /24
+
+Entries are handled as boxes of protocol, address/wildcard pairs and port
+ranges. Rather than comparing every pair of entries, entries are indexed by
+the prefixes of their source and destination: the entries that can contain an
+entry are found by looking up its few enclosing prefixes, and the entries that
+can overlap it also by a binary search over the sorted prefixes it encloses.
+Entries with match options (e.g. `established`) only contain entries with the
+same options, and entries that log are never removed as redundant. Opaque
+entries, such as those using object groups, are assumed to match any packet
+but contain no other entry, so they are kept unless an earlier or later entry
+matching everything makes them useless.
+
+Classes:
+    OptimizationReport: The minimized ACL and the entries removed or merged.
+
+Functions:
+    optimize_acl(acl, merge=True): Minimizes an ACL.
+
+Usage Example:
+    ```
+    from ciscopykit.security.acl.optimizer import optimize_acl
+
+    report = optimize_acl(acl)
+    print(report)
+    for entry, by in report.shadowed:
+        print(f"{entry.line()} is shadowed by {by.line()}")
+    print(report.acl.configure())
+    ```
+"""
+
+import bisect
+
+from ciscopykit.ip.summarization import collapse_ranges, range_to_prefixes
+from ciscopykit.security.acl.acl import ANY, AclEntry
+
+# Protocol numbers written by name, so that 'tcp' and '6' compare equal.
+_PROTOCOL_NAMES = {"1": "icmp", "2": "igmp", "6": "tcp", "17": "udp", "47": "gre", "50": "esp", "51": "ahp",
+                   "88": "eigrp", "89": "ospf", "103": "pim"}
+_LOG_OPTIONS = {"log", "log-input"}
+_FULL_PORTS = ((0, 65535),)
+
+
+def _prefixlen(wildcard):
+    # The number of leading bits the wildcard does not mask.
+    return 32 - wildcard.bit_length()
+
+
+def _contiguous(wildcard):
+    return wildcard & (wildcard + 1) == 0
+
+
+def _contains_address(outer, inner):
+    return inner[1] & ~outer[1] == 0 and inner[0] & ~outer[1] == outer[0]
+
+
+def _overlaps_address(first, second):
+    return (first[0] ^ second[0]) & ~(first[1] | second[1]) & 0xFFFFFFFF == 0
+
+
+def _contains_ports(outer, inner):
+    if outer is None:
+        return True
+    if inner is None:
+        inner = _FULL_PORTS
+    position = 0
+    for first, last in inner:
+        while position < len(outer) and outer[position][1] < first:
+            position += 1
+        if position == len(outer) or outer[position][0] > first or outer[position][1] < last:
+            return False
+    return True
+
+
+def _overlaps_ports(first, second):
+    if first is None or second is None:
+        return True
+    i = j = 0
+    while i < len(first) and j < len(second):
+        if first[i][1] < second[j][0]:
+            i += 1
+        elif second[j][1] < first[i][0]:
+            j += 1
+        else:
+            return True
+    return False
+
+
+class _Rule:
+    """
+    An entry as a box of fields, with its position in sequence order.
+    """
+
+    __slots__ = ("position", "entry", "action", "protocol", "source", "source_ports", "destination",
+                 "destination_ports", "match", "log", "regular")
+
+    def __init__(self, position, entry):
+        self.position = position
+        self.entry = entry
+        self.action = entry.action
+        protocol = entry.protocol or "ip"
+        self.protocol = _PROTOCOL_NAMES.get(protocol, protocol)
+        self.source = entry.source
+        self.destination = entry.destination if entry.destination is not None else ANY
+        self.source_ports = None if entry.source_ports == _FULL_PORTS else entry.source_ports
+        self.destination_ports = None if entry.destination_ports == _FULL_PORTS else entry.destination_ports
+        self.match = frozenset(option for option in entry.options if option.lower() not in _LOG_OPTIONS)
+        self.log = len(self.match) != len(entry.options)
+        if entry.opaque:
+            # Unknown fields: an entry that may match any packet, with a match option of
+            # its own so that it contains no other entry and is never merged.
+            self.protocol = "ip"
+            self.match = frozenset((entry,))
+        self.regular = _contiguous(self.source[1]) and _contiguous(self.destination[1])
+
+    def contains(self, other):
+        return ((self.protocol == "ip" or self.protocol == other.protocol)
+                and self.match <= other.match
+                and _contains_address(self.source, other.source)
+                and _contains_address(self.destination, other.destination)
+                and _contains_ports(self.source_ports, other.source_ports)
+                and _contains_ports(self.destination_ports, other.destination_ports))
+
+    def overlaps(self, other):
+        # Match options are assumed to overlap, which only keeps more entries.
+        return ((self.protocol == "ip" or other.protocol == "ip" or self.protocol == other.protocol)
+                and _overlaps_address(self.source, other.source)
+                and _overlaps_address(self.destination, other.destination)
+                and _overlaps_ports(self.source_ports, other.source_ports)
+                and _overlaps_ports(self.destination_ports, other.destination_ports))
+
+
+class _Index:
+    """
+    The entries kept so far, indexed by the prefixes of their source and destination.
+    """
+
+    def __init__(self):
+        self.boxes = {}
+        self.lengths = set()
+        self.irregular = []
+        self.ancestors = ({}, {})
+        self.starts = ([], [])
+        self.size = 0
+
+    def add(self, rule):
+        self.size += 1
+        if not rule.regular:
+            self.irregular.append(rule)
+            return
+        source_length, destination_length = _prefixlen(rule.source[1]), _prefixlen(rule.destination[1])
+        self.lengths.add((source_length, destination_length))
+        key = (rule.protocol, source_length, rule.source[0], destination_length, rule.destination[0])
+        self.boxes.setdefault(key, []).append(rule)
+        for side, address in enumerate((rule.source, rule.destination)):
+            self.ancestors[side].setdefault((_prefixlen(address[1]), address[0]), []).append(rule)
+            bisect.insort(self.starts[side], (address[0], rule.position, rule))
+
+    def containing(self, rule):
+        """
+        Returns the earliest entry containing the rule, or None.
+        """
+        best = None
+        protocols = ("ip",) if rule.protocol == "ip" else (rule.protocol, "ip")
+        source_limit, destination_limit = _prefixlen(rule.source[1]), _prefixlen(rule.destination[1])
+        for source_length, destination_length in self.lengths:
+            if source_length > source_limit or destination_length > destination_limit:
+                continue
+            source = rule.source[0] & ~(0xFFFFFFFF >> source_length) & 0xFFFFFFFF
+            destination = rule.destination[0] & ~(0xFFFFFFFF >> destination_length) & 0xFFFFFFFF
+            for protocol in protocols:
+                for candidate in self.boxes.get((protocol, source_length, source, destination_length, destination), ()):
+                    if (best is None or candidate.position < best.position) and candidate.contains(rule):
+                        best = candidate
+        for candidate in self.irregular:
+            if (best is None or candidate.position < best.position) and candidate.contains(rule):
+                best = candidate
+        return best
+
+    def _candidates(self, rule, side):
+        """
+        Returns the groups of entries whose address on one side may overlap the rule's:
+        its enclosing prefixes and the span of sorted prefixes it encloses.
+        """
+        address = rule.destination if side else rule.source
+        groups = [self.irregular]
+        for length in range(_prefixlen(address[1]) + 1):
+            group = self.ancestors[side].get((length, address[0] & ~(0xFFFFFFFF >> length) & 0xFFFFFFFF))
+            if group:
+                groups.append(group)
+        starts = self.starts[side]
+        low = bisect.bisect_left(starts, (address[0],))
+        high = bisect.bisect_left(starts, ((address[0] | address[1]) + 1,))
+        return sum(len(group) for group in groups) + high - low, groups, starts, low, high
+
+    def overlapping_groups(self, rule, budget):
+        """
+        Returns groups of entries including every entry overlapping the rule, or None when
+        they would be more than budget entries.
+        """
+        if not rule.regular:
+            return None
+        size, groups, starts, low, high = min(self._candidates(rule, 0), self._candidates(rule, 1),
+                                              key=lambda candidates: candidates[0])
+        if size > budget:
+            return None
+        return groups + [[rule for _, _, rule in starts[low:high]]]
+
+
+class OptimizationReport:
+    """
+    Represents the outcome of an ACL minimization.
+
+    Attributes:
+        acl (ACL): The minimized ACL, of the same class and identifier as the original.
+        shadowed (list): (entry, by) pairs of the entries that never match and the earlier
+            entry with the other action matching all their packets.
+        redundant (list): (entry, by) pairs of the entries removed without changing the
+            result, and the entry that gives their packets the same action; by is None for
+            the implicit deny.
+        merged (list): (entries, replacements) pairs of the consecutive entries merged and
+            the entries replacing them.
+        entries_before (int): The number of entries of the original ACL.
+        entries_after (int): The number of entries of the minimized ACL.
+    """
+
+    def __init__(self, acl, shadowed, redundant, merged, entries_before):
+        self.acl = acl
+        self.shadowed = shadowed
+        self.redundant = redundant
+        self.merged = merged
+        self.entries_before = entries_before
+        self.entries_after = len(acl.entries)
+
+    def __str__(self):
+        return (f"{self.entries_before} entries reduced to {self.entries_after}: {len(self.shadowed)} shadowed, "
+                f"{len(self.redundant)} redundant, {len(self.merged)} merges")
+
+
+def _remove_covered(rules, shadowed, redundant):
+    """
+    Removes the rules contained by an earlier rule, in one pass in sequence order.
+    """
+    index = _Index()
+    kept = []
+    for rule in rules:
+        by = index.containing(rule)
+        if by is None:
+            index.add(rule)
+            kept.append(rule)
+        elif by.action == rule.action:
+            redundant.append((rule.entry, by.entry))
+        else:
+            shadowed.append((rule.entry, by.entry))
+    return kept
+
+
+def _remove_redundant(rules, redundant):
+    """
+    Removes the rules whose packets would get the same action from the next rules, in one
+    pass in reverse sequence order, so each decision holds for the rules kept after it.
+    """
+    index = _Index()
+    kept = []
+    removed = set()
+    offsets = {rule.position: offset for offset, rule in enumerate(rules)}
+    for offset in range(len(rules) - 1, -1, -1):
+        rule = rules[offset]
+        if rule.action != "remark" and not rule.log:
+            by = index.containing(rule)
+            limit = by.position if by is not None else None
+            if (by.action if by is not None else "deny") == rule.action:
+                # Between the rule and the next rule containing it, no rule with the other
+                # action may match any of its packets.
+                end = len(rules) if by is None else offsets[limit]
+                groups = index.overlapping_groups(rule, end - offset - 1)
+                if groups is None:
+                    groups = [[later for later in rules[offset + 1:end] if later.position not in removed]]
+                if not any(other.action != rule.action and other.action != "remark"
+                           and (limit is None or other.position < limit) and other.overlaps(rule)
+                           for group in groups for other in group):
+                    redundant.append((rule.entry, by.entry if by is not None else None))
+                    removed.add(rule.position)
+                    continue
+        if rule.action != "remark":
+            index.add(rule)
+        kept.append(rule)
+    kept.reverse()
+    return kept
+
+
+def _write(template, sequence, **fields):
+    """
+    Returns a copy of an entry with some fields replaced, written like the original.
+    """
+    values = {"action": template.action, "source": template.source, "destination": template.destination,
+              "protocol": template.protocol, "source_ports": template.source_ports,
+              "destination_ports": template.destination_ports, "options": template.options}
+    values.update(fields)
+    entry = AclEntry(sequence=sequence, **values)
+    if not template.text.split(None, 1)[0].isdigit():
+        entry.text = entry.body()
+    return entry
+
+
+def _merge_field(run, field, merged):
+    """
+    Merges the rules of a run of rules with the same action that differ only in one field.
+    """
+    if field == "destination" and run[0].entry.destination is None:
+        return run
+    groups = {}
+    for rule in run:
+        value = getattr(rule, field)
+        if field in ("source", "destination") and not _contiguous(value[1]):
+            continue
+        key = tuple(getattr(rule, other) for other in ("protocol", "source", "source_ports", "destination",
+                                                      "destination_ports", "match", "log") if other != field)
+        groups.setdefault(key, []).append(rule)
+    replaced = {}
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        if field in ("source", "destination"):
+            ranges = collapse_ranges((getattr(rule, field)[0], getattr(rule, field)[0] | getattr(rule, field)[1])
+                                     for rule in members)
+            values = [(address, 0xFFFFFFFF >> prefixlen) for first, last in ranges
+                      for address, prefixlen in range_to_prefixes(first, last)]
+        else:
+            ranges = collapse_ranges(port_range for rule in members
+                                     for port_range in (getattr(rule, field) or _FULL_PORTS))
+            if len(ranges) != 1:
+                continue
+            values = [None if ranges == _FULL_PORTS else tuple(ranges)]
+        if len(values) >= len(members):
+            continue
+        members.sort(key=lambda rule: rule.position)
+        replacements = [_Rule(rule.position, _write(rule.entry, rule.entry.sequence, **{field: value}))
+                        for rule, value in zip(members, values)]
+        merged.append(([rule.entry for rule in members], [rule.entry for rule in replacements]))
+        for rule in members:
+            replaced[rule.position] = None
+        for rule in replacements:
+            replaced[rule.position] = rule
+    if not replaced:
+        return run
+    result = []
+    for rule in run:
+        rule = replaced.get(rule.position, rule)
+        if rule is not None:
+            result.append(rule)
+    return result
+
+
+def _merge(rules, merged):
+    """
+    Merges runs of consecutive rules with the same action, one field at a time.
+    """
+    result = []
+    start = 0
+    while start < len(rules):
+        end = start + 1
+        while end < len(rules) and rules[end].action == rules[start].action != "remark":
+            end += 1
+        run = rules[start:end]
+        if len(run) > 1:
+            changed = True
+            while changed:
+                before = len(run)
+                for field in ("source", "destination", "source_ports", "destination_ports"):
+                    run = _merge_field(run, field, merged)
+                changed = len(run) < before
+        result.extend(run)
+        start = end
+    return result
+
+
+def optimize_acl(acl, merge=True):
+    """
+    Minimizes an ACL without changing what it permits.
+
+    Shadowed and redundant entries are removed and, with merge, consecutive entries
+    with the same action differing in only one field are merged. Kept entries are
+    written exactly as in the original ACL, and merged entries take the sequence
+    numbers of the first entries they replace. Remarks are kept.
+
+    Args:
+        acl (ACL): The ACL to minimize.
+        merge (bool, optional): Merge entries as well as removing them (default: True).
+
+    Returns:
+        OptimizationReport: The minimized ACL and the entries removed or merged.
+    """
+    entries = acl.ordered_entries()
+    rules = [_Rule(position, entry) for position, entry in enumerate(entries)]
+    shadowed, redundant, merged = [], [], []
+    kept = rules
+    # A merged entry can contain entries that none of the entries it replaced did, so
+    # removal runs again until nothing merges.
+    while True:
+        remarks = [rule for rule in kept if rule.action == "remark"]
+        kept = _remove_covered([rule for rule in kept if rule.action != "remark"], shadowed, redundant)
+        kept = sorted(kept + remarks, key=lambda rule: rule.position)
+        kept = _remove_redundant(kept, redundant)
+        merges = len(merged)
+        if merge:
+            kept = _merge(kept, merged)
+        if len(merged) == merges:
+            break
+    optimized = type(acl)(acl.acl_identifier)
+    optimized.extend(rule.entry for rule in kept)
+    return OptimizationReport(optimized, shadowed, redundant, merged, len(entries))
@@ -0,0 +1,324 @@
+"""
+tcam.py - TCAM usage estimation for ACLs for CiscoPyKit.
+
+This module estimates how many TCAM entries the ACLs of a device need, to
+catch overflows at render time rather than when the configuration is pushed.
+
+A TCAM entry matches each field with a value and a mask of the bits that must
+match. Addresses fit one value/mask pair whatever their wildcard mask, but a
+port range only fits one when it is an aligned block, so a range is split into
+the fewest aligned blocks (`range 1000 2000` needs 8 entries, `gt 1023` 6) and
+an ACE needs one entry per combination of its source and destination port
+blocks. Remarks need none, and each ACL needs a few more, for its implicit
+deny, as set by the platform. Opaque entries, whose fields are not parsed, are
+counted as one entry each, so the estimate of an ACL having some is a lower
+bound; they are listed in AclTcamEstimate.opaque.
+
+The splits of the most recently used port ranges are cached, so estimating an
+ACL is a single pass over its entries, fast enough to run over every ACL of the
+fleet on every render.
+
+Classes:
+    TcamPlatform: The TCAM budget of a platform.
+    TcamEntry: One value/mask entry.
+    AclTcamEstimate: The TCAM usage of one ACL.
+    DeviceTcamEstimate: The TCAM usage of the ACLs of one device.
+
+Functions:
+    expand_entry(entry): Returns the TCAM entries of an ACE.
+    tcam_entries(entry): Returns the number of TCAM entries of an ACE.
+    estimate_acl(acl, platform=None): Estimates the TCAM usage of an ACL.
+    estimate_device(device, acls, platform): Estimates the TCAM usage of a device.
+    estimate_fleet(device_acls, platform): Estimates the TCAM usage of many devices.
+
+Usage Example:
+    ```
+    from ciscopykit.security.acl.tcam import TcamPlatform, estimate_fleet
+
+    platform = TcamPlatform("access-switch", capacity=3000, acl_capacity=1000)
+    for estimate in estimate_fleet({"sw1.site1": [edge_in, voice_in]}, platform):
+        if not estimate.fits:
+            print(estimate)
+    ```
+"""
+
+import functools
+import itertools
+
+from ciscopykit.ip.summarization import range_to_prefixes
+from ciscopykit.security.acl.acl import protocol_number
+
+_PORT_PROTOCOLS = {"tcp", "udp", "6", "17"}
+_ANY_PORT = ((0, 0),)
+_PORT_BLOCKS_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=_PORT_BLOCKS_CACHE_SIZE)
+def _port_blocks(ranges):
+    """
+    Returns the (value, mask) blocks matching port ranges, or one block for any port.
+    """
+    if ranges is None:
+        return _ANY_PORT
+    return tuple((value, (0xFFFF << (16 - prefixlen)) & 0xFFFF)
+                 for first, last in ranges for value, prefixlen in range_to_prefixes(first, last, bits=16))
+
+
+class TcamPlatform:
+    """
+    Represents the TCAM budget of a platform.
+
+    Attributes:
+        name (str): The name of the platform.
+        capacity (int): The TCAM entries available for ACLs on a device.
+        acl_capacity (int or None): The most entries one ACL may use, if limited.
+        per_acl_overhead (int): The entries each ACL needs besides its ACEs, such as its
+            implicit deny.
+    """
+
+    def __init__(self, name, capacity, acl_capacity=None, per_acl_overhead=1):
+        """
+        Initialize a TcamPlatform.
+
+        Args:
+            name (str): The name of the platform.
+            capacity (int): The TCAM entries available for ACLs on a device.
+            acl_capacity (int, optional): The most entries one ACL may use (default: no limit).
+            per_acl_overhead (int, optional): The entries each ACL needs besides its ACEs
+                (default: 1, for the implicit deny).
+
+        Raises:
+            ValueError: If a capacity or the overhead is negative.
+        """
+        if capacity < 0 or (acl_capacity is not None and acl_capacity < 0) or per_acl_overhead < 0:
+            raise ValueError("TCAM capacities and overhead must not be negative.")
+        self.name = name
+        self.capacity = capacity
+        self.acl_capacity = acl_capacity
+        self.per_acl_overhead = per_acl_overhead
+
+
+class TcamEntry:
+    """
+    Represents one TCAM entry: a (value, mask) pair per field, the mask having the bits
+    that must match set.
+
+    Attributes:
+        protocol (tuple): The protocol value and mask.
+        source (tuple): The source address value and mask.
+        source_port (tuple): The source port value and mask.
+        destination (tuple): The destination address value and mask.
+        destination_port (tuple): The destination port value and mask.
+    """
+
+    __slots__ = ("protocol", "source", "source_port", "destination", "destination_port")
+
+    def __init__(self, protocol, source, source_port, destination, destination_port):
+        self.protocol = protocol
+        self.source = source
+        self.source_port = source_port
+        self.destination = destination
+        self.destination_port = destination_port
+
+    def __repr__(self):
+        fields = (self.protocol, self.source, self.source_port, self.destination, self.destination_port)
+        return "<TcamEntry " + " ".join(f"{value:#x}/{mask:#x}" for value, mask in fields) + ">"
+
+
+def tcam_entries(entry):
+    """
+    Returns the number of TCAM entries an ACE needs.
+
+    Args:
+        entry (AclEntry): The ACE.
+
+    Returns:
+        int: The number of entries, 0 for a remark and 1 for an opaque entry.
+    """
+    if entry.action == "remark":
+        return 0
+    if entry.opaque:
+        return 1
+    if entry.protocol not in _PORT_PROTOCOLS:
+        return 1
+    return len(_port_blocks(entry.source_ports)) * len(_port_blocks(entry.destination_ports))
+
+
+def expand_entry(entry):
+    """
+    Returns the TCAM entries an ACE needs.
+
+    Args:
+        entry (AclEntry): The ACE.
+
+    Returns:
+        list: The TcamEntry objects, none for a remark.
+
+    Raises:
+        ValueError: If the protocol is unknown or the entry is opaque.
+    """
+    if entry.action == "remark":
+        return []
+    if entry.opaque:
+        raise ValueError(f"Opaque entry '{entry.text}' cannot be expanded.")
+    if entry.protocol in (None, "ip"):
+        protocol = (0, 0)
+    else:
+        protocol = (protocol_number(entry.protocol), 0xFF)
+    source = (entry.source[0], ~entry.source[1] & 0xFFFFFFFF)
+    destination = (0, 0) if entry.destination is None else (entry.destination[0], ~entry.destination[1] & 0xFFFFFFFF)
+    ports = entry.protocol in _PORT_PROTOCOLS
+    return [TcamEntry(protocol, source, source_port, destination, destination_port)
+            for source_port, destination_port in itertools.product(
+                _port_blocks(entry.source_ports if ports else None),
+                _port_blocks(entry.destination_ports if ports else None))]
+
+
+class AclTcamEstimate:
+    """
+    Represents the TCAM usage of one ACL.
+
+    Attributes:
+        acl_identifier (int or str): The ACL identifier (number or name).
+        aces (int): The number of ACEs, remarks excluded.
+        entries (int): The TCAM entries needed, overhead included.
+        largest (list): The (entries, AclEntry) pairs of the ACEs needing the most
+            entries, at most 5, largest first.
+        capacity (int or None): The most entries the ACL may use, if limited.
+        opaque (list): The opaque AclEntry objects, counted as one entry each.
+    """
+
+    def __init__(self, acl_identifier, aces, entries, largest, capacity=None, opaque=()):
+        self.acl_identifier = acl_identifier
+        self.aces = aces
+        self.entries = entries
+        self.largest = largest
+        self.capacity = capacity
+        self.opaque = list(opaque)
+
+    @property
+    def fits(self):
+        """
+        bool: Whether the ACL fits its per-ACL limit.
+        """
+        return self.capacity is None or self.entries <= self.capacity
+
+    def __str__(self):
+        limit = f" of {self.capacity}" if self.capacity is not None else ""
+        at_least = "at least " if self.opaque else ""
+        return f"ACL {self.acl_identifier}: {at_least}{self.entries}{limit} TCAM entries for {self.aces} ACEs"
+
+
+class DeviceTcamEstimate:
+    """
+    Represents the TCAM usage of the ACLs of one device.
+
+    Attributes:
+        device (str): The device.
+        acls (list): The AclTcamEstimate of each ACL.
+        entries (int): The TCAM entries needed by all the ACLs.
+        capacity (int): The TCAM entries available.
+    """
+
+    def __init__(self, device, acls, capacity):
+        self.device = device
+        self.acls = acls
+        self.entries = sum(acl.entries for acl in acls)
+        self.capacity = capacity
+
+    @property
+    def utilization(self):
+        """
+        float: The share of the capacity used, above 1 on overflow.
+        """
+        return self.entries / self.capacity if self.capacity else float("inf") if self.entries else 0.0
+
+    @property
+    def fits(self):
+        """
+        bool: Whether all the ACLs fit, both on the device and within their own limits.
+        """
+        return self.entries <= self.capacity and all(acl.fits for acl in self.acls)
+
+    def __str__(self):
+        return (f"{self.device}: {self.entries} of {self.capacity} TCAM entries "
+                f"({self.utilization:.0%}) for {len(self.acls)} ACLs")
+
+
+def estimate_acl(acl, platform=None):
+    """
+    Estimates the TCAM usage of an ACL.
+
+    Args:
+        acl (ACL or CompiledPolicy): The ACL, or a policy compiled into object groups,
+            which is estimated with its groups expanded as the hardware stores it.
+        platform (TcamPlatform, optional): The platform, for its per-ACL overhead and
+            limit (default: one entry of overhead and no limit).
+
+    Returns:
+        AclTcamEstimate: The TCAM usage.
+    """
+    if hasattr(acl, "expanded_acl"):
+        acl = acl.expanded_acl()
+    aces = 0
+    total = 0
+    largest = []
+    opaque = []
+    for entry in acl.ordered_entries():
+        if entry.opaque:
+            opaque.append(entry)
+        count = tcam_entries(entry)
+        if count:
+            aces += 1
+            total += count
+            if count > 1 and (len(largest) < 5 or count > largest[-1][0]):
+                largest.append((count, entry))
+                largest.sort(key=lambda pair: -pair[0])
+                del largest[5:]
+    overhead = platform.per_acl_overhead if platform is not None else 1
+    return AclTcamEstimate(acl.acl_identifier, aces, total + overhead, largest,
+                           platform.acl_capacity if platform is not None else None, opaque)
+
+
+def estimate_device(device, acls, platform):
+    """
+    Estimates the TCAM usage of the ACLs of one device.
+
+    Args:
+        device (str): The device, e.g. its fqdn.
+        acls (iterable): The ACLs applied on the device.
+        platform (TcamPlatform): The platform of the device.
+
+    Returns:
+        DeviceTcamEstimate: The TCAM usage.
+    """
+    return DeviceTcamEstimate(device, [estimate_acl(acl, platform) for acl in acls], platform.capacity)
+
+
+def estimate_fleet(device_acls, platform):
+    """
+    Estimates the TCAM usage of many devices.
+
+    An ACL applied on several devices is estimated once.
+
+    Args:
+        device_acls (dict): Maps devices to the ACLs applied on them.
+        platform (TcamPlatform or dict): The platform of every device, or a dictionary
+            mapping each device to its platform.
+
+    Returns:
+        list: The DeviceTcamEstimate of each device, most utilized first.
+    """
+    cache = {}
+    estimates = []
+    for device, acls in device_acls.items():
+        device_platform = platform[device] if isinstance(platform, dict) else platform
+        acl_estimates = []
+        for acl in acls:
+            key = (id(acl), id(device_platform))
+            if key not in cache:
+                cache[key] = (acl, estimate_acl(acl, device_platform))
+            acl_estimates.append(cache[key][1])
+        estimates.append(DeviceTcamEstimate(device, acl_estimates, device_platform.capacity))
+    estimates.sort(key=lambda estimate: -estimate.utilization)
+    return estimates
@@ -4,11 +4,15 @@ Module: dhcp_snooping
 This module provides a function to generate a DHCP snooping configuration for an IOS device.
 
 Function:
-- generate_dhcp_snooping_config(interface, trust_ports): Generates a DHCP snooping configuration for an IOS device.
+- generate_dhcp_snooping_config(interface, trust_ports, max_ranges=MAX_RANGES): Generates a DHCP snooping configuration for an IOS device.
 
 Args:
 - interface (str): The interface on which DHCP snooping should be enabled.
 - trust_ports (list): A list of interfaces that should be trusted by DHCP snooping.
+- max_ranges (int): The most ranges an `interface range` statement takes on the platform.
+
+The trusted interfaces are configured with the fewest `interface range` blocks; names
+that cannot be parsed are configured as written.
 
 Returns:
 - str: The DHCP snooping configuration that can be copied and pasted onto an IOS device.
@@ -24,13 +28,19 @@ Usage:
 
 """
 
-def generate_dhcp_snooping_config(interface, trust_ports):
+from ciscopykit.interface_range import MAX_RANGES, interface_blocks
+
+
+def generate_dhcp_snooping_config(interface, trust_ports, max_ranges=MAX_RANGES):
     """
     Generates a DHCP snooping configuration for an IOS device.
 
     Args:
         interface (str): The interface on which DHCP snooping should be enabled.
-        trust_ports (list): A list of interfaces that should be trusted by DHCP snooping.
+        trust_ports (list): A list of interfaces, or interface range strings, that should be
+            trusted by DHCP snooping.
+        max_ranges (int, optional): The most ranges an `interface range` statement takes on
+            the platform (default: MAX_RANGES).
 
     Returns:
         str: The DHCP snooping configuration that can be copied and pasted onto an IOS device.
@@ -50,14 +60,9 @@ def generate_dhcp_snooping_config(interface, trust_ports):
     # Enable DHCP snooping globally
     config_lines.append('ip dhcp snooping')
 
-    # Enable DHCP snooping trust on the specified interface
-    config_lines.append(f'interface {interface}')
-    config_lines.append('  ip dhcp snooping trust')
-
-    # Enable DHCP snooping trust on the specified trust ports
-    for port in trust_ports:
-        config_lines.append(f'interface {port}')
-        config_lines.append('  ip dhcp snooping trust')
+    # Enable DHCP snooping trust on the specified interface and trust ports
+    config_lines.extend(interface_blocks([interface] + list(trust_ports), ['ip dhcp snooping trust'],
+                                         max_ranges, indent='  ', strict=False))
 
     # Combine the configuration lines into a single string
     config = '\n'.join(config_lines)
@@ -21,8 +21,8 @@ Module: dai_security
 This module provides functions to configure Dynamic ARP Inspection (DAI) security feature.
 
 Functions:
-- generate_dai_config(interfaces, vlan=None): Configures Dynamic ARP Inspection (DAI) 
-on the specified interfaces and VLAN.
+- generate_dai_config(interfaces, vlan=None, max_ranges=MAX_RANGES): Configures Dynamic ARP
+Inspection (DAI) on the specified interfaces and VLAN, with the fewest `interface range` blocks.
 
 Main Script: app.py
 
@@ -46,15 +46,19 @@ Example Usage:
     python app.py --interface GigabitEthernet1/0/1 --security dai --vlan 10
 """
 
+from ciscopykit.interface_range import MAX_RANGES, interface_blocks
 
-def generate_dai_config(interfaces, vlan=None):
+
+def generate_dai_config(interfaces, vlan=None, max_ranges=MAX_RANGES):
     """
     Configures Dynamic ARP Inspection (DAI) on the specified interfaces and VLAN.
 
     Args:
-        interfaces (list): A list of interfaces on which to enable DAI.
+        interfaces (list): A list of interfaces, or interface range strings, on which to enable DAI.
         vlan (int or None, optional): The VLAN ID for which to enable DAI. 
         If not specified or set to None, DAI will be enabled on all VLANs.
+        max_ranges (int, optional): The most ranges an `interface range` statement takes on
+            the platform (default: MAX_RANGES).
 
     Returns:
         str: The configuration commands for enabling DAI on the interfaces and VLAN.
@@ -64,30 +68,15 @@ def generate_dai_config(interfaces, vlan=None):
         ValueError: If the VLAN ID is not a positive integer.
     """
 
-    valid_interface_types = [
-        "GigabitEthernet", "FastEthernet", "Ethernet", "Serial", "Portchannel", "VLAN", "Gi", "G", "Fa", "F", "Se", "S", "Po"]
-    commands = []
-
     if vlan is not None and not all(isinstance(each, int) and each > 0 for each in vlan):
         raise ValueError(
             "Invalid VLAN ID. The VLAN ID must be a positive integer.")
 
-    for interface in interfaces:
-        interface_type = interface.split()[0]
-
-        if interface_type not in valid_interface_types:
-            raise ValueError(
-                f"Invalid interface name. The interface type must be one of: {', '.join(valid_interface_types)}"
-            )
-
-        command = f"interface {interface}\n"
-        command += "ip arp inspection trust\n"
+    commands = interface_blocks(interfaces, ["ip arp inspection trust"], max_ranges)
 
     if vlan is not None:
         vlan_ids = ",".join(str(v) for v in vlan)
-        command += f"ip arp inspection vlan {vlan_ids}\n"
-
-        commands.append(command)
+        commands.append(f"ip arp inspection vlan {vlan_ids}")
 
     return "\n".join(commands)
 
@@ -5,13 +5,17 @@ This module provides functions to configure Spanning Tree Protocol (STP) securit
 
 Functions:
 - configure_portfast_default(): Configures PortFast on all access ports by default.
-- configure_bpdu_guard(interface): Configures BPDU Guard on the specified interface.
-- configure_stp_security(interface): Configures PortFast and BPDU Guard on the specified interface.
+- configure_bpdu_guard(interface, max_ranges=MAX_RANGES): Configures BPDU Guard on the specified interfaces.
+- configure_stp_security(interface, max_ranges=MAX_RANGES): Configures PortFast and BPDU Guard on the specified interfaces.
+
+Several interfaces are configured with the fewest `interface range` blocks.
 
 Raises:
 - ValueError: If the interface name is not valid.
 """
 
+from ciscopykit.interface_range import MAX_RANGES, interface_blocks
+
 
 def configure_portfast_default():
     """
@@ -24,56 +28,43 @@ def configure_portfast_default():
     return command
 
 
-def configure_bpdu_guard(interface):
+def configure_bpdu_guard(interface, max_ranges=MAX_RANGES):
     """
-    Configures BPDU Guard on the specified interface.
+    Configures BPDU Guard on the specified interfaces.
 
     Args:
-        interface (str): The interface name on which to enable BPDU Guard.
+        interface (str or list): The interface name, interface range string or list of
+            interfaces on which to enable BPDU Guard.
+        max_ranges (int, optional): The most ranges an `interface range` statement takes on
+            the platform (default: MAX_RANGES).
 
     Returns:
-        str: The configuration command for enabling BPDU Guard on the interface.
+        str: The configuration commands for enabling BPDU Guard on the interfaces.
 
     Raises:
         ValueError: If the interface name is not valid.
     """
-    valid_interface_types = [
-        "GigabitEthernet", "FastEthernet", "Ethernet", "Serial", "Portchannel", "VLAN"]
-    interface_type = interface.split()[0]
+    interfaces = [interface] if isinstance(interface, str) else interface
+    return "\n".join(interface_blocks(interfaces, ["spanning-tree bpduguard enable"], max_ranges))
 
-    if interface_type not in valid_interface_types:
-        raise ValueError(
-            f"Invalid interface name. The interface type must be one of: {', '.join(valid_interface_types)}"
-        )
-
-    command = f"interface {interface}\n"
-    command += "spanning-tree bpduguard enable"
-    return command
 
-
-def configure_stp_security(interface):
+def configure_stp_security(interface, max_ranges=MAX_RANGES):
     """
-    Configures PortFast and BPDU Guard on the specified interface.
+    Configures PortFast and BPDU Guard on the specified interfaces.
 
     Args:
-        interface (str): The interface name on which to configure PortFast and BPDU Guard.
+        interface (str or list): The interface name, interface range string or list of
+            interfaces on which to configure PortFast and BPDU Guard.
+        max_ranges (int, optional): The most ranges an `interface range` statement takes on
+            the platform (default: MAX_RANGES).
 
     Returns:
-        str: The configuration commands for enabling PortFast and BPDU Guard on the interface.
+        str: The configuration commands for enabling PortFast and BPDU Guard on the interfaces.
 
     Raises:
         ValueError: If the interface name is not valid.
     """
-    valid_interface_types = [
-        "GigabitEthernet", "FastEthernet", "Ethernet", "Serial", "Portchannel", "VLAN"]
-    interface_type = interface.split()[0]
-
-    if interface_type not in valid_interface_types:
-        raise ValueError(
-            f"Invalid interface name. The interface type must be one of: {', '.join(valid_interface_types)}"
-        )
-
     portfast_command = configure_portfast_default()
-    bpdu_guard_command = configure_bpdu_guard(interface)
+    bpdu_guard_command = configure_bpdu_guard(interface, max_ranges)
     commands = f"{portfast_command}\n{bpdu_guard_command}"
     return commands
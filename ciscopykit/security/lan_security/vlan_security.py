@@ -4,9 +4,13 @@ Module: vlan_security
 This module provides functions to configure VLAN security features.
 
 Functions:
-- configure_trunk_interfaces(interface_range): Configures trunk interfaces with non-negotiating trunks and assigns them to a default VLAN.
-- configure_unused_ports(interface_range, unused_vlan): Configures unused ports as access ports, assigns them to a specified VLAN, and shuts down the ports.
-- configure_access_ports(interface_range): Configures access ports to prevent trunking.
+- configure_trunk_interfaces(interface_range, max_ranges=MAX_RANGES): Configures trunk interfaces with non-negotiating trunks and assigns them to a default VLAN.
+- configure_unused_ports(interface_range, unused_vlan, max_ranges=MAX_RANGES): Configures unused ports as access ports, assigns them to a specified VLAN, and shuts down the ports.
+- configure_access_ports(interface_range, max_ranges=MAX_RANGES): Configures access ports to prevent trunking.
+
+The interface ranges are parsed and validated into a PortSet, so they may be given as
+range strings, lists of interfaces or PortSets, and are written back as the fewest
+`interface range` statements.
 
 Usage: 
 
@@ -25,61 +29,81 @@ print(unused_config)
 access_ports = "fa0/11 - 24"
 access_config = configure_access_ports(access_ports)
 print(access_config)
+
+# Shut down every port that is neither a trunk nor an access port
+from ciscopykit.interface_range import PortSet
+
+all_ports = PortSet("fa0/1 - 48")
+unused_config = configure_unused_ports(all_ports - PortSet([trunk_interfaces, access_ports]), unused_vlan)
+print(unused_config)
 """
 
+from ciscopykit.interface_range import MAX_RANGES, PortSet, interface_blocks
 
-def configure_trunk_interfaces(interface_range):
+
+def configure_trunk_interfaces(interface_range, max_ranges=MAX_RANGES):
     """
     Configures trunk interfaces with non-negotiating trunks and assigns them to a default VLAN.
 
     Args:
-        interface_range (str): Range of interfaces in the format "fa0/1 - 4".
+        interface_range (str, list or PortSet): Range of interfaces in the format "fa0/1 - 4",
+            a list of interfaces or ranges, or a PortSet.
+        max_ranges (int, optional): The most ranges an `interface range` statement takes on
+            the platform (default: MAX_RANGES).
 
     Returns:
         str: The configuration commands for configuring the trunk interfaces.
 
+    Raises:
+        ValueError: If an interface range is not valid.
+
     """
-    command = f"interface range {interface_range}"
-    command += "\nswitchport mode trunk"
-    command += "\nswitchport nonegotiate"
-    command += "\nswitchport trunk native vlan 99"
+    commands = ["switchport mode trunk", "switchport nonegotiate", "switchport trunk native vlan 99"]
 
-    return command
+    return "\n".join(interface_blocks(PortSet(interface_range), commands, max_ranges))
 
 
-def configure_unused_ports(interface_range, unused_vlan):
+def configure_unused_ports(interface_range, unused_vlan, max_ranges=MAX_RANGES):
     """
     Configures unused ports as access ports, assigns them to a specified VLAN, and shuts down the ports.
 
     Args:
-        interface_range (str): Range of interfaces in the format "fa0/5 - 10".
+        interface_range (str, list or PortSet): Range of interfaces in the format "fa0/5 - 10",
+            a list of interfaces or ranges, or a PortSet.
         unused_vlan (int): VLAN ID for the unused ports.
+        max_ranges (int, optional): The most ranges an `interface range` statement takes on
+            the platform (default: MAX_RANGES).
 
     Returns:
         str: The configuration commands for configuring the unused ports.
 
+    Raises:
+        ValueError: If an interface range is not valid.
+
     """
-    command = f"interface range {interface_range}"
-    command += "\nswitchport mode access"
-    command += f"\nswitchport access vlan {unused_vlan}"
-    command += "\nshutdown"
+    commands = ["switchport mode access", f"switchport access vlan {unused_vlan}", "shutdown"]
 
-    return command
+    return "\n".join(interface_blocks(PortSet(interface_range), commands, max_ranges))
 
 
-def configure_access_ports(interface_range):
+def configure_access_ports(interface_range, max_ranges=MAX_RANGES):
     """
     Configures access ports to prevent trunking.
 
     Args:
-        interface_range (str): Range of interfaces in the format "fa0/11 - 24".
+        interface_range (str, list or PortSet): Range of interfaces in the format "fa0/11 - 24",
+            a list of interfaces or ranges, or a PortSet.
+        max_ranges (int, optional): The most ranges an `interface range` statement takes on
+            the platform (default: MAX_RANGES).
 
     Returns:
         str: The configuration commands for configuring the access ports.
 
+    Raises:
+        ValueError: If an interface range is not valid.
+
     """
-    command = f"interface range {interface_range}"
-    command += "\nswitchport mode access"
+    commands = ["switchport mode access"]
 
-    return command
+    return "\n".join(interface_blocks(PortSet(interface_range), commands, max_ranges))
 
@@ -10,6 +10,9 @@ Functions:
     config_dhcp(dhcp_pool_name, network_address, dns_address=None, dg=None, exclude_ips=None):
         Generate DHCP configuration commands.
     
+    config_dhcp_pools(pools, dns_address=None):
+        Generate DHCP configuration commands for many networks at once.
+
     add_helper_address(interface, helper_address):
         Generate commands to add a helper address to a router interface.
 
@@ -31,6 +34,8 @@ for Cisco routers. Users can use these functions as part of larger network autom
 
 from ipaddress import IPv4Address, IPv4Network
 
+from ciscopykit.ip.vectorized import NetworkArray, format_addresses
+
 
 def config_dhcp(dhcp_pool_name, network_address, dns_address=None, dg=None, exclude_ips=None):
     """
@@ -77,6 +82,44 @@ exit"""
     return config
 
 
+def config_dhcp_pools(pools, dns_address=None):
+    """
+    Configures DHCP for many networks at once.
+
+    Produces the same configuration as calling config_dhcp() with the default gateway,
+    exclusion range and DNS server defaults for every pool, but computes the addresses
+    of all pools in single vectorized operations when NumPy is installed.
+
+    :param pools: iterable of (dhcp_pool_name, network_address) pairs
+    :param dns_address: str, DNS server shared by every pool. Defaults to the 10th host
+        of each pool
+    :return: str
+    """
+    pools = list(pools)
+    try:
+        networks = NetworkArray.from_networks(network_address for _, network_address in pools)
+    except ImportError:
+        return "".join(config_dhcp(name, network_address, dns_address=dns_address)
+                       for name, network_address in pools)
+
+    gateways = format_addresses(networks.host(1))
+    excluded_max = format_addresses(networks.host(100))
+    dns_servers = format_addresses(networks.host(10)) if dns_address is None else [dns_address] * len(pools)
+    network_addresses = format_addresses(networks.addresses)
+    netmasks = format_addresses(networks.netmasks())
+
+    config = []
+    for index, (dhcp_pool_name, _) in enumerate(pools):
+        config.append(f"""
+ip dhcp excluded-address {gateways[index]} {excluded_max[index]}
+ip dhcp pool {dhcp_pool_name}
+network {network_addresses[index]} {netmasks[index]}
+default-router {gateways[index]}
+dns-server {dns_servers[index]}
+exit""")
+    return "".join(config)
+
+
 def add_helper_address(interface, helper_address):
     """
     Adds a helper address to a router interface.
@@ -0,0 +1,365 @@
+"""
+snapshot.py - Persistent binary inventory snapshots for CiscoPyKit.
+
+This module writes a device inventory to a compact binary file once, and
+opens it again through mmap. Opening a snapshot only reads its header: a
+device record is decoded when it is accessed, so looking up one device does
+not deserialize the rest of the file.
+
+File layout (little-endian):
+
+    header       magic, version, counts and the offset of every section
+    strings      u64 offsets followed by the UTF-8 data of every distinct string
+    devices      fixed-size records: type, hostname, site, layer and fqdn
+                 string ids, then the range of the device's interfaces
+    interfaces   fixed-size records: name string id, packed IPv4 address,
+                 prefix length and flags
+    fqdn index   device numbers sorted by fqdn, for binary search
+
+Classes:
+    InventorySnapshot: An opened snapshot file.
+    SnapshotDevice: A lazily decoded view of one device of a snapshot.
+
+Functions:
+    save_snapshot(devices, path): Writes devices to a snapshot file.
+    open_snapshot(path): Opens a snapshot file.
+
+Usage Example:
+    ```
+    from ciscopykit.snapshot import open_snapshot, save_snapshot
+
+    save_snapshot(registry, "inventory.snap")
+
+    with open_snapshot("inventory.snap") as snapshot:
+        device = snapshot.get("sw1.site1")
+        print(device.layer, device.get_active_interfaces())
+        router = snapshot[0].materialize()
+    ```
+"""
+
+import ipaddress
+import mmap
+import struct
+
+from ciscopykit.device import DEVICE_CLASSES, CompactDevice, Device
+from ciscopykit.interface import CompactInterface, Interface
+
+MAGIC = b"CPKSNAP\0"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sIIII5Q")
+_OFFSET = struct.Struct("<Q")
+_DEVICE = struct.Struct("<7I")
+_INTERFACE = struct.Struct("<IIBB2x")
+_INDEX = struct.Struct("<I")
+
+_HAS_ADDRESS = 0x01
+
+
+def save_snapshot(devices, path):
+    """
+    Writes devices to a snapshot file.
+
+    Args:
+        devices (iterable): The devices to save, e.g. a DeviceRegistry.
+        path (str or os.PathLike): The path of the snapshot file.
+
+    Returns:
+        int: The number of devices written.
+
+    Raises:
+        ValueError: If two devices share the same fqdn.
+    """
+    strings = {}
+
+    def string_id(value):
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+        return sid
+
+    device_records = []
+    interface_records = []
+    fqdns = {}
+    for device in devices:
+        if device.fqdn in fqdns:
+            raise ValueError(f"Device {device.fqdn} appears twice in the snapshot.")
+        fqdns[device.fqdn] = len(device_records)
+        interfaces = device.get_active_interfaces()
+        device_records.append(_DEVICE.pack(
+            string_id(device.device_type), string_id(device.hostname), string_id(device.site),
+            string_id(device.layer), string_id(device.fqdn), len(interface_records), len(interfaces)))
+        for interface in interfaces:
+            packed_ip = interface.packed_ip
+            if packed_ip is None:
+                interface_records.append(_INTERFACE.pack(string_id(interface.name), 0, 0, 0))
+            else:
+                interface_records.append(_INTERFACE.pack(string_id(interface.name), *packed_ip, _HAS_ADDRESS))
+
+    encoded = [value.encode("utf-8") for value in strings]
+    index = sorted(fqdns.items(), key=lambda item: item[0].encode("utf-8"))
+
+    strings_offset = _HEADER.size
+    data_offset = strings_offset + _OFFSET.size * (len(encoded) + 1)
+    devices_offset = data_offset + sum(len(value) for value in encoded)
+    interfaces_offset = devices_offset + _DEVICE.size * len(device_records)
+    index_offset = interfaces_offset + _INTERFACE.size * len(interface_records)
+
+    with open(path, "wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, VERSION, len(device_records), len(interface_records), len(encoded),
+                                  strings_offset, data_offset, devices_offset, interfaces_offset, index_offset))
+        position = 0
+        for value in encoded:
+            handle.write(_OFFSET.pack(position))
+            position += len(value)
+        handle.write(_OFFSET.pack(position))
+        handle.writelines(encoded)
+        handle.writelines(device_records)
+        handle.writelines(interface_records)
+        handle.writelines(_INDEX.pack(number) for _, number in index)
+    return len(device_records)
+
+
+def open_snapshot(path):
+    """
+    Opens a snapshot file.
+
+    Args:
+        path (str or os.PathLike): The path of the snapshot file.
+
+    Returns:
+        InventorySnapshot: The opened snapshot.
+
+    Raises:
+        ValueError: If the file is not a snapshot or has an unsupported version.
+    """
+    return InventorySnapshot(path)
+
+
+class InventorySnapshot:
+    """
+    Represents an opened snapshot file.
+
+    The file is memory-mapped and records are decoded on access. Devices are
+    numbered in the order they were saved.
+
+    Methods:
+        get(fqdn): Returns the device with the given fqdn.
+        close(): Closes the snapshot file.
+    """
+
+    def __init__(self, path):
+        """
+        Open a snapshot file.
+
+        Args:
+            path (str or os.PathLike): The path of the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot or has an unsupported version.
+        """
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError("Invalid snapshot file.")
+        (magic, version, self.device_count, self.interface_count, self.string_count, self._strings_offset,
+         self._data_offset, self._devices_offset, self._interfaces_offset,
+         self._index_offset) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError("Invalid snapshot file.")
+        if version != VERSION:
+            self._map.close()
+            raise ValueError(f"Unsupported snapshot version {version}.")
+        self._string_cache = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.device_count
+
+    def __getitem__(self, number):
+        if number < 0:
+            number += self.device_count
+        if not 0 <= number < self.device_count:
+            raise IndexError("Snapshot device number out of range.")
+        return SnapshotDevice(self, number)
+
+    def __iter__(self):
+        for number in range(self.device_count):
+            yield SnapshotDevice(self, number)
+
+    def close(self):
+        """
+        Closes the snapshot file. Views of the snapshot become unusable.
+        """
+        self._map.close()
+
+    def get(self, fqdn):
+        """
+        Returns the device with the given fqdn.
+
+        Args:
+            fqdn (str): The fully qualified domain name.
+
+        Returns:
+            SnapshotDevice or None: The matching device, if any.
+        """
+        target = fqdn.encode("utf-8")
+        low, high = 0, self.device_count
+        while low < high:
+            middle = (low + high) // 2
+            number = _INDEX.unpack_from(self._map, self._index_offset + middle * _INDEX.size)[0]
+            current = self._string_bytes(self._device_record(number)[4])
+            if current < target:
+                low = middle + 1
+            elif current > target:
+                high = middle
+            else:
+                return SnapshotDevice(self, number)
+        return None
+
+    def _string_bytes(self, sid):
+        start, end = struct.unpack_from("<2Q", self._map, self._strings_offset + sid * _OFFSET.size)
+        return self._map[self._data_offset + start:self._data_offset + end]
+
+    def _string(self, sid):
+        value = self._string_cache.get(sid)
+        if value is None:
+            value = self._string_cache[sid] = self._string_bytes(sid).decode("utf-8")
+        return value
+
+    def _device_record(self, number):
+        return _DEVICE.unpack_from(self._map, self._devices_offset + number * _DEVICE.size)
+
+    def _interface_record(self, number):
+        return _INTERFACE.unpack_from(self._map, self._interfaces_offset + number * _INTERFACE.size)
+
+
+class SnapshotDevice:
+    """
+    Represents a lazily decoded view of one device of a snapshot.
+
+    The view reads its record from the snapshot when an attribute is accessed
+    and decodes interfaces only when they are requested. It exposes the
+    read-only part of the Device interface; materialize() builds a regular
+    device from it.
+
+    Attributes:
+        device_type (str): The type of the device.
+        hostname (str): The hostname of the device.
+        site (str): The site name of the device.
+        layer (str): The layer of the device (Core, Distribution, Access).
+        fqdn (str): The fully qualified domain name of the device.
+
+    Methods:
+        get_active_interfaces(compact=False): Decodes the interfaces of the device.
+        get_interface(name, compact=False): Decodes the interface with the given name.
+        materialize(compact=False): Builds a Device with its interfaces.
+    """
+
+    __slots__ = ("_snapshot", "_number", "_record")
+
+    def __init__(self, snapshot, number):
+        self._snapshot = snapshot
+        self._number = number
+        self._record = snapshot._device_record(number)
+
+    @property
+    def device_type(self):
+        return self._snapshot._string(self._record[0])
+
+    @property
+    def hostname(self):
+        return self._snapshot._string(self._record[1])
+
+    @property
+    def site(self):
+        return self._snapshot._string(self._record[2])
+
+    @property
+    def layer(self):
+        return self._snapshot._string(self._record[3])
+
+    @property
+    def fqdn(self):
+        return self._snapshot._string(self._record[4])
+
+    @property
+    def active_interfaces(self):
+        return self.get_active_interfaces()
+
+    def __str__(self):
+        return f"{self.device_type} ({self.fqdn})"
+
+    def __repr__(self):
+        return f"<SnapshotDevice {self.fqdn}>"
+
+    def _interface(self, record, compact):
+        name_sid, address, prefixlen, flags = record
+        interface = (CompactInterface if compact else Interface)(self._snapshot._string(name_sid))
+        if flags & _HAS_ADDRESS:
+            interface.ip_address = ipaddress.IPv4Interface((address, prefixlen))
+        return interface
+
+    def _interface_records(self):
+        first, count = self._record[5], self._record[6]
+        for number in range(first, first + count):
+            yield self._snapshot._interface_record(number)
+
+    def get_active_interfaces(self, compact=False):
+        """
+        Decodes the interfaces of the device.
+
+        Args:
+            compact (bool, optional): Build CompactInterface objects (default: False).
+
+        Returns:
+            list: The interfaces, in the order they were saved.
+        """
+        return [self._interface(record, compact) for record in self._interface_records()]
+
+    def get_interface(self, name, compact=False):
+        """
+        Decodes the interface with the given name.
+
+        Only the name of each interface is compared; the matching record is the
+        only one decoded.
+
+        Args:
+            name (str): The name of the interface.
+            compact (bool, optional): Build a CompactInterface (default: False).
+
+        Returns:
+            Interface or None: The matching interface, if any.
+        """
+        for record in self._interface_records():
+            if self._snapshot._string(record[0]) == name:
+                return self._interface(record, compact)
+        return None
+
+    def materialize(self, compact=False):
+        """
+        Builds a Device with its interfaces from the view.
+
+        Args:
+            compact (bool, optional): Build a CompactDevice with CompactInterface objects
+                (default: False).
+
+        Returns:
+            Device: The materialized device.
+        """
+        device_type = self.device_type
+        if compact:
+            device = CompactDevice(device_type, self.hostname, self.site, self.layer)
+        elif device_type in DEVICE_CLASSES:
+            device = DEVICE_CLASSES[device_type](self.hostname, self.site, self.layer)
+        else:
+            device = Device(device_type, self.hostname, self.site, self.layer)
+        device.add_interfaces(self.get_active_interfaces(compact))
+        return device
@@ -1,5 +1,12 @@
 import ipaddress
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+from ciscopykit.ip.vectorized import format_addresses
+
 class Switch:
     def __init__(self, model, host_name, ports, active_ports=None):
         self.model = model
@@ -86,9 +93,29 @@ class Switch:
 
     def generate_ip_address(self, name, prefix_length=24):
         subnet_ip = ipaddress.ip_network(self.subnet)
-        for subnet in subnet_ip.subnets(new_prefix=prefix_length):
-            if name in subnet.network_address.compressed:
-                return self.get_next_ip_address(subnet)
+        if np is None or subnet_ip.version != 4:
+            for subnet in subnet_ip.subnets(new_prefix=prefix_length):
+                if name in subnet.network_address.compressed:
+                    return self.get_next_ip_address(subnet)
+            return ""
+        # Raises the ValueError of ipaddress for an invalid prefix length.
+        next(subnet_ip.subnets(new_prefix=prefix_length))
+
+        # Compute and format the subnet addresses in growing chunks, so an
+        # early match does not pay for splitting the whole network.
+        base = int(subnet_ip.network_address)
+        shift = 32 - prefix_length
+        count = 1 << (prefix_length - subnet_ip.prefixlen)
+        start, chunk = 0, 64
+        while start < count:
+            numbers = np.arange(start, min(count, start + chunk), dtype=np.uint64)
+            addresses = (np.uint64(base) + (numbers << np.uint64(shift))).astype(np.uint32)
+            for offset, network_address in enumerate(format_addresses(addresses)):
+                if name in network_address:
+                    return self.get_next_ip_address(
+                        ipaddress.ip_network((int(addresses[offset]), prefix_length)))
+            start += len(numbers)
+            chunk = min(chunk * 2, 4096)
         return ""
 
     def get_next_ip_address(self, subnet):
@@ -29,6 +29,9 @@ setup(
         'ipaddress',
         'argparse'
     ],
+    extras_require={
+        'fast': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
             'ciscopykit = ciscopykit.entry_point:main',